@@ -1,9 +1,9 @@
 # SPDX-License-Identifier: MIT
 import sys
 from PyQt5 import  QtWidgets
-from PyQt5.QtWidgets import QApplication, QScrollArea,  QMainWindow, QWidget, QGraphicsView, QGraphicsScene, QFileDialog, QMessageBox, QGraphicsTextItem, QComboBox
+from PyQt5.QtWidgets import QApplication, QScrollArea,  QMainWindow, QWidget, QGraphicsView, QGraphicsScene, QFileDialog, QMessageBox, QGraphicsTextItem, QComboBox, QInputDialog
 from PyQt5.QtGui import QIcon, QPalette, QColor
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QFileSystemWatcher
 from scipy import interpolate
 import os
 import re 
@@ -13,8 +13,1878 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt5.QtWidgets import QApplication, QMainWindow,  QWidget,  QLabel
 from PyQt5.QtGui import QPixmap 
-from numpy import polyfit, polyval
-import numpy as np 
+import numpy as np
+import hashlib
+import json
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import io
+import gzip
+import bz2
+import lzma
+import zipfile
+import tarfile
+from contextlib import contextmanager, ExitStack
+
+
+
+"""
+@brief Separator between an archive path and the name of a member inside it, e.g. 'run.tar.xz::run/phonopy.yaml'.
+"""
+ARCHIVE_SEPARATOR = "::"
+
+"""
+@brief File name suffixes of tar archives, including compressed ones.
+"""
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+"""
+@brief Stream decompressors of single compressed files, keyed by file name suffix.
+"""
+DECOMPRESSORS = {".gz": lambda stream: gzip.GzipFile(fileobj=stream),
+                 ".bz2": bz2.BZ2File,
+                 ".xz": lzma.LZMAFile,
+                 ".lzma": lzma.LZMAFile}
+
+
+
+def split_archive_member(file_name):
+    """
+    @brief Splits an input name into the path on disk and the archive member name.
+
+    Parameters:
+        - file_name (str): A plain path or an 'archive::member' name.
+
+    Returns:
+        - tuple (str, str or None): The path on disk and the member name, or None for plain files.
+
+    Example usage:
+        archive, member = split_archive_member("run.zip::thermal_displacements.yaml-3")
+    """
+    archive, separator, member = file_name.partition(ARCHIVE_SEPARATOR)
+    return (archive, member) if separator else (file_name, None)
+
+
+
+def is_archive(file_name):
+    """
+    @brief Returns True if the file is a zip or (compressed) tar archive, judged by its name.
+    """
+    lower_name = file_name.lower()
+    return lower_name.endswith(".zip") or lower_name.endswith(TAR_SUFFIXES)
+
+
+
+def is_tar_member(file_name):
+    """
+    @brief Returns True if the input name refers to a member of a tar archive.
+    """
+    archive, member = split_archive_member(file_name)
+    return member is not None and archive.lower().endswith(TAR_SUFFIXES)
+
+
+
+def list_archive_members(archive):
+    """
+    @brief Lists the names of the regular files inside a zip or tar archive.
+
+    Tar archives are read as a stream, so compressed archives are decompressed once, sequentially.
+
+    Parameters:
+        - archive (str): Path of the archive.
+
+    Returns:
+        - list of str: The member names in archive order.
+
+    Example usage:
+        members = list_archive_members("run.tar.xz")
+    """
+    if archive.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive) as zip_file:
+            return [info.filename for info in zip_file.infolist() if not info.is_dir()]
+    with tarfile.open(archive, "r:*") as tar:
+        return [member.name for member in tar if member.isfile()]
+
+
+
+def input_size(file_name):
+    """
+    @brief Returns the size in bytes of the file on disk that holds an input (the archive for archive members).
+    """
+    return os.path.getsize(split_archive_member(file_name)[0])
+
+
+
+def input_decompressor(name):
+    """
+    @brief Returns the decompressor of a compressed input name, or None for plain inputs and tar archives.
+
+    Nested tar archives are not decompressed, so `open_input` and `parse_tar_members` accept the same members.
+    """
+    name = name.lower()
+    if name.endswith(TAR_SUFFIXES):
+        return None
+    return next((decompressor for suffix, decompressor in DECOMPRESSORS.items() if name.endswith(suffix)), None)
+
+
+
+@contextmanager
+def open_input(source):
+    """
+    @brief Opens an input file for reading text, decompressing it on the fly.
+
+    Plain files, single compressed files (.gz, .bz2, .xz) and members of zip and tar archives (given as 
+    'archive::member') are all read as a text stream, without extracting anything to disk. Compressed members 
+    inside archives are decompressed as well. An already opened stream is passed through unchanged.
+
+    Parameters:
+        - source (str or file object): The input name or an open text stream.
+
+    Yields:
+        - A text stream of the input.
+
+    Raises:
+        - FileNotFoundError: If the archive has no such member.
+
+    Example usage:
+        with open_input("run.tar.xz::run/e-v.txt") as data:
+            lines = data.readlines()
+    """
+    if hasattr(source, "read"):
+        yield source
+        return
+
+    archive, member = split_archive_member(source)
+    with ExitStack() as stack:
+        if member is None:
+            stream = stack.enter_context(open(archive, "rb"))
+        elif archive.lower().endswith(".zip"):
+            zip_file = stack.enter_context(zipfile.ZipFile(archive))
+            stream = stack.enter_context(zip_file.open(member))
+        else:
+            tar = stack.enter_context(tarfile.open(archive, "r:*"))
+            stream = next((tar.extractfile(entry) for entry in tar if entry.name == member), None)
+            if stream is None:
+                raise FileNotFoundError(f"'{member}' not found in '{archive}'.")
+
+        decompressor = input_decompressor(member or archive)
+        if decompressor is not None:
+            stream = stack.enter_context(decompressor(stream))
+        yield stack.enter_context(io.TextIOWrapper(stream))
+
+
+
+def parse_tar_members(parser, archive, members):
+    """
+    @brief Parses several members of one tar archive in a single sequential pass over the archive.
+
+    Compressed tar archives cannot be read at random positions without decompressing everything before them, 
+    so the members are parsed in archive order while the archive is streamed once.
+
+    Parameters:
+        - parser (callable): A function that takes an input name or an open text stream and returns the parsed data.
+        - archive (str): Path of the tar archive.
+        - members (list of str): The member names to parse.
+
+    Returns:
+        - dict: The parsed data keyed by 'archive::member'.
+    """
+    wanted = set(members)
+    results = {}
+    with tarfile.open(archive, "r:*") as tar:
+        for entry in tar:
+            if entry.name in wanted:
+                stream = tar.extractfile(entry)
+                decompressor = input_decompressor(entry.name)
+                if decompressor is not None:
+                    stream = decompressor(stream)
+                with io.TextIOWrapper(stream) as data:
+                    results[archive + ARCHIVE_SEPARATOR + entry.name] = parser(data)
+    missing = wanted.difference(name.split(ARCHIVE_SEPARATOR, 1)[1] for name in results)
+    if missing:
+        raise FileNotFoundError(f"{', '.join(sorted(missing))} not found in '{archive}'.")
+    return results
+
+
+"""
+@brief Number of displacement rows converted to floats at once by `parse_thermal_displacements`.
+"""
+PARSE_BLOCK_ROWS = 1 << 16
+
+
+
+def parse_thermal_displacements(file_name):
+    """
+    @brief Parses a PHONOPY thermal_displacements.yaml or thermal_displacement_matrices.yaml file in a single streaming pass.
+
+    The file is read line by line exactly once. Temperatures are taken from the `- temperature:` entries
+    and the displacement rows (`- [ x, y, z ] # atom n`, or `- [ xx, yy, zz, yz, xz, xy ] # atom n` for the 
+    displacement matrices) are collected between their brackets, so the parser does not depend on column 
+    widths and accepts any float notation (including scientific). The `displacement_matrices_cif` rows, 
+    which repeat the matrices in crystallographic axes, are skipped.
+    Rows are converted to floats in blocks of `PARSE_BLOCK_ROWS`, so the text of the whole file is never 
+    held in memory. No intermediate files are written.
+
+    Parameters:
+        - file_name (str or file object): Path of the thermal-displacements file, an 'archive::member' name or 
+          an open text stream (see `open_input`).
+
+    Returns:
+        - tuple (numpy.ndarray, numpy.ndarray): The temperature vector of shape `(n_temperatures,)` and a
+          contiguous array of mean-square displacements of shape `(n_temperatures, natom, 3)`, or of shape 
+          `(n_temperatures, natom, 6)` for displacement matrices (Cartesian xx, yy, zz, yz, xz, xy, so the 
+          first three components are the diagonal).
+
+    Raises:
+        - ValueError: If the number of parsed values does not match `natom` and the temperature count.
+
+    Example usage:
+        temperatures, displacements = parse_thermal_displacements("thermal_displacements.yaml-2")
+    """
+    natom = None
+    components = 3
+    temperatures = []
+    rows = []
+    blocks = []
+    collect = True
+    with open_input(file_name) as data:
+        for line in data:
+            stripped = line.lstrip()
+            if stripped.startswith("- ["):
+                if not collect:
+                    continue
+                rows.append(stripped[3:stripped.find("]")])
+                if len(rows) == PARSE_BLOCK_ROWS:
+                    blocks.append(np.fromstring(",".join(rows), dtype=float, sep=","))
+                    rows = []
+            elif stripped.startswith("- temperature:"):
+                temperatures.append(float(stripped[14:]))
+                collect = True
+            elif stripped.startswith("displacement_matrices_cif:"):
+                collect = False
+            elif stripped.startswith("thermal_displacement_matrices:"):
+                components = 6
+            elif stripped.startswith("natom:"):
+                natom = int(stripped[6:])
+    if rows:
+        blocks.append(np.fromstring(",".join(rows), dtype=float, sep=","))
+
+    values = np.concatenate(blocks) if len(blocks) > 1 else (blocks[0] if blocks else np.empty(0))
+    n_temperatures = len(temperatures)
+    if natom is None:
+        # Every row holds the components of one atom
+        natom = values.size // (n_temperatures * components) if n_temperatures else 0
+    if n_temperatures == 0 or values.size != n_temperatures * natom * components:
+        raise ValueError(f"Unexpected thermal displacements layout in '{getattr(file_name, 'name', file_name)}': "
+                         f"{values.size} values for {n_temperatures} temperatures and {natom} atoms.")
+
+    return np.array(temperatures), values.reshape(n_temperatures, natom, components)
+
+
+
+def parse_displacement_arrays(file_name):
+    """
+    @brief Parses a thermal-displacements file into the named arrays stored in the input cache.
+
+    Parameters:
+        - file_name (str or file object): The thermal-displacements input (see `open_input`).
+
+    Returns:
+        - dict: `temperatures` of shape `(n_temperatures,)` and `displacements` of shape `(n_temperatures, natom, 3)` 
+          (or `(n_temperatures, natom, 6)` for displacement matrices).
+
+    Example usage:
+        arrays = parse_displacement_arrays("thermal_displacements.yaml-2")
+    """
+    temperatures, displacements = parse_thermal_displacements(file_name)
+    return {"temperatures": temperatures, "displacements": displacements}
+
+
+
+def read_displacement_header(file_name):
+    """
+    @brief Reads the header of a thermal-displacements file without parsing the displacement data.
+
+    Reading stops after the second `- temperature:` entry, so only the first few lines of the file are read.
+
+    Parameters:
+        - file_name (str or file object): The thermal-displacements input (see `open_input`).
+
+    Returns:
+        - dict: `natom` (int or None), `freq_min` (float or None), `components` (3 for displacements, 6 for 
+          displacement matrices) and `temperatures`, the first (at most two) temperatures, which give the start 
+          and the step of the temperature grid.
+
+    Example usage:
+        header = read_displacement_header("thermal_displacements.yaml-2")
+    """
+    header = {"natom": None, "freq_min": None, "components": 3, "temperatures": []}
+    with open_input(file_name) as data:
+        for line in data:
+            stripped = line.lstrip()
+            if stripped.startswith("natom:"):
+                header["natom"] = int(stripped[6:])
+            elif stripped.startswith("freq_min:"):
+                header["freq_min"] = float(stripped[9:])
+            elif stripped.startswith("thermal_displacement_matrices:"):
+                header["components"] = 6
+            elif stripped.startswith("- temperature:"):
+                header["temperatures"].append(float(stripped[14:]))
+                if len(header["temperatures"]) == 2:
+                    break
+    return header
+
+
+
+def input_stamp(file_name):
+    """
+    @brief Returns the modification time and size of a file (of the archive for an 'archive::member' name).
+    """
+    stat = os.stat(split_archive_member(file_name)[0])
+    return stat.st_mtime_ns, stat.st_size
+
+
+
+def read_columns(file_name):
+    """
+    @brief Reads a whitespace separated numeric text file (e-v.txt, volume-temperature.dat) into an array.
+
+    The file is read in one NumPy call; blank lines and comments starting with `#` are skipped.
+
+    Parameters:
+        - file_name (str or file object): The text file input (see `open_input`).
+
+    Returns:
+        - dict: `columns`, a two-dimensional array with one row per data line of the file.
+
+    Raises:
+        - ValueError: If the rows have different numbers of columns or contain non-numeric values.
+
+    Example usage:
+        columns = read_columns("e-v.txt")["columns"]
+    """
+    with open_input(file_name) as data:
+        return {"columns": np.loadtxt(data, dtype=float, comments="#", ndmin=2)}
+
+
+
+def read_temperature_volume(columns, file_name=""):
+    """
+    @brief Splits the columns of a V(T) file into its temperature grid and volume curves.
+
+    The first column holds the temperatures, every further column one V(T) curve (e.g. for several 
+    pressures or exchange-correlation functionals).
+
+    Parameters:
+        - columns (numpy.ndarray): The `read_columns` array of the file.
+        - file_name (str): The file name used in error messages.
+
+    Returns:
+        - tuple (numpy.ndarray, numpy.ndarray): The temperatures of shape `(n_temperatures,)` and the volumes of 
+          shape `(n_temperatures, n_curves)`; both are views of `columns`.
+
+    Raises:
+        - ValueError: If the file has fewer than two columns or the temperatures do not strictly increase.
+
+    Example usage:
+        temperatures, volumes = read_temperature_volume(read_columns("volume-temperature.dat")["columns"])
+    """
+    if columns.shape[1] < 2:
+        raise ValueError(f"'{file_name}' needs a temperature column and at least one volume column.")
+    temperatures = columns[:, 0]
+    if np.any(np.diff(temperatures) <= 0):
+        raise ValueError(f"The temperatures in '{file_name}' do not increase monotonically.")
+    return temperatures, columns[:, 1:]
+
+
+
+def read_experimental_data(file_name):
+    """
+    @brief Reads an experimental data file with temperatures, values and optional error bars.
+
+    Parameters:
+        - file_name (str or file object): The experimental data input (see `open_input`), with the temperature in 
+          the first column, the measured value in the second and, optionally, its uncertainty in the third.
+
+    Returns:
+        - tuple (numpy.ndarray, numpy.ndarray, numpy.ndarray or None): The temperatures, the values and the 
+          uncertainties (None if the file has only two columns).
+
+    Example usage:
+        temperatures, values, errors = read_experimental_data("experiment.txt")
+    """
+    columns = read_columns(file_name)["columns"]
+    if columns.shape[1] < 2:
+        raise ValueError(f"'{getattr(file_name, 'name', file_name)}' needs at least two columns.")
+    errors = columns[:, 2] if columns.shape[1] > 2 else None
+    return columns[:, 0], columns[:, 1], errors
+
+
+
+def read_primitive_cell(file_name):
+    """
+    @brief Reads the primitive cell of a phonopy.yaml file line by line.
+
+    Only the file header up to the end of the `primitive_cell:` block is read; the reader stops at its 
+    `reciprocal_lattice:` entry (or at the next top-level key), so the supercell and force-constant sections 
+    of large files are never touched. Lattice rows and coordinates are read between their brackets.
+
+    Parameters:
+        - file_name (str or file object): The phonopy.yaml input (see `open_input`).
+
+    Returns:
+        - dict: `symbols` (natom,), `numbers` (natom,), `masses` (natom,), fractional `coordinates` (natom, 3) 
+          and `lattice` vectors (3, 3) as rows, in Angstrom.
+
+    Raises:
+        - ValueError: If the file has no complete primitive cell.
+
+    Example usage:
+        cell = read_primitive_cell("phonopy.yaml")
+    """
+    lattice = []
+    symbols = []
+    numbers = []
+    coordinates = []
+    masses = []
+    section = None
+    in_cell = False
+    with open_input(file_name) as data:
+        for line in data:
+            if not in_cell:
+                in_cell = line.startswith("primitive_cell:")
+                continue
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if not line[0].isspace() or stripped.startswith("reciprocal_lattice:"):
+                break
+
+            if stripped.startswith("lattice:"):
+                section = "lattice"
+            elif stripped.startswith("points:"):
+                section = "points"
+            elif section == "lattice" and stripped.startswith("- ["):
+                lattice.append([float(value) for value in stripped[3:stripped.find("]")].split(",")])
+            elif stripped.startswith("- symbol:"):
+                symbol, _, number = stripped[9:].partition("#")
+                symbols.append(symbol.strip())
+                numbers.append(int(number) if number.strip() else len(symbols))
+            elif stripped.startswith("coordinates:"):
+                coordinates.append([float(value) for value in stripped[stripped.find("[") + 1:stripped.find("]")].split(",")])
+            elif stripped.startswith("mass:"):
+                masses.append(float(stripped[5:]))
+
+    if not symbols or len(lattice) != 3 or not len(symbols) == len(coordinates) == len(masses):
+        raise ValueError(f"No complete primitive cell found in '{getattr(file_name, 'name', file_name)}'.")
+
+    return {"symbols": np.array(symbols, dtype=str),
+            "numbers": np.array(numbers, dtype=int),
+            "masses": np.array(masses, dtype=float),
+            "coordinates": np.array(coordinates, dtype=float),
+            "lattice": np.array(lattice, dtype=float)}
+
+
+
+"""
+@brief Default size cap of the on-disk input cache in bytes.
+
+The cap can be overridden with the TRIMEPH_CACHE_LIMIT_MB environment variable.
+"""
+CACHE_SIZE_LIMIT = 2 * 1024 ** 3
+
+"""
+@brief Version of the cached array layout; entries written with another version are ignored.
+"""
+CACHE_VERSION = 1
+
+"""
+@brief Minimum total size in bytes of the files to parse before a worker pool is started.
+
+Starting worker processes costs more than parsing a few small files, so small inputs are parsed directly.
+"""
+PARALLEL_INGEST_MIN_BYTES = 16 * 1024 ** 2
+
+
+
+def parse_files(parser, file_names):
+    """
+    @brief Parses several files, in parallel on a process pool when the input is large enough.
+
+    The files are distributed over up to `os.cpu_count()` worker processes. Members of the same tar archive are 
+    parsed together by one worker in a single pass over the archive (see `parse_tar_members`). The results are 
+    returned in the order of `file_names`, whatever order the workers finish in. Inputs smaller than 
+    `PARALLEL_INGEST_MIN_BYTES` in total, or a single task, are parsed in the calling process.
+
+    Parameters:
+        - parser (callable): A module-level function that takes a file name and returns the parsed data.
+        - file_names (list of str): The files to parse.
+
+    Returns:
+        - list: The parsed data of each file, in the order of `file_names`.
+
+    Example usage:
+        results = parse_files(parse_displacement_arrays, ["thermal_displacements.yaml-2", "thermal_displacements.yaml-3"])
+    """
+    tar_members = {}
+    for file_name in file_names:
+        if is_tar_member(file_name):
+            archive, member = split_archive_member(file_name)
+            tar_members.setdefault(archive, []).append(member)
+    plain_files = [file_name for file_name in file_names if not is_tar_member(file_name)]
+    tasks = [(parse_tar_members, (parser, archive, members)) for archive, members in tar_members.items()]
+    tasks += [(parser, (file_name,)) for file_name in plain_files]
+
+    workers = min(len(tasks), os.cpu_count() or 1)
+    total_size = sum(os.path.getsize(archive) for archive in tar_members) + sum(input_size(file_name) for file_name in plain_files)
+    if workers < 2 or total_size < PARALLEL_INGEST_MIN_BYTES:
+        outcomes = [function(*arguments) for function, arguments in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = [future.result() for future in [pool.submit(function, *arguments) for function, arguments in tasks]]
+
+    results = {}
+    for outcome in outcomes[:len(tar_members)]:
+        results.update(outcome)
+    results.update(zip(plain_files, outcomes[len(tar_members):]))
+    return [results[file_name] for file_name in file_names]
+
+
+
+class InputCache:
+    """
+    @brief Content-addressed on-disk cache of parsed input files.
+
+    Every entry is a directory of `.npy` files named after the BLAKE2 hash of the input file content, the kind of 
+    the parsed data and the cache layout version. Archive members are keyed by the hash of the archive and the 
+    member name. The content hash of a path is remembered together with its modification time and size, so 
+    unchanged files are not hashed twice. Cached arrays are opened memory-mapped, 
+    and the least recently used entries are evicted once the cache grows beyond its size cap.
+
+    Methods:
+        - key(self, file_name): Returns the content hash of a file.
+        - load(self, file_name, kind): Returns the cached arrays of a file, or None.
+        - store(self, file_name, kind, arrays): Writes parsed arrays to the cache.
+        - fetch(self, file_name, kind, parser): Returns cached arrays, parsing and storing them on a miss.
+        - evict(self): Removes the least recently used entries above the size cap.
+    """
+
+    def __init__(self, directory=None, size_limit=None):
+        """
+        @brief Initializes the cache in the given directory.
+
+        @param directory: The cache directory. Defaults to TRIMEPH_CACHE_DIR or the user cache directory.
+        @param size_limit: The size cap in bytes. Defaults to TRIMEPH_CACHE_LIMIT_MB or `CACHE_SIZE_LIMIT`.
+
+        Example usage:
+            cache = InputCache()
+        """
+        if directory is None:
+            directory = os.environ.get("TRIMEPH_CACHE_DIR")
+        if directory is None:
+            if sys.platform.startswith("win"):
+                root = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+            else:
+                root = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+            directory = os.path.join(root, "TriMEph")
+        if size_limit is None:
+            limit_mb = os.environ.get("TRIMEPH_CACHE_LIMIT_MB")
+            size_limit = int(float(limit_mb) * 1024 ** 2) if limit_mb else CACHE_SIZE_LIMIT
+
+        self.directory = directory
+        self.size_limit = size_limit
+        self.digests = {}
+
+    def key(self, file_name):
+        """
+        @brief Returns the content hash of a file, reusing the last hash while its modification time and size are unchanged.
+
+        @param file_name: Path of the input file, or an 'archive::member' name.
+        @return: The hexadecimal BLAKE2 digest of the file content.
+        """
+        archive, member = split_archive_member(file_name)
+        stat = os.stat(archive)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        known = self.digests.get(archive)
+        if known is None or known[0] != stamp:
+            digest = hashlib.blake2b(digest_size=20)
+            with open(archive, "rb") as data:
+                for block in iter(lambda: data.read(1 << 20), b""):
+                    digest.update(block)
+            known = (stamp, digest.hexdigest())
+            self.digests[archive] = known
+
+        if member is None:
+            return known[1]
+        return hashlib.blake2b((known[1] + ARCHIVE_SEPARATOR + member).encode(), digest_size=20).hexdigest()
+
+    def entry(self, file_name, kind):
+        """
+        @brief Returns the directory of the cache entry of a file and kind.
+        """
+        return os.path.join(self.directory, f"{self.key(file_name)}-{kind}-v{CACHE_VERSION}")
+
+    def load(self, file_name, kind):
+        """
+        @brief Opens the cached arrays of a file memory-mapped.
+
+        @param file_name: Path of the input file.
+        @param kind: Name of the parsed data (e.g. 'displacements').
+        @return: A dict of read-only memory-mapped arrays, or None if the entry does not exist.
+        """
+        try:
+            entry = self.entry(file_name, kind)
+            if not os.path.isdir(entry):
+                return None
+            arrays = {}
+            for name in os.listdir(entry):
+                if name.endswith(".npy"):
+                    arrays[name[:-4]] = np.load(os.path.join(entry, name), mmap_mode="r")
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+        return arrays
+
+    def store(self, file_name, kind, arrays):
+        """
+        @brief Writes parsed arrays to the cache and evicts old entries above the size cap.
+
+        The entry is written to a temporary directory first and renamed into place, so readers never see 
+        partially written entries. Failures (e.g. a read-only cache directory) are ignored.
+
+        @param file_name: Path of the input file.
+        @param kind: Name of the parsed data.
+        @param arrays: A dict of NumPy arrays.
+        """
+        try:
+            entry = self.entry(file_name, kind)
+            os.makedirs(self.directory, exist_ok=True)
+            staging = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+            for name, array in arrays.items():
+                np.save(os.path.join(staging, name + ".npy"), np.asarray(array))
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)
+            self.evict()
+        except OSError:
+            return
+
+    def fetch(self, file_name, kind, parser):
+        """
+        @brief Returns the cached arrays of a file, parsing and storing them on a cache miss.
+
+        @param file_name: Path of the input file.
+        @param kind: Name of the parsed data.
+        @param parser: A callable that takes the file name and returns a dict of arrays.
+        @return: A dict of arrays.
+
+        Example usage:
+            arrays = cache.fetch("e-v.txt", "columns", read_columns)
+        """
+        arrays = self.load(file_name, kind)
+        if arrays is None:
+            arrays = parser(file_name)
+            self.store(file_name, kind, arrays)
+        return arrays
+
+    def evict(self):
+        """
+        @brief Removes the least recently used entries until the cache fits into its size cap.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, item)) for item in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+            total += size
+
+        for _, size, path in sorted(entries):
+            if total <= self.size_limit:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+
+def load_displacements(cache, file_names, sequential=False):
+    """
+    @brief Returns the parsed thermal-displacement arrays of several files.
+
+    Cached files are opened memory-mapped from the cache; the others are parsed by `parse_files`, stored and 
+    reopened memory-mapped, so the parsed arrays do not stay in memory. With `sequential`, the files are 
+    parsed one at a time, which bounds the memory to one parsed file.
+
+    Parameters:
+        - cache (InputCache): The input cache.
+        - file_names (list of str): The thermal-displacements files.
+        - sequential (bool): Parse one file at a time instead of all files at once.
+
+    Returns:
+        - dict: The `parse_displacement_arrays` result of every file, keyed by the file name.
+
+    Example usage:
+        arrays = load_displacements(InputCache(), ["thermal_displacements.yaml-2"])
+    """
+    arrays = {file_name: cache.load(file_name, "displacements") for file_name in file_names}
+    missing = [file_name for file_name in file_names if arrays[file_name] is None]
+    batches = [[file_name] for file_name in missing] if sequential else [missing]
+    for batch in batches:
+        for file_name, parsed in zip(batch, parse_files(parse_displacement_arrays, batch)):
+            cache.store(file_name, "displacements", parsed)
+            arrays[file_name] = cache.load(file_name, "displacements") or parsed
+    return arrays
+
+
+
+"""
+@brief Version of the session file layout; sessions written with a newer version are rejected.
+"""
+SESSION_VERSION = 1
+
+
+
+def save_session(file_name, arrays, metadata):
+    """
+    @brief Writes a session into one compressed NumPy archive.
+
+    The arrays are stored as `.npy` members and the metadata as a JSON string in the `metadata` member, 
+    so the session can be read back without unpickling anything.
+
+    Parameters:
+        - file_name (str): Path of the session file (written as given, without adding an extension).
+        - arrays (dict): Named NumPy arrays.
+        - metadata (dict): JSON-serializable metadata.
+
+    Example usage:
+        save_session("study.trimeph", {"factor": factors}, {"atom_names": ["Fe"]})
+    """
+    metadata = dict(metadata, version=SESSION_VERSION)
+    with open(file_name, "wb") as session:
+        np.savez_compressed(session, metadata=np.array(json.dumps(metadata)), **arrays)
+
+
+
+def load_session(file_name):
+    """
+    @brief Reads a session written by `save_session`.
+
+    Parameters:
+        - file_name (str): Path of the session file.
+
+    Returns:
+        - tuple (dict, dict): The arrays and the metadata.
+
+    Raises:
+        - ValueError: If the file is not a session file or was written by a newer version.
+
+    Example usage:
+        arrays, metadata = load_session("study.trimeph")
+    """
+    try:
+        with np.load(file_name, allow_pickle=False) as session:
+            arrays = {name: session[name] for name in session.files}
+    except (zipfile.BadZipFile, EOFError) as error:
+        raise ValueError(f"'{file_name}' is not a TriMEph session file.") from error
+    if "metadata" not in arrays:
+        raise ValueError(f"'{file_name}' is not a TriMEph session file.")
+    metadata = json.loads(str(arrays.pop("metadata")))
+    if metadata.get("version", 0) > SESSION_VERSION:
+        raise ValueError(f"'{file_name}' was written by a newer version of TriMEph.")
+    return arrays, metadata
+
+
+
+def species_averages(names, *quantities):
+    """
+    @brief Averages per-atom quantities over the atoms of each chemical species.
+
+    Parameters:
+        - names (list of str): The species of every atom.
+        - quantities (numpy.ndarray): Arrays with one row per atom.
+
+    Returns:
+        - tuple: The species names (in order of first appearance) followed by one averaged array per quantity, 
+          with one row per species.
+
+    Example usage:
+        species, factor = species_averages(["Fe", "Fe", "O"], factors)
+    """
+    species, first, inverse = np.unique(np.asarray(names), return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    counts = np.bincount(inverse)
+    averages = []
+    for quantity in quantities:
+        sums = np.zeros((len(species),) + quantity.shape[1:])
+        np.add.at(sums, inverse, quantity)
+        averages.append((sums / counts.reshape((-1,) + (1,) * (quantity.ndim - 1)))[order])
+    return (species[order].tolist(), *averages)
+
+
+
+def export_results(file_name, layout, temperatures, labels, msd, factor, msd_band=None, factor_band=None):
+    """
+    @brief Writes the MSD and Mossbauer factor of all atoms (or species) in one operation.
+
+    With confidence bands, every text column is followed by its `_low` and `_high` bounds (e.g. `f, f_low, 
+    f_high`) and the archive gets the arrays `msd_band` and `factor_band`.
+
+    Layouts:
+        - 'wide': Tab-separated text with one row per temperature and the columns 
+          `T, <label>_msd_x, <label>_msd_y, <label>_msd_z, <label>_f` for every label.
+        - 'long': Tab-separated text with one row per label and temperature and the columns 
+          `label, T, msd_x, msd_y, msd_z, f`.
+        - 'npz': A compressed NumPy archive with the arrays `temperatures`, `labels`, `msd` and `factor`.
+
+    Parameters:
+        - file_name (str): The output path.
+        - layout (str): 'wide', 'long' or 'npz'.
+        - temperatures (numpy.ndarray): The temperatures, shape `(n_temperatures,)`.
+        - labels (list of str): One label per atom or species.
+        - msd (numpy.ndarray): The mean square displacements, shape `(n_labels, n_temperatures, 3)`.
+        - factor (numpy.ndarray): The Mossbauer factors, shape `(n_labels, n_temperatures)`.
+        - msd_band (numpy.ndarray or None): Lower and upper MSD bounds, shape `(2, n_labels, n_temperatures, 3)`.
+        - factor_band (numpy.ndarray or None): Lower and upper factor bounds, shape `(2, n_labels, n_temperatures)`.
+
+    Example usage:
+        export_results("results.tsv", "wide", temperatures, ["Fe1", "Fe2"], msd, factor)
+    """
+    if layout == "npz":
+        bands = {} if msd_band is None else {"msd_band": msd_band, "factor_band": factor_band}
+        with open(file_name, "wb") as output:
+            np.savez_compressed(output, temperatures=temperatures, labels=np.array(labels), msd=msd, factor=factor, **bands)
+        return
+
+    values = np.concatenate([msd, factor[:, :, np.newaxis]], axis=2)
+    names = ["msd_x", "msd_y", "msd_z", "f"]
+    if msd_band is not None:
+        bounds = np.concatenate([msd_band, factor_band[..., np.newaxis]], axis=3)
+        values = np.stack([values, bounds[0], bounds[1]], axis=3).reshape(values.shape[:2] + (-1,))
+        names = [f"{name}{suffix}" for name in names for suffix in ("", "_low", "_high")]
+    if layout == "wide":
+        header = "\t".join(["T"] + [f"{label}_{column}" for label in labels for column in names])
+        table = np.column_stack([temperatures, values.transpose(1, 0, 2).reshape(len(temperatures), -1)])
+        np.savetxt(file_name, table, fmt="%0.10f", delimiter="\t", header=header, comments="")
+    else:
+        columns = ("T", *names)
+        label_length = max(len(label) for label in labels)
+        table = np.empty(values.shape[0] * values.shape[1], dtype=[("label", f"U{label_length}")] + [(column, float) for column in columns])
+        table["label"] = np.repeat(labels, values.shape[1])
+        table["T"] = np.tile(temperatures, values.shape[0])
+        for index, column in enumerate(columns[1:]):
+            table[column] = values[:, :, index].ravel()
+        np.savetxt(file_name, table, fmt=["%s"] + ["%0.10f"] * len(columns), delimiter="\t", 
+                   header="\t".join(("label",) + columns), comments="")
+
+
+
+def run_file_kind(name):
+    """
+    @brief Returns the kind of a file of a PHONOPY run directory from its name.
+
+    Returns:
+        - str or None: 'displacements' (`thermal_displacements*.yaml*`), 'phonopy' (`phonopy*.yaml`), 'ev' 
+          (`e-v*`), 'vt' (`volume-temperature*`) or None for other files.
+    """
+    if name.startswith("thermal_displacements") and ".yaml" in name:
+        return "displacements"
+    if re.match(r"phonopy.*\.yaml", name):
+        return "phonopy"
+    if name.startswith("e-v"):
+        return "ev"
+    if name.startswith("volume-temperature"):
+        return "vt"
+    return None
+
+
+
+def volume_suffix(name):
+    """
+    @brief Returns the volume index `N` of a `thermal_displacements.yaml-N` name, or 0 without one.
+    """
+    match = re.search(r'yaml-(-?\d+)', name)
+    if match:
+        return int(match.group(1))
+    return 0
+
+
+
+def unique_volume_files(file_names):
+    """
+    @brief Keeps one thermal-displacements file per volume index.
+
+    Copies of the same volume (e.g. `thermal_displacements.yaml-5` and `thermal_displacements.yaml-5.gz`) are 
+    reduced to the uncompressed file, or to the first name if all copies are compressed.
+
+    Returns:
+        - tuple (list, list): The kept files, ordered by volume index, and the dropped copies.
+    """
+    kept = {}
+    for name in sorted(file_names, key=lambda name: (input_decompressor(name) is not None, name)):
+        kept.setdefault(volume_suffix(name), name)
+    chosen = set(kept.values())
+    return [kept[index] for index in sorted(kept)], [name for name in file_names if name not in chosen]
+
+
+
+def volume_rows(file_names):
+    """
+    @brief Maps thermal-displacements files to their e-v rows.
+
+    The file `thermal_displacements.yaml-N` belongs to the row `N - N0`, where `N0` is the lowest volume index 
+    of the files. Run directories and watch mode both use this rule.
+
+    Returns:
+        - dict: The e-v row of every file name.
+    """
+    if not file_names:
+        return {}
+    first = min(volume_suffix(name) for name in file_names)
+    return {name: volume_suffix(name) - first for name in file_names}
+
+
+
+def scan_run_directory(directory, cache):
+    """
+    @brief Groups the input files of a PHONOPY run directory.
+
+    The files directly inside the directory are matched by name: the structure file (`phonopy*.yaml`, 
+    preferring `phonopy.yaml`), the thermal-displacements files (`thermal_displacements*.yaml*`), the e-v 
+    file (`e-v*`) and the V(T) file (`volume-temperature*`). The e-v file is read through the cache to 
+    count its volumes.
+
+    Parameters:
+        - directory (str): The run directory.
+        - cache (InputCache): The input cache.
+
+    Returns:
+        - dict: `phonopy`, `displacements`, `ev` and `vt` (lists of paths, sorted by name; `displacements` 
+          by volume index), `duplicates`, the dropped copies of a volume (see `unique_volume_files`), and 
+          `volumes`, the volume column of the first e-v file (or None).
+
+    Example usage:
+        run = scan_run_directory("examples", InputCache())
+    """
+    run = {"phonopy": [], "displacements": [], "ev": [], "vt": [], "duplicates": [], "volumes": None}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            continue
+        kind = run_file_kind(name)
+        if kind is not None:
+            run[kind].append(path)
+
+    preferred = [path for path in run["phonopy"] if os.path.basename(path) == "phonopy.yaml"]
+    run["phonopy"] = (preferred or run["phonopy"])[:1]
+    run["displacements"], run["duplicates"] = unique_volume_files(run["displacements"])
+    if run["ev"]:
+        run["volumes"] = np.array(cache.fetch(run["ev"][0], "columns", read_columns)["columns"][:, 0])
+    return run
+
+
+
+
+"""
+@brief Mossbauer transitions: label -> (element, gamma energy in keV, recoil energy in eV).
+
+The recoil energy is `E_gamma^2 / (2 M c^2)` with the mass `M` of the isotope. The first transition listed 
+for an element is its default (see `map_names_to_numbers`). The table holds the commonly used transitions 
+(gamma energies below about 170 keV), not every known one; further lines can be added as new entries.
+"""
+MOSSBAUER_ISOTOPES = {
+    "40K 29.83 keV": ("K", 29.83, 1.19516e-02),
+    "57Fe 14.41 keV": ("Fe", 14.4125, 1.95883310e-03),
+    "61Ni 67.41 keV": ("Ni", 67.41, 4.00313e-02),
+    "67Zn 93.31 keV": ("Zn", 93.31, 6.98303e-02),
+    "73Ge 13.28 keV": ("Ge", 13.28, 1.29813e-03),
+    "73Ge 68.75 keV": ("Ge", 68.75, 3.47911e-02),
+    "83Kr 9.40 keV": ("Kr", 9.40, 5.72028e-04),
+    "99Ru 89.36 keV": ("Ru", 89.36, 4.33365e-02),
+    "101Ru 127.23 keV": ("Ru", 127.23, 8.61100e-02),
+    "119Sn 23.87 keV": ("Sn", 23.87, 2.57423e-03),
+    "121Sb 37.13 keV": ("Sb", 37.13, 6.122e-03),
+    "125Te 35.49 keV": ("Te", 35.49, 5.41283e-03),
+    "129I 27.77 keV": ("I", 27.77, 3.218e-03),
+    "127I 57.60 keV": ("I", 57.60, 1.40332e-02),
+    "129Xe 39.58 keV": ("Xe", 39.58, 6.52338e-03),
+    "131Xe 80.19 keV": ("Xe", 80.19, 2.63678e-02),
+    "133Cs 81.00 keV": ("Cs", 81.00, 2.64982e-02),
+    "139La 165.86 keV": ("La", 165.86, 1.06304e-01),
+    "141Pr 145.4 keV": ("Pr", 145.4, 8.05349e-02),
+    "145Nd 67.25 keV": ("Nd", 67.25, 1.67521e-02),
+    "145Nd 72.50 keV": ("Nd", 72.50, 1.94697e-02),
+    "149Sm 22.50 keV": ("Sm", 22.50, 1.82478e-03),
+    "147Sm 121.22 keV": ("Sm", 121.22, 5.36874e-02),
+    "152Sm 121.78 keV": ("Sm", 121.78, 5.23996e-02),
+    "154Sm 81.98 keV": ("Sm", 81.98, 2.34371e-02),
+    "151Eu 21.54 keV": ("Eu", 21.54, 1.65019e-03),
+    "153Eu 83.37 keV": ("Eu", 83.37, 2.43973e-02),
+    "153Eu 97.43 keV": ("Eu", 97.43, 3.33202e-02),
+    "153Eu 103.18 keV": ("Eu", 103.18, 3.73691e-02),
+    "155Gd 86.55 keV": ("Gd", 86.55, 2.59543e-02),
+    "155Gd 105.31 keV": ("Gd", 105.31, 3.84250e-02),
+    "157Gd 63.93 keV": ("Gd", 63.93, 1.39801e-02),
+    "154Gd 123.07 keV": ("Gd", 123.07, 5.28198e-02),
+    "156Gd 88.97 keV": ("Gd", 88.97, 2.72502e-02),
+    "158Gd 79.51 keV": ("Gd", 79.51, 2.14875e-02),
+    "160Gd 75.26 keV": ("Gd", 75.26, 1.90106e-02),
+    "159Tb 58.00 keV": ("Tb", 58.00, 1.13619e-02),
+    "161Dy 25.65 keV": ("Dy", 25.65, 2.19450e-03),
+    "161Dy 74.57 keV": ("Dy", 74.57, 1.85477e-02),
+    "160Dy 86.79 keV": ("Dy", 86.79, 2.52821e-02),
+    "162Dy 80.66 keV": ("Dy", 80.66, 2.15669e-02),
+    "164Dy 73.39 keV": ("Dy", 73.39, 1.76363e-02),
+    "165Ho 94.70 keV": ("Ho", 94.70, 2.91870e-02),
+    "166Er 80.56 keV": ("Er", 80.56, 2.09944e-02),
+    "164Er 91.40 keV": ("Er", 91.40, 2.73543e-02),
+    "167Er 79.32 keV": ("Er", 79.32, 2.02309e-02),
+    "168Er 79.80 keV": ("Er", 79.80, 2.03545e-02),
+    "170Er 78.59 keV": ("Er", 78.59, 1.95092e-02),
+    "169Tm 8.41 keV": ("Tm", 8.41, 2.24732e-04),
+    "170Yb 84.26 keV": ("Yb", 84.26, 2.24259e-02),
+    "171Yb 66.73 keV": ("Yb", 66.73, 1.39829e-02),
+    "174Yb 76.47 keV": ("Yb", 76.47, 1.80458e-02),
+    "172Yb 78.74 keV": ("Yb", 78.74, 1.93559e-02),
+    "176Yb 82.13 keV": ("Yb", 82.13, 2.05789e-02),
+    "175Lu 113.81 keV": ("Lu", 113.81, 3.97429e-02),
+    "176Lu 88.34 keV": ("Lu", 88.34, 2.38086e-02),
+    "178Hf 93.18 keV": ("Hf", 93.18, 2.61910e-02),
+    "176Hf 88.35 keV": ("Hf", 88.35, 2.38141e-02),
+    "177Hf 112.95 keV": ("Hf", 112.95, 3.87016e-02),
+    "180Hf 93.33 keV": ("Hf", 93.33, 2.59830e-02),
+    "181Ta 6.24 keV": ("Ta", 6.24, 1.15506e-04),
+    "182W 100.10 keV": ("W", 100.10, 2.95604e-02),
+    "183W 46.48 keV": ("W", 46.48, 6.33854e-03),
+    "180W 103.65 keV": ("W", 103.65, 3.20468e-02),
+    "184W 111.21 keV": ("W", 111.21, 3.60891e-02),
+    "186W 122.64 keV": ("W", 122.64, 4.34158e-02),
+    "187Re 134.24 keV": ("Re", 134.24, 5.17386e-02),
+    "189Os 69.54 keV": ("Os", 69.54, 1.37371e-02),
+    "186Os 137.16 keV": ("Os", 137.16, 5.43050e-02),
+    "188Os 155.03 keV": ("Os", 155.03, 6.86382e-02),
+    "191Ir 82.40 keV": ("Ir", 82.40, 1.9094e-02),
+    "191Ir 129.40 keV": ("Ir", 129.40, 4.70668e-02),
+    "193Ir 73.04 keV": ("Ir", 73.04, 1.48401e-02),
+    "195Pt 98.86 keV": ("Pt", 98.86, 2.69076e-02),
+    "197Au 77.35 keV": ("Au", 77.35, 1.63049e-02),
+    "201Hg 32.19 keV": ("Hg", 32.19, 2.76758e-03),
+    "232Th 49.37 keV": ("Th", 49.37, 5.63841e-03),
+    "231Pa 84.21 keV": ("Pa", 84.21, 1.64755e-02),
+    "238U 44.92 keV": ("U", 44.92, 4.54988e-03),
+    "234U 43.50 keV": ("U", 43.50, 4.33987e-03),
+    "236U 45.24 keV": ("U", 45.24, 4.65414e-03),
+    "237Np 59.54 keV": ("Np", 59.54, 8.02733e-03),
+    "239Pu 57.28 keV": ("Pu", 57.28, 7.36721e-03),
+    "240Pu 42.82 keV": ("Pu", 42.82, 4.09991e-03),
+    "243Am 83.90 keV": ("Am", 83.90, 1.55453e-02),
+}
+
+
+
+def direction_weights(directions):
+    """
+    @brief Returns the weights that project a displacement tensor on directions.
+
+    Parameters:
+        - directions (numpy.ndarray): Unit vectors, shape `(n_directions, 3)`.
+
+    Returns:
+        - numpy.ndarray: Weights of shape `(n_directions, 6)`, so that `weights @ [xx, yy, zz, yz, xz, xy]` is 
+          the mean square displacement `n . U . n` along every direction `n`. For diagonal displacements only 
+          the first three columns are used.
+    """
+    x, y, z = np.asarray(directions, dtype=float).T
+    return np.stack([x * x, y * y, z * z, 2 * y * z, 2 * x * z, 2 * x * y], axis=1)
+
+
+
+def spherical_directions(theta, phi):
+    """
+    @brief Returns the unit vectors of polar angles `theta` (from z) and azimuths `phi` (from x), in degrees.
+
+    The angles are broadcast against each other; the result has their shape with a last axis of 3.
+    """
+    theta, phi = np.radians(theta), np.radians(phi)
+    return np.stack(np.broadcast_arrays(np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)), axis=-1)
+
+
+
+def powder_quadrature(n_theta=12, n_phi=24):
+    """
+    @brief Returns directions and weights that average a function of the gamma-ray direction over a sphere.
+
+    Gauss-Legendre nodes in `cos(theta)` are combined with equally spaced azimuths, which integrate smooth 
+    periodic functions with spectral accuracy. The mean square displacement along `n` and `-n` is the same, so 
+    the upper hemisphere is enough.
+
+    Parameters:
+        - n_theta (int): The number of polar nodes.
+        - n_phi (int): The number of azimuths.
+
+    Returns:
+        - tuple (numpy.ndarray, numpy.ndarray): The directions, `(n_theta * n_phi, 3)`, and the weights, which 
+          sum to one.
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(n_theta)
+    theta = np.degrees(np.arccos((nodes + 1) / 2))
+    phi = (np.arange(n_phi) + 0.5) * 360 / n_phi
+    directions = spherical_directions(theta[:, np.newaxis], phi[np.newaxis, :]).reshape(-1, 3)
+    return directions, np.repeat(weights / 2 / n_phi, n_phi)
+
+
+
+def directional_factors(msd, d1, directions):
+    """
+    @brief Computes the Mossbauer factors of many atoms, temperatures and transitions along gamma-ray directions.
+
+    The factor along `n` is `exp(-0.5 * d1 * n.U.n)`, the convention of the default weighting in `Mfactor` 
+    (whose `0.5*z + 0.25*x + 0.25*y` is `n.U.n` averaged over the directions 45 degrees from z).
+
+    Parameters:
+        - msd (numpy.ndarray): Displacements in Angstrom^2, `(natom, n_temperatures, 3)` diagonal or 
+          `(natom, n_temperatures, 6)` tensors (see `parse_thermal_displacements`).
+        - d1 (numpy.ndarray): `(E_gamma / (hbar c))^2` in m^-2 of every transition and atom, `(n_rows, natom)`.
+        - directions (numpy.ndarray): Unit vectors, `(n_directions, 3)`.
+
+    Returns:
+        - numpy.ndarray: The factors, `(n_rows, natom, n_temperatures, n_directions)`.
+    """
+    projected = msd @ direction_weights(directions)[:, :msd.shape[-1]].T
+    return np.exp(-0.5 * projected * d1[:, :, np.newaxis, np.newaxis] * 1.0e-20)
+
+
+
+"""
+@brief Number of factors (rows x atoms x temperatures x directions) evaluated at once by `averaged_factors`.
+"""
+FACTOR_BLOCK = 1 << 22
+
+
+
+def averaged_factors(msd, d1, directions, weights):
+    """
+    @brief Averages the Mossbauer factors of `directional_factors` over weighted directions.
+
+    The temperatures are processed in blocks of at most `FACTOR_BLOCK` factors, so a fine powder 
+    quadrature does not need memory for every direction at once.
+
+    Returns:
+        - numpy.ndarray: The averaged factors, `(n_rows, natom, n_temperatures)`.
+    """
+    n_rows, natom = d1.shape
+    factors = np.empty((n_rows, natom, msd.shape[1]))
+    step = max(1, FACTOR_BLOCK // max(1, n_rows * natom * len(directions)))
+    for start in range(0, msd.shape[1], step):
+        factors[:, :, start:start + step] = directional_factors(msd[:, start:start + step], d1, directions) @ weights
+    return factors
+
+
+
+def mossbauer_factors(msd, d1, directions=None):
+    """
+    @brief Computes the Mossbauer factors of many atoms, temperatures and transitions.
+
+    Without directions the diagonal MSD are weighted `0.5*z + 0.25*x + 0.25*y`; otherwise the factors are 
+    averaged over the weighted gamma-ray directions by `averaged_factors`.
+
+    Parameters:
+        - msd (numpy.ndarray): Displacements in Angstrom^2, `(natom, n_temperatures, 3 or 6)`.
+        - d1 (numpy.ndarray): `(E_gamma / (hbar c))^2` in m^-2 of every transition and atom, `(n_rows, natom)`.
+        - directions (tuple or None): The directions and their weights (see `powder_quadrature`).
+
+    Returns:
+        - numpy.ndarray: The factors, `(n_rows, natom, n_temperatures)`.
+    """
+    if directions is None:
+        mx, my, mz = msd[..., 0], msd[..., 1], msd[..., 2]
+        return np.exp(-(0.5 * (0.5*mz + 0.25*mx + 0.25*my)) * d1[:, :, np.newaxis] * 1.0e-20)
+    return averaged_factors(msd, d1, *directions)
+
+
+
+"""
+@brief Polar angles and azimuths (degrees) of the texture map; `n.U.n` is even in `n`, so a hemisphere is enough.
+"""
+TEXTURE_THETA = np.linspace(0, 90, 19)
+TEXTURE_PHI = np.linspace(0, 360, 37)
+
+
+
+"""
+@brief Polynomial degrees tried by the automatic fit-degree selection.
+"""
+FIT_DEGREES = (1, 2, 3, 4)
+
+
+
+def polynomial_solver(x, degree):
+    """
+    @brief Factorizes the design (Vandermonde) matrix of a polynomial least-squares fit.
+
+    The columns are scaled to unit norm and decomposed by a singular value decomposition; singular values 
+    below the `polyfit` cutoff are dropped, so fits with the returned solver agree with `polyfit`.
+
+    Parameters:
+        - x (array-like): The `n` sample points.
+        - degree (int): The polynomial degree.
+
+    Returns:
+        - tuple (numpy.ndarray, numpy.ndarray): The solver of shape `(degree + 1, n)`, which maps the samples 
+          of a series to its coefficients (highest power first), and an orthonormal basis of shape 
+          `(n, rank)` of the fitted values, whose squared rows sum to the leverages of the samples.
+
+    Example usage:
+        solve, basis = polynomial_solver(volumes, 2)
+    """
+    x = np.asarray(x, dtype=float)
+    design = np.vander(x, degree + 1)
+    scale = np.sqrt((design * design).sum(axis=0))
+    scale[scale == 0] = 1
+    u, singular, vt = np.linalg.svd(design / scale, full_matrices=False)
+    kept = singular > len(x) * np.finfo(float).eps * singular[0]
+    inverse = np.zeros_like(singular)
+    inverse[kept] = 1 / singular[kept]
+    return (vt.T * inverse) @ u.T / scale[:, np.newaxis], u[:, kept]
+
+
+
+def fit_polynomials(x, values, degree=2):
+    """
+    @brief Least-squares polynomial fits of many series sampled at the same points, with one factorization.
+
+    Every series shares the design matrix of `x`, so the matrix is factorized once by `polynomial_solver` 
+    and applied to all series in one matrix product. The results agree with `polyfit` called series by series.
+
+    Parameters:
+        - x (array-like): The `n` sample points.
+        - values (numpy.ndarray): The series, of shape `(n, ...)`; a contiguous array is not copied.
+        - degree (int): The polynomial degree.
+
+    Returns:
+        - numpy.ndarray: The coefficients, of shape `(..., degree + 1)`, highest power first.
+
+    Example usage:
+        coefficients = fit_polynomials(volumes, msd_stack, 2)   # (n_temperatures, natom, 3, 3)
+    """
+    solve, _ = polynomial_solver(x, degree)
+    series = np.reshape(values, (len(solve.T), -1))
+    return (series.T @ solve.T).reshape(np.shape(values)[1:] + (degree + 1,))
+
+
+
+def cross_validate_polynomials(x, values, degrees=FIT_DEGREES):
+    """
+    @brief Fits many series with several polynomial degrees and scores every fit by leave-one-out cross-validation.
+
+    For every degree the design matrix is factorized once (`polynomial_solver`). The leave-one-out residual of 
+    sample `i` follows from the ordinary residual and the leverage `h_i` of the sample, `r_i / (1 - h_i)`, so 
+    no fit is repeated without the sample and every degree costs about two ordinary fits of all series. 
+    A degree that leaves a sample with leverage one (fewer samples than `degree + 2`) scores infinity.
+
+    Parameters:
+        - x (array-like): The `n` sample points.
+        - values (numpy.ndarray): The series, of shape `(n, ...)`.
+        - degrees (tuple of int): The degrees to try.
+
+    Returns:
+        - tuple (numpy.ndarray, numpy.ndarray): The coefficients, of shape `(len(degrees), ..., max(degrees) + 1)`, 
+          highest power first and padded with leading zeros, and the root-mean-square leave-one-out residuals, 
+          of shape `(len(degrees), ...)`.
+
+    Example usage:
+        candidates, residuals = cross_validate_polynomials(volumes, msd_stack)
+    """
+    x = np.asarray(x, dtype=float)
+    series = np.reshape(values, (len(x), -1))
+    width = max(degrees) + 1
+    candidates = np.zeros((len(degrees), series.shape[1], width))
+    residuals = np.empty((len(degrees), series.shape[1]))
+    for k, degree in enumerate(degrees):
+        solve, basis = polynomial_solver(x, degree)
+        candidates[k, :, width - degree - 1:] = series.T @ solve.T
+        leverage = (basis * basis).sum(axis=1)
+        if leverage.max() > 1 - 1e-8:
+            residuals[k] = np.inf
+            continue
+        deviation = series - basis @ (basis.T @ series)
+        deviation /= (1 - leverage)[:, np.newaxis]
+        residuals[k] = np.sqrt(np.mean(deviation * deviation, axis=0))
+    shape = np.shape(values)[1:]
+    return candidates.reshape((len(degrees),) + shape + (width,)), residuals.reshape((len(degrees),) + shape)
+
+
+
+def select_degrees(residuals, pooled_axes=()):
+    """
+    @brief Picks the candidate with the lowest cross-validation residual for every series.
+
+    Parameters:
+        - residuals (numpy.ndarray): The residuals of `cross_validate_polynomials`, shape `(n_candidates, ...)`.
+        - pooled_axes (tuple of int): Axes of the series shape over which one candidate is shared; the 
+          residuals along them are combined as a root mean square (e.g. the temperature and direction axes to 
+          pick one degree per site).
+
+    Returns:
+        - numpy.ndarray: The index of the chosen candidate of every series, of shape `residuals.shape[1:]`.
+
+    Example usage:
+        index = select_degrees(residuals, pooled_axes=(0, 2))
+    """
+    score = residuals
+    if pooled_axes:
+        with np.errstate(invalid="ignore"):
+            score = np.sqrt(np.mean(residuals * residuals, axis=tuple(axis + 1 for axis in pooled_axes), keepdims=True))
+    return np.broadcast_to(np.argmin(score, axis=0), residuals.shape[1:])
+
+
+
+def equivalent_sites(stacks, *properties):
+    """
+    @brief Groups atoms whose displacements are identical into sites.
+
+    Atoms related by symmetry have identical mean square displacement rows in every thermal-displacements file. 
+    Starting from the atom properties (e.g. names and masses), the grouping is refined with the rows of one 
+    file at a time by `np.unique`, so atoms end up in one site only if all their properties and rows are equal, 
+    and at most one file is copied at a time.
+
+    Parameters:
+        - stacks (list of numpy.ndarray): The displacement arrays, each of shape `(n_temperatures, natom, 3)`.
+        - properties (sequences): Per-atom values that equivalent atoms share.
+
+    Returns:
+        - tuple (numpy.ndarray, numpy.ndarray): The first atom of every site, in order of appearance, and the 
+          site of every atom.
+
+    Example usage:
+        site_atoms, site_of_atom = equivalent_sites(stacks, atom_names, atom_masses)
+        msd_of_atoms = msd_of_sites[site_of_atom]
+    """
+    natom = stacks[0].shape[1]
+    group = np.zeros(natom, dtype=np.intp)
+    keys = [np.unique(np.asarray(values), return_inverse=True)[1].reshape(natom, 1) for values in properties]
+    for rows in keys + [np.asarray(stack).transpose(1, 0, 2).reshape(natom, -1) for stack in stacks]:
+        group = np.unique(np.column_stack([group, rows]), axis=0, return_inverse=True)[1].ravel()
+    _, first, inverse = np.unique(group, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse.ravel()]
+
+
+
+def evaluate_polynomials(coefficients, x):
+    """
+    @brief Evaluates many polynomials at once with Horner's scheme.
+
+    Parameters:
+        - coefficients (numpy.ndarray): Coefficients with a last axis of `degree + 1` powers, highest first.
+        - x (array-like): The points, broadcast against `coefficients[..., 0]`.
+
+    Returns:
+        - numpy.ndarray: The values, of the broadcast shape of `coefficients[..., 0]` and `x`.
+
+    Example usage:
+        values = evaluate_polynomials(fit_coefficients, volumes[:, np.newaxis, np.newaxis])
+    """
+    x = np.asarray(x, dtype=float)
+    values = coefficients[..., 0] * np.ones_like(x)
+    for k in range(1, coefficients.shape[-1]):
+        values *= x
+        values += coefficients[..., k]
+    return values
+
+
+
+def evaluate_piecewise(breaks, coefficients, points):
+    """
+    @brief Evaluates many piecewise polynomials, each series at its own point.
+
+    The intervals of all points are found by one binary search over `breaks`; points outside the breaks use 
+    the first or last piece. Series `j` is evaluated at `points[j]` with Horner's scheme.
+
+    Parameters:
+        - breaks (numpy.ndarray): The `n` increasing breakpoints (e.g. `PchipInterpolator.x`).
+        - coefficients (numpy.ndarray): The local coefficients, of shape `(k, n - 1, m, ...)`, highest power 
+          first, in powers of `x - breaks[i]` (e.g. `PchipInterpolator.c`).
+        - points (array-like): The `m` points.
+
+    Returns:
+        - numpy.ndarray: The values, of shape `(m, ...)`.
+
+    Example usage:
+        model = interpolate.PchipInterpolator(volumes, msd_stack, axis=0)
+        msd = evaluate_piecewise(model.x, model.c, volume_list)   # (n_temperatures, natom, 3)
+    """
+    points = np.asarray(points, dtype=float)
+    interval = np.clip(np.searchsorted(breaks, points, side="right") - 1, 0, len(breaks) - 2)
+    selected = coefficients[:, interval, np.arange(len(points))]
+    offset = (points - breaks[interval]).reshape((-1,) + (1,) * (selected.ndim - 2))
+    return evaluate_polynomials(np.moveaxis(selected, 0, -1), offset)
+
+
+
+
+"""
+@brief Number of bootstrap resamples of the volume fits, the confidence level of the bands and the seed of the 
+resampling (fixed, so the bands of a dataset are reproducible).
+"""
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_LEVEL = 0.95
+BOOTSTRAP_SEED = 0
+
+
+
+"""
+@brief Number of resampled values (resamples x series) above which the bootstrap is spread over worker processes, 
+and the memory of one temperature slab when no budget is selected.
+"""
+PARALLEL_BOOTSTRAP_MIN_VALUES = 1 << 24
+BOOTSTRAP_SLAB_BYTES = 256 * 1024 ** 2
+
+
+
+def bootstrap_indices(n, resamples, min_distinct, seed=BOOTSTRAP_SEED):
+    """
+    @brief Draws the samples of every bootstrap resample, with replacement.
+
+    Resamples with fewer than `min_distinct` different samples cannot determine a polynomial of degree 
+    `min_distinct - 1` and are dropped, so slightly fewer than `resamples` rows may be returned.
+
+    Returns:
+        - numpy.ndarray: The sample indices, `(n_resamples, n)`.
+
+    Raises:
+        - ValueError: If no resample has `min_distinct` different samples.
+    """
+    indices = np.random.default_rng(seed).integers(n, size=(resamples, n))
+    ordered = np.sort(indices, axis=1)
+    distinct = 1 + np.count_nonzero(ordered[:, 1:] != ordered[:, :-1], axis=1)
+    indices = indices[distinct >= min_distinct]
+    if len(indices) == 0:
+        raise ValueError(f"{n} samples are too few for a bootstrap of polynomials of degree {min_distinct - 1}.")
+    return indices
+
+
+
+def bootstrap_operators(x, points, degree, indices, mode):
+    """
+    @brief Returns the linear maps from the samples to the resampled polynomial fits evaluated at points.
+
+    Modes:
+        - 'volumes': Resample `b` refits the samples `indices[b]` (volumes with their values). The design 
+          matrices of all resamples, in centred and scaled `x`, are inverted by one stacked pseudo-inverse.
+        - 'residuals': Resample `b` adds the residuals `indices[b]` to the fitted values; the fit is linear, so 
+          the map applies to the residuals and its result is added to the fit at the points.
+
+    Parameters:
+        - x (array-like): The `n` sample points.
+        - points (array-like): The `m` evaluation points.
+        - degree (int): The polynomial degree.
+        - indices (numpy.ndarray): The samples of every resample, `(n_resamples, n)` (see `bootstrap_indices`).
+        - mode (str): 'volumes' or 'residuals'.
+
+    Returns:
+        - numpy.ndarray: The maps, `(n_resamples, m, n)`, so that the resampled fit of a series `y` at 
+          `points[t]` is `operators[b, t] @ y` (or the fit plus `operators[b, t] @ residuals`).
+    """
+    x = np.asarray(x, dtype=float)
+    points = np.asarray(points, dtype=float)
+    one_hot = (indices[:, :, np.newaxis] == np.arange(len(x))).astype(float)
+    if mode == "residuals":
+        solve, _ = polynomial_solver(x, degree)
+        return (np.vander(points, degree + 1) @ solve) @ one_hot
+    center, scale = x.mean(), np.ptp(x) / 2 or 1.0
+    powers = np.arange(degree, -1, -1)
+    design = ((x[indices] - center) / scale)[..., np.newaxis] ** powers
+    return (((points - center) / scale)[:, np.newaxis] ** powers) @ np.linalg.pinv(design) @ one_hot
+
+
+
+def bootstrap_bands(x, points, values, degrees, indices, mode, d1, directions=None, level=BOOTSTRAP_LEVEL, nodes=None):
+    """
+    @brief Bootstrap confidence bands of the fitted MSD and of the Mossbauer factors for a slab of temperatures.
+
+    The MSD of all resamples, temperatures, sites and components follow from `bootstrap_operators` by one 
+    batched matrix product per degree; every series uses its own fit degree. In the 'residuals' mode the 
+    residuals are scaled by `1 / sqrt(1 - h)` (`h` the leverage of the volume) and centred before they are 
+    resampled. With `nodes`, the rows are the file temperatures around every temperature of the slab 
+    (see `temperature_nodes`), and the resampled MSD are interpolated to the temperatures the way the central 
+    MSD(T, V) surface is (`join_temperature_nodes`). The factors of every resample are computed by 
+    `mossbauer_factors`, and the bands are the percentiles of the resampled values. This is a module-level 
+    function, so it can run in worker processes.
+
+    Parameters:
+        - x (numpy.ndarray): The `n` volumes.
+        - points (numpy.ndarray): The volume of every row, `(m,)` (`(m * n_nodes,)` with `nodes`).
+        - values (numpy.ndarray): The MSD of every row at the volumes, `(n, m, n_sites, n_components)`.
+        - degrees (numpy.ndarray): The fit degree of every series, `(m, n_sites, n_components)`.
+        - indices (numpy.ndarray): The samples of every resample (see `bootstrap_indices`).
+        - mode (str): 'volumes' or 'residuals' (see `bootstrap_operators`).
+        - d1 (numpy.ndarray): `(E_gamma / (hbar c))^2` of every transition and site, `(n_rows, n_sites)`.
+        - directions (tuple or None): The gamma-ray directions and weights (see `mossbauer_factors`).
+        - level (float): The confidence level.
+        - nodes (tuple or None): The temperature grid and the interval and offset of every temperature of 
+          the slab (see `temperature_nodes`); the rows hold the nodes of every temperature in turn.
+
+    Returns:
+        - tuple (numpy.ndarray, numpy.ndarray): The lower and upper MSD bounds, `(2, n_sites, m, n_components)`, 
+          and factor bounds, `(2, n_rows, n_sites, m)`, with `m` the number of temperatures.
+    """
+    n, m = values.shape[:2]
+    series = values.reshape(n, m, -1).transpose(1, 0, 2)
+    samples = np.empty((m, len(indices), series.shape[2]))
+    for degree in np.unique(degrees):
+        operators = bootstrap_operators(x, points, degree, indices, mode).transpose(1, 0, 2)
+        if mode == "residuals":
+            solve, basis = polynomial_solver(x, degree)
+            residuals = series - np.einsum("ij,tjs->tis", basis @ basis.T, series)
+            residuals /= np.sqrt(np.maximum(1 - (basis * basis).sum(axis=1), 1e-12))[:, np.newaxis]
+            residuals -= residuals.mean(axis=1, keepdims=True)
+            fitted = np.einsum("tj,tjs->ts", np.vander(points, degree + 1) @ solve, series)
+            resampled = fitted[:, np.newaxis] + operators @ residuals
+        else:
+            resampled = operators @ series
+        selected = (degrees == degree).reshape(m, 1, -1)
+        np.copyto(samples, resampled, where=selected)
+
+    if nodes is not None:
+        grid, interval, offset = nodes
+        samples = join_temperature_nodes(grid, interval, offset, samples.reshape((len(interval), -1) + samples.shape[1:]))
+        m = len(interval)
+    samples = samples.reshape((m, len(indices)) + values.shape[2:]).transpose(1, 2, 0, 3)
+    quantiles = [(1 - level) / 2, (1 + level) / 2]
+    msd_band = np.quantile(samples, quantiles, axis=0)
+    n_resamples, n_sites = samples.shape[:2]
+    factors = mossbauer_factors(samples.reshape((n_resamples * n_sites,) + samples.shape[2:]), np.tile(d1, (1, n_resamples)), directions)
+    factor_band = np.quantile(factors.reshape(len(d1), n_resamples, n_sites, m), quantiles, axis=1)
+    return msd_band, factor_band
+
+
+
+class IncrementalPolynomialFit:
+    """
+    @brief Least-squares polynomial fit of many series against one variable, updated one sample at a time.
+
+    The fit keeps the normal equations of the samples added so far: the Gram matrix of the polynomial basis, 
+    which is shared by all series, and the moments of every series. Adding a sample (e.g. the MSD of all atoms 
+    at one volume) updates both in time proportional to the size of the sample, without revisiting earlier 
+    samples. The basis is evaluated in `(x - center) / scale`, which keeps the normal equations well conditioned; 
+    `coefficients` converts the solution back to powers of `x`.
+
+    Methods:
+        - add(self, x, values): Adds the values of all series at `x`.
+        - coefficients(self): Returns the fitted coefficients in powers of `x`, highest power first (as `polyfit`).
+    """
+
+    def __init__(self, center, scale, degree=2):
+        """
+        @brief Initializes an empty fit.
+
+        @param center: The value of `x` mapped to zero (e.g. the mean of all volumes).
+        @param scale: The distance from `center` mapped to one (e.g. half the volume range).
+        @param degree: The polynomial degree.
+
+        Example usage:
+            fit = IncrementalPolynomialFit(volumes.mean(), np.ptp(volumes) / 2)
+        """
+        self.center = center
+        self.scale = scale
+        self.degree = degree
+        self.gram = np.zeros((degree + 1, degree + 1))
+        self.moments = None
+        self.count = 0
+
+    def add(self, x, values):
+        """
+        @brief Adds one sample of all series.
+
+        @param x: The value of the independent variable.
+        @param values: The values of all series at `x`, an array of any shape.
+        """
+        basis = ((x - self.center) / self.scale) ** np.arange(self.degree, -1, -1)
+        self.gram += np.outer(basis, basis)
+        moments = np.multiply.outer(np.asarray(values, dtype=float), basis)
+        self.moments = moments if self.moments is None else self.moments + moments
+        self.count += 1
+
+    def coefficients(self):
+        """
+        @brief Returns the least-squares coefficients of all series.
+
+        @return: An array of the shape of the added values with a last axis of `degree + 1` coefficients in powers 
+                 of `x`, highest power first.
+
+        @throws ValueError: If fewer than `degree + 1` samples were added.
+        """
+        if self.count <= self.degree:
+            raise ValueError(f"A degree {self.degree} fit needs at least {self.degree + 1} samples, {self.count} were added.")
+        scaled = np.linalg.solve(self.gram, self.moments.reshape(-1, self.degree + 1).T).T
+
+        # Expand ((x - center) / scale)**k in powers of x; rows and columns are ordered highest power first
+        powers = self.degree + 1
+        expansion = np.zeros((powers, powers))
+        for k in range(powers):
+            for j in range(k + 1):
+                expansion[self.degree - k, self.degree - j] = math.comb(k, j) * (-self.center) ** (k - j) / self.scale ** k
+        return (scaled @ expansion).reshape(self.moments.shape)
+
+
+
+class TemperatureInterpolator:
+    """
+    @brief Interpolates values tabulated on a temperature grid (e.g. the MSD of all atoms of a thermal-displacements 
+    file) at any temperatures, for all series at once.
+
+    The grid may be non-uniform. The local polynomial of every interval is computed once for all series: the 
+    straight line through its ends ('linear') or the monotone cubic of `scipy.interpolate.PchipInterpolator` 
+    ('pchip'), which keeps monotonic MSD curves monotonic. `locate` finds the intervals of a set of temperatures 
+    by one binary search, and its index can be evaluated for the values of all series with Horner's scheme. 
+    Temperatures on the grid give the tabulated values exactly; temperatures outside the grid are rejected.
+
+    Methods:
+        - locate(self, temperatures): Returns the interval and offset of every temperature.
+        - evaluate(self, index): Returns the values of all series at located temperatures.
+        - __call__(self, temperatures): Locates and evaluates the temperatures.
+    """
+
+    def __init__(self, grid, values, kind="linear"):
+        """
+        @brief Computes the local polynomials of all intervals and series.
+
+        @param grid: The increasing temperatures of the table, shape `(n,)`.
+        @param values: The tabulated values, shape `(n, ...)`.
+        @param kind: 'linear' or 'pchip'.
+
+        @throws ValueError: If the grid has fewer than two temperatures or is not strictly increasing.
+
+        Example usage:
+            interpolator = TemperatureInterpolator(temperatures, displacements, "pchip")
+            msd = interpolator([15.0, 295.0])   # (2, natom, 3)
+        """
+        self.grid = np.asarray(grid, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if len(self.grid) < 2 or np.any(np.diff(self.grid) <= 0):
+            raise ValueError("The temperature grid must have at least two strictly increasing temperatures.")
+        if kind == "pchip":
+            pieces = interpolate.PchipInterpolator(self.grid, values, axis=0).c
+        else:
+            steps = np.diff(self.grid).reshape((-1,) + (1,) * (values.ndim - 1))
+            pieces = np.stack([np.diff(values, axis=0) / steps, values[:-1]])
+        # A constant piece at the last temperature, so that it is returned exactly as well
+        last = np.zeros((len(pieces), 1) + values.shape[1:])
+        last[-1, 0] = values[-1]
+        self.coefficients = np.concatenate([pieces, last], axis=1)
+
+    def locate(self, temperatures):
+        """
+        @brief Finds the interval of every temperature by one binary search.
+
+        @param temperatures: The `m` temperatures, in any order.
+        @return: The index of the intervals and the offsets of the temperatures from their starts, both `(m,)`.
+
+        @throws ValueError: If a temperature lies outside the grid.
+        """
+        temperatures = np.asarray(temperatures, dtype=float).ravel()
+        outside = temperatures[(temperatures < self.grid[0]) | (temperatures > self.grid[-1])]
+        if outside.size:
+            raise ValueError(f"The temperatures {', '.join(f'{value:g}' for value in outside[:5])} K lie outside the "
+                             f"tabulated range {self.grid[0]:g}-{self.grid[-1]:g} K.")
+        interval = np.searchsorted(self.grid, temperatures, side="right") - 1
+        return interval, temperatures - self.grid[interval]
+
+    def evaluate(self, index):
+        """
+        @brief Evaluates all series at the temperatures of `index` (see `locate`).
+
+        @return: The values, shape `(m, ...)`.
+        """
+        interval, offset = index
+        selected = np.moveaxis(self.coefficients[:, interval], 0, -1)
+        return evaluate_polynomials(selected, offset.reshape((-1,) + (1,) * (selected.ndim - 2)))
+
+    def __call__(self, temperatures):
+        return self.evaluate(self.locate(temperatures))
+
+
+
+def pchip_edge_slope(h0, h1, d0, d1):
+    """
+    @brief Returns the slope of a monotone cubic at an end of its grid, as `scipy.interpolate.PchipInterpolator`.
+
+    @param h0, h1: The widths of the first and second interval from the end.
+    @param d0, d1: The secant slopes of these intervals, broadcast against `h0` and `h1`.
+    """
+    slope = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+    slope = np.where(np.sign(slope) != np.sign(d0), 0.0, slope)
+    return np.where((np.sign(d0) != np.sign(d1)) & (np.abs(slope) > 3 * np.abs(d0)), 3 * d0, slope)
+
+
+
+def pchip_stencil(grid, interval, offset, values):
+    """
+    @brief Evaluates monotone cubics, each from the four values around its own interval.
+
+    The slopes are those of `scipy.interpolate.PchipInterpolator` (weighted harmonic means of the secants, 
+    zero at local extrema, one-sided at the ends of the grid), which only depend on the neighbouring 
+    intervals. So every point can carry its own series, e.g. the MSD at its own volume.
+
+    Parameters:
+        - grid (numpy.ndarray): The `n >= 2` increasing temperatures.
+        - interval (numpy.ndarray): The interval `k <= n - 2` of every point, `(m,)`.
+        - offset (numpy.ndarray): The distance of every point from `grid[k]`, `(m,)`.
+        - values (numpy.ndarray): The values at `grid[k - 1], ..., grid[k + 2]` (indices clipped to the grid), 
+          `(m, 4, ...)`.
+
+    Returns:
+        - numpy.ndarray: The interpolated values, `(m, ...)`.
+    """
+    n = len(grid)
+    shape = (-1,) + (1,) * (values.ndim - 2)
+    nodes = np.clip(interval[:, np.newaxis] + np.arange(-1, 3), 0, n - 1)
+    widths = np.diff(grid[nodes], axis=1)
+    y = np.moveaxis(values, 1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        secants = [(y[j + 1] - y[j]) / widths[:, j].reshape(shape) for j in range(3)]
+        h_left, h, h_right = (np.where(widths[:, j] > 0, widths[:, j], 1.0).reshape(shape) for j in range(3))
+
+        def interior(h0, h1, d0, d1):
+            w1, w2 = 2 * h1 + h0, h1 + 2 * h0
+            mean = (w1 + w2) / (w1 / d0 + w2 / d1)
+            return np.where((np.sign(d0) != np.sign(d1)) | (d0 == 0) | (d1 == 0), 0.0, mean)
+
+        first = (interval == 0).reshape(shape)
+        last = (interval == n - 2).reshape(shape)
+        if n == 2:
+            slope0 = slope1 = secants[1]
+        else:
+            slope0 = np.where(first, pchip_edge_slope(h, h_right, secants[1], secants[2]), 
+                              interior(h_left, h, secants[0], secants[1]))
+            slope1 = np.where(last, pchip_edge_slope(h, h_left, secants[1], secants[0]), 
+                              interior(h, h_right, secants[1], secants[2]))
+    t = offset.reshape(shape)
+    c2 = (3 * secants[1] - 2 * slope0 - slope1) / h
+    c3 = (slope0 + slope1 - 2 * secants[1]) / (h * h)
+    return y[1] + t * (slope0 + t * (c2 + t * c3))
+
+
+
+def temperature_nodes(grid, temperatures, kind="linear"):
+    """
+    @brief Returns the file temperatures from which the MSD at every temperature is interpolated.
+
+    'linear' uses the two ends of the interval of every temperature, 'pchip' the four temperatures around it 
+    (clipped to the grid, see `pchip_stencil`). A grid of one temperature gives that temperature.
+
+    Returns:
+        - tuple: The interval `(m,)` and the offset from its start `(m,)` of every temperature, and the indices 
+          of its nodes in `grid`, `(m, 2)` or `(m, 4)` (`(m, 1)` for a grid of one temperature).
+    """
+    temperatures = np.asarray(temperatures, dtype=float).ravel()
+    if len(grid) < 2:
+        interval = np.zeros(len(temperatures), dtype=int)
+        return interval, temperatures - grid[0], interval[:, np.newaxis]
+    interval = np.clip(np.searchsorted(grid, temperatures, side="right") - 1, 0, len(grid) - 2)
+    steps = np.arange(-1, 3) if kind == "pchip" else np.arange(2)
+    return interval, temperatures - grid[interval], np.clip(interval[:, np.newaxis] + steps, 0, len(grid) - 1)
+
+
+
+def join_temperature_nodes(grid, interval, offset, values):
+    """
+    @brief Interpolates values given at the nodes of `temperature_nodes` to their temperatures.
+
+    @param values: The values at the nodes of every temperature, `(m, n_nodes, ...)`.
+    @return: The values, `(m, ...)`: linear between two nodes, `pchip_stencil` for four, the node for one.
+    """
+    if values.shape[1] == 1:
+        return values[:, 0]
+    if values.shape[1] == 4:
+        return pchip_stencil(grid, interval, offset, values)
+    weight = (offset / np.diff(grid)[interval]).reshape((-1,) + (1,) * (values.ndim - 2))
+    return (1 - weight) * values[:, 0] + weight * values[:, 1]
+
+
+
+class MsdSurface:
+    """
+    @brief Model of the MSD of every site and component as a function of temperature and volume, MSD(T, V).
+
+    The surface is built once from the volume fits at the temperatures of the thermal-displacements files: 
+    the polynomial coefficients of `Fitting`, or the pieces of the PCHIP volume interpolation. At the file 
+    temperatures it reproduces the fits exactly. Between them ('linear') the coefficients are interpolated 
+    linearly by a `TemperatureInterpolator`; the fits are linear in the data, so this interpolates the fitted 
+    MSD linearly in temperature. With 'pchip' the fitted MSD at the volume of every `(T, V)` pair are evaluated 
+    at the four surrounding file temperatures and joined by a monotone cubic (`pchip_stencil`), so MSD that 
+    increase with temperature at a fixed volume stay increasing (interpolating the coefficients themselves 
+    would not preserve this).
+
+    Methods:
+        - evaluate(self, temperatures, volumes): Returns the MSD of all series at `(T, V)` pairs.
+    """
+
+    def __init__(self, temperatures, coefficients, breaks=None, kind="linear"):
+        """
+        @brief Builds the temperature interpolation of the volume fits.
+
+        @param temperatures: The temperatures of the thermal-displacements files, shape `(n_temperatures,)`.
+        @param coefficients: The polynomial coefficients of the volume fits, `(n_temperatures, ..., degree + 1)` 
+                             with the highest power first, or with `breaks` the PCHIP pieces, 
+                             `(4, n_volumes - 1, n_temperatures, ...)` (`PchipInterpolator.c`).
+        @param breaks: The sorted volumes of the PCHIP pieces, or None for polynomial fits.
+        @param kind: The interpolation in temperature, 'linear' or 'pchip'.
+
+        Example usage:
+            surface = MsdSurface(temperatures, fit_coefficients)
+            msd = surface.evaluate(temp_list, volume_list)   # (n_points, n_sites, 3)
+        """
+        self.breaks = breaks
+        self.kind = kind
+        if breaks is not None:
+            coefficients = np.moveaxis(coefficients, 2, 0)
+        self.coefficients = coefficients
+        # The interpolator locates the temperatures; with 'pchip' its coefficients are not evaluated
+        self.interpolator = TemperatureInterpolator(temperatures, coefficients, "linear")
+
+    def fitted_values(self, coefficients, volumes):
+        """
+        @brief Evaluates volume fits, each at its own volume.
+
+        @param coefficients: The fits of `m` points, `(m, ...)` in the layout of `self.coefficients`.
+        @param volumes: The `m` volumes.
+        @return: The MSD, shape `(m, ...)`.
+        """
+        volumes = np.asarray(volumes, dtype=float)
+        if self.breaks is None:
+            return evaluate_polynomials(coefficients, volumes.reshape((-1,) + (1,) * (coefficients.ndim - 2)))
+        return evaluate_piecewise(self.breaks, np.moveaxis(coefficients, 0, 2), volumes)
+
+    def evaluate(self, temperatures, volumes):
+        """
+        @brief Evaluates the MSD of all series at `(T, V)` pairs.
+
+        The temperatures are located by one binary search. 'linear' interpolates the coefficients of all series 
+        there at once and evaluates each pair at its volume by Horner's scheme (for PCHIP volume fits, after a 
+        binary search for the piece of every volume). 'pchip' evaluates the fits at the volume of every pair 
+        at the four surrounding file temperatures and interpolates these MSD with `pchip_stencil`.
+
+        @param temperatures: The `m` temperatures.
+        @param volumes: The `m` volumes, one per temperature.
+        @return: The MSD, shape `(m, ...)`, e.g. `(m, n_sites, n_components)`.
+
+        @throws ValueError: If a temperature lies outside the temperatures of the files.
+        """
+        index = self.interpolator.locate(temperatures)
+        volumes = np.asarray(volumes, dtype=float)
+        if self.kind != "pchip":
+            return self.fitted_values(self.interpolator.evaluate(index), volumes)
+        interval, offset, nodes = temperature_nodes(self.interpolator.grid, temperatures, "pchip")
+        values = self.fitted_values(self.coefficients[nodes.ravel()], np.repeat(volumes, nodes.shape[1]))
+        return pchip_stencil(self.interpolator.grid, interval, offset, values.reshape(nodes.shape + values.shape[1:]))
 
 
 
@@ -182,11 +2052,30 @@ class my_window(QMainWindow):
         text_item1 (list[QGraphicsTextItem]), text_item2 (list[QGraphicsTextItem]),
         text_item3 (list[QGraphicsTextItem]), text_item4 (list[QGraphicsTextItem]):
             Lists of text graphic items for various layers/views.
-        files_to_delete (list[str]):
-            Paths of files scheduled for deletion.
-        ev_vol_list (list[float]), temp_list (list[float]), volume_list (list[float]),
+        parsed_displacements (dict):
+            Maps thermal-displacement file paths to their parsed (temperatures, displacements) arrays.
+        input_cache (InputCache):
+            On-disk cache of parsed input files, so unchanged files are not parsed again.
+        prefetch_pool (ThreadPoolExecutor), prefetched (dict), displacement_headers (dict), pending_prefetch (list):
+            Background reading of selected files: the pool, the pending parse of every thermal-displacements file 
+            with its modification stamp, the header of every thermal-displacements file and the unfinished jobs.
+        prefetch_timer (QTimer):
+            Polls the background jobs and reports input mismatches as soon as the headers are read.
+        watcher (QFileSystemWatcher), watch_directory (str), watch_fit (IncrementalPolynomialFit), watch_volumes (dict),
+        watch_timer (QTimer), watch_stamps (dict), watch_failed (dict), watch_jobs (dict):
+            Watch mode: the watcher, the watched run directory, the running fit, the e-v row of every ingested file, 
+            the timer polling new files, the last seen modification stamp of every new file, the stamp of every 
+            file whose parse failed, and the background parse of every file ready to be ingested.
+        primitive_cell (dict):
+            Symbols, numbers, masses, fractional coordinates and lattice vectors of the primitive cell.
+        ev_vol_list (numpy.ndarray), temp_list (numpy.ndarray), volume_list (numpy.ndarray),
         real_temp (list[float]):
-            Lists of measured or calculated data: evaporation volumes, temperatures, and actual temperatures.
+            Measured or calculated data: e-v volumes, the temperatures and volumes of the first V(T) curve, and 
+            actual temperatures.
+        curve_labels (list[str]), curve_temperatures (list[numpy.ndarray]), curve_volumes (list[numpy.ndarray]),
+        curve_msd (list[numpy.ndarray]), curve_factors (list[numpy.ndarray]):
+            The further V(T) curves compared with the first one: their names, temperatures and volumes, the MSD 
+            of every site `(n_sites, n_temperatures, n_components)` and the Mossbauer factors of every atom.
         outfile (list[Any]), outfile_names (list[str]):
             Output file objects and their corresponding names for further processing or saving.
         mx, my, mz, mx1, my1, mz1, mx2, my2, mz2 (list[float]):
@@ -197,18 +2086,21 @@ class my_window(QMainWindow):
             Temporary computation results.
         count (list[int]):
             Counters or record indices.
-        factor_list (list[float]):
+        factor_list (numpy.ndarray):
             List of normalization or scaling factors.
         generated_graphs_factor (list[QPixmap]), generated_graphs_mi1 (list[QPixmap]):
             Rendered graph objects for factors and the first set of mi values.
         atom_names (list[str]), atom_numbers (list[int]), atom_masses (list[float]),
-        Er_const_list (list[float]):
-            Atomic property parameters and constants used in energy calculations.
+        Er_const_list (list[float]), warned_elements (set[str]):
+            Atomic property parameters and constants used in energy calculations (NaN for elements without a 
+            Mossbauer transition), and the elements already reported as having none.
         sing_temperature (list[float]), sing_mx (list[float]), sing_my (list[float]),
         sing_mz (list[float]):
             Lists for singular temperatures and individual coordinates during analysis.
         x_axis (list[float]), y_axis (list[float]), xAxis (list[float]), yAxis (list[float]):
             X and Y axes data for plotting; duplicate names retained for backward compatibility.
+        yError (numpy.ndarray or None):
+            Uncertainties of the experimental data points, if the data file has a third column.
         factor_stored_kwargs_f (dict):
             Dictionary holding stored keyword arguments for factor graph generation.
         mx1_stored_kwargs, my1_stored_kwargs, mz1_stored_kwargs (dict):
@@ -240,13 +2132,40 @@ class my_window(QMainWindow):
         self.text_item3 = []
         self.text_item4 = []
 
-        # Initialize list for files to delete
-        self.files_to_delete = []  
+        # Initialize the parsed thermal displacements, keyed by file path
+        self.parsed_displacements = {}
+
+        # Initialize the on-disk cache of parsed input files
+        self.input_cache = InputCache()
+
+        # Initialize the background reading of selected input files
+        self.prefetch_pool = None
+        self.prefetched = {}
+        self.displacement_headers = {}
+        self.pending_prefetch = []
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setInterval(100)
+        self.prefetch_timer.timeout.connect(self.collect_prefetch)
+
+        # Initialize the watch mode for running PHONOPY jobs
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.watchDirectoryChanged)
+        self.watch_directory = None
+        self.watch_fit = None
+        self.watch_volumes = {}
+        # A new file is ingested once its size and modification time stay unchanged for one tick
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setInterval(1000)
+        self.watch_timer.timeout.connect(self.pollWatchedFiles)
+        self.watch_stamps = {}
+        self.watch_failed = {}
+        self.watch_jobs = {}
 
         # Initialize lists for volume, temperature, and real-time data
-        self.ev_vol_list = []  
-        self.temp_list = []  
-        self.volume_list = []  
+        self.ev_vol_list = np.empty(0)
+        self.temp_list = np.empty(0)
+        self.volume_list = np.empty(0)
+        self.clearCurves()
         self.real_temp = []  
 
         # Initialize lists for output files and their names
@@ -258,7 +2177,10 @@ class my_window(QMainWindow):
         self.my = []  
         self.mz = []  
 
-        # Initialize a list for general data
+        # Initialize the stacked MSD of all volumes, shape (n_volumes, n_temperatures, natom, 3)
+        self.msd_stack = np.empty((0, 0, 0, 3))
+
+        # Initialize views of the MSD components per volume
         self.data_list_x = []  
         self.data_list_y = []  
         self.data_list_z = []  
@@ -272,6 +2194,38 @@ class my_window(QMainWindow):
         self.coef_x = []
         self.coef_y = []
         self.coef_z = []
+        # Fit coefficients of all series, (n_temperatures, natom, 3, 3); coef_x/y/z are views of it
+        self.fit_coefficients = np.empty((0, 0, 3, 3))
+        # Degree of every fitted series and the leave-one-out residuals of all tried degrees (see selectFit)
+        self.fit_degrees = np.empty((0, 0, 3), dtype=int)
+        self.cv_residuals = np.empty((0, 0, 0, 3))
+        # PCHIP pieces of the volume interpolation and their sorted volumes, or None for polynomial fits (see buildSurface)
+        self.fit_pieces = None
+        self.fit_breaks = None
+        # All MSD components of every atom, (natom, n_temperatures, 3 or 6); mx1/my1/mz1 are views of it
+        self.msd_tensor = np.empty((0, 0, 3))
+        # Gamma-ray direction (theta, phi in degrees), temperature and f(theta, phi) of every atom for the texture map
+        self.gamma_angles = (0.0, 0.0)
+        self.texture_temperature = None
+        self.texture_temperature_used = None
+        # Temperatures chosen for the single-file (harmonic) results, or None for the grid of the file
+        self.requested_temperatures = None
+        self.texture_map = np.empty((0, len(TEXTURE_THETA), len(TEXTURE_PHI)))
+        # Transitions of the loaded elements and the factors of every transition, (1 + n_isotopes, natom, n_temperatures)
+        self.isotopes = []
+        self.isotope_factors = np.empty((0, 0, 0))
+        self.isotope_d1 = np.empty((0, 0))
+        # Bootstrap confidence bands (lower, upper) of the MSD, (2, natom, n_temperatures, n_components), and of the 
+        # factors of every transition, (2, 1 + n_isotopes, natom, n_temperatures), and the band of factor_list
+        self.msd_bands = np.empty((2, 0, 0, 3))
+        self.isotope_bands = np.empty((2, 0, 0, 0))
+        self.factor_band = np.empty((2, 0, 0))
+        self.isotope_rows = np.empty(0, dtype=int)
+        # First atom of every group of equivalent atoms and the group of every atom (see findEquivalentSites)
+        self.site_atoms = np.empty(0, dtype=np.intp)
+        self.site_of_atom = np.empty(0, dtype=np.intp)
+        # MSD(T, V) surface of the volume fits, evaluated on the V(T) curve by Imputing
+        self.msd_surface = None
 
         # Initialize a list for single thermal displacement approximation
         self.data_sing_list = []
@@ -303,6 +2257,8 @@ class my_window(QMainWindow):
         self.atom_numbers = []  
         self.atom_masses = []  
         self.Er_const_list = []  
+        self.warned_elements = set()
+        self.primitive_cell = {}
 
         # Initialize lists for single data points (temperature, mx, my, mz)
         self.sing_temperature = []  
@@ -323,6 +2279,7 @@ class my_window(QMainWindow):
         # Initialize plot axes lists
         self.xAxis = []  
         self.yAxis = []  
+        self.yError = None
 
         # Initialize an integer for counting purposes
         self.i = 1  
@@ -395,6 +2352,22 @@ class my_window(QMainWindow):
         self.txt_updload_files.move(180,20)
         self.txt_updload_files.setStyleSheet("font-size: 16px")
 
+        # Button to load all files of a run directory at once
+        self.btn_rundir = QtWidgets.QPushButton(self.widget)
+        self.btn_rundir.setText("Load Run Directory")
+        self.btn_rundir.move(600, 50)
+        self.btn_rundir.resize(160,30)
+        self.btn_rundir.setStyleSheet("background-color: lightgreen; border: 1px solid black; font-size: 16px;")
+        self.btn_rundir.clicked.connect(self.openRunDirectory)
+
+        # Button to watch a run directory for new thermal-displacements files
+        self.btn_watch = QtWidgets.QPushButton(self.widget)
+        self.btn_watch.setText("Watch Run Directory")
+        self.btn_watch.move(770, 50)
+        self.btn_watch.resize(180,30)
+        self.btn_watch.setStyleSheet("background-color: lightgreen; border: 1px solid black; font-size: 16px;")
+        self.btn_watch.clicked.connect(self.toggleWatch)
+
         # Section for uploading the Phonopy.yaml file
         self.txt_name = QtWidgets.QLabel(self.widget) 
         self.txt_name.setText("Phonopy.yaml file:")
@@ -518,6 +2491,41 @@ class my_window(QMainWindow):
         self.btn_savetex.resize( 100, 50)
         self.btn_savetex.clicked.connect(self.Save_file)
 
+        self.btn_savesession = QtWidgets.QPushButton(self.widget)
+        self.btn_savesession.setText("Save\nSession")
+        self.btn_savesession.move(1600, 780)
+        self.btn_savesession.resize(100, 50)
+        self.btn_savesession.clicked.connect(self.saveSession)
+
+        self.btn_opensession = QtWidgets.QPushButton(self.widget)
+        self.btn_opensession.setText("Open\nSession")
+        self.btn_opensession.move(1600, 840)
+        self.btn_opensession.resize(100, 50)
+        self.btn_opensession.clicked.connect(self.openSession)
+
+        self.box_export = QComboBox(self.widget)
+        self.box_export.move(1460, 900)
+        self.box_export.addItem('Wide table (.tsv)')
+        self.box_export.addItem('Long table (.tsv)')
+        self.box_export.addItem('NumPy arrays (.npz)')
+
+        self.box_export_scope = QComboBox(self.widget)
+        self.box_export_scope.move(1460, 930)
+        self.box_export_scope.addItem('All atoms')
+        self.box_export_scope.addItem('Species averages')
+
+        self.btn_curves = QtWidgets.QPushButton(self.widget)
+        self.btn_curves.setText("Add V(T) Curves")
+        self.btn_curves.move(1460, 830)
+        self.btn_curves.resize(120, 50)
+        self.btn_curves.clicked.connect(self.addCurves)
+
+        self.btn_export = QtWidgets.QPushButton(self.widget)
+        self.btn_export.setText("Export All")
+        self.btn_export.move(1600, 900)
+        self.btn_export.resize(100, 50)
+        self.btn_export.clicked.connect(self.exportAll)
+
         self.btn_Ploting = QtWidgets.QPushButton(self.widget)
         self.btn_Ploting.setText("Graph")
         self.btn_Ploting.move(1000, 600)
@@ -623,114 +2631,762 @@ class my_window(QMainWindow):
         self.box_resolution.addItem('1280x720')
         self.box_resolution.addItem('1920x1080 ')
 
+        self.box_memory = QComboBox(self.widget)
+        self.box_memory.move(1460, 615)
+        self.box_memory.addItem('Memory')
+        self.box_memory.addItem('512 MB')
+        self.box_memory.addItem('1 GB')
+        self.box_memory.addItem('2 GB')
+        self.box_memory.addItem('4 GB')
+        self.box_memory.addItem('8 GB')
+
+        self.box_degree = QComboBox(self.widget)
+        self.box_degree.move(1460, 645)
+        self.box_degree.addItem('Fit Degree')
+        self.box_degree.addItem('1')
+        self.box_degree.addItem('2')
+        self.box_degree.addItem('3')
+        self.box_degree.addItem('4')
+        self.box_degree.addItem('Auto (per series)')
+        self.box_degree.addItem('Auto (per site)')
+        self.box_degree.addItem('Monotone Cubic (PCHIP)')
+
+        self.box_isotope = QComboBox(self.widget)
+        self.box_isotope.move(1460, 675)
+        self.box_isotope.addItem('Isotope')
+        self.box_isotope.currentIndexChanged.connect(self.isotopeChanged)
+
+        self.box_orientation = QComboBox(self.widget)
+        self.box_orientation.move(1460, 705)
+        self.box_orientation.addItem('Orientation')
+        self.box_orientation.addItem('Powder')
+        self.box_orientation.addItem('[100]')
+        self.box_orientation.addItem('[010]')
+        self.box_orientation.addItem('[001]')
+        self.box_orientation.addItem('[110]')
+        self.box_orientation.addItem('[111]')
+        self.box_orientation.addItem('Direction (θ, φ)')
+        self.box_orientation.addItem('Texture Map')
+        self.box_orientation.currentIndexChanged.connect(self.orientationChanged)
+
+        self.box_bootstrap = QComboBox(self.widget)
+        self.box_bootstrap.move(1460, 735)
+        self.box_bootstrap.addItem('Uncertainty')
+        self.box_bootstrap.addItem('Bootstrap (volumes)')
+        self.box_bootstrap.addItem('Bootstrap (residuals)')
+
+        self.box_interpolation = QComboBox(self.widget)
+        self.box_interpolation.move(1460, 765)
+        self.box_interpolation.addItem('Interpolation')
+        self.box_interpolation.addItem('Linear')
+        self.box_interpolation.addItem('Monotone Cubic (PCHIP)')
+
+        self.box_temperatures = QComboBox(self.widget)
+        self.box_temperatures.move(1460, 795)
+        self.box_temperatures.addItem('Temperatures')
+        self.box_temperatures.addItem('Custom Temperatures')
+        self.box_temperatures.activated.connect(self.temperaturesChanged)
+
+
+
+
+
+        
+        self.scene_load1 = None
+        self.scene_load2 = None
+        self.scene_load3 = None
+        self.scene_load4 = None
+
+        self.graphics_graph.setScene(QGraphicsScene())
+
+        
+        self.fit_list_x= []
+        self.fit_list_y = []
+        self.fit_list_z = []
+        
+        self.setCentralWidget(self.scroll)
+
+
+    
+
+    def open_documentation(self):
+        """
+        @brief Opens the documentation PDF file associated with the application.
+
+        This method opens the specified PDF file using the default PDF viewer on the user's system.
+        The file path is hardcoded and should be updated as necessary. The method includes exception 
+        handling to manage any errors that occur during the file opening process.
+
+        File Path:
+            - pdf_file_path (str): The file path to the documentation PDF file.
+        
+        Error Handling:
+            - If the file cannot be opened, the method catches the exception and prints an error message.
+
+        Example usage:
+            self.open_documentation()
+
+        Raises:
+            - Catches and prints any exceptions raised during the file opening process.
+        """
+        pdf_file_path = "User Manual.pdf"  
+        
+        try:
+            os.startfile(pdf_file_path)
+        except Exception as e:
+            print("Error:", e)
+        
+  
+    
+    
+    def GenerateComboBox(self):
+        """
+        @brief Populates the `Box` QComboBox with options based on the number of atoms.
+
+        This method first clears the existing items in the `Box` combo box and then adds new items dynamically. 
+        For the first atom of every group of equivalent atoms (`self.site_atoms`, see `findEquivalentSites`), 
+        two items are added to the combo box: one for "Atom Probability" and one for "Atom MSD".
+        
+        After populating the combo box, the method connects the `currentIndexChanged` signal of the combo box 
+        to the `Choosing` method, which is responsible for handling selection changes.
+
+        Modifies:
+            - self.Box (QComboBox): The combo box that gets populated with new items.
+
+        Attributes:
+            - site_atoms (numpy.ndarray): The indices of the atoms that get items.
+        
+        Connections:
+            - `self.Box.currentIndexChanged`: Connects the combo box selection change signal to the `Choosing` method.
+        
+        Usage:
+            - Call this method when the list of `atom_numbers` is updated or when the UI needs to be refreshed 
+            to reflect the current state of the atoms data.
+        
+        Example usage:
+            self.GenerateComboBox()
+
+        """
+        self.Box.clear()
+        for i in self.site_atoms + 1:
+            self.Box.addItem(f"Atom Probability {i}")
+            self.Box.addItem(f"Atom MSD {i}")
+        self.Box.currentIndexChanged.connect(self.Choosing)
+    
+
+
+    def combo_box_selection_changed(self, index):
+        """
+        @brief Updates the displayed figure when the combo box selection changes.
+
+        This method is triggered when the user selects a different item from the combo box.
+        It updates the figure displayed in the UI by calling the `display_figure` method and passing
+        the selected index.
+
+        Parameters:
+            - index (int): The index of the selected item in the combo box.
+
+        Action:
+            - Calls the `display_figure(index)` method to update the displayed figure based on the selected combo box item.
+
+        Example usage:
+            self.combo_box_selection_changed(index)
+        """
+        self.display_figure(index)
+  
+
+
+    def expand_archives(self, file_names, pattern):
+        """
+        @brief Replaces selected zip/tar archives with the members that match an input pattern.
+
+        Archives cannot be processed as a whole, so every selected archive is listed and replaced by its members 
+        whose base name matches `pattern`, as 'archive::member' names that `open_input` reads directly. The members 
+        are ordered by their volume index with `get_sort_key`, so `thermal_displacements.yaml-N` members keep the 
+        same order as separately loaded files. Other files (including single compressed files) are kept unchanged.
+
+        Parameters:
+            - file_names (list of str): The selected file names.
+            - pattern (str): Regular expression matched against the base name of each archive member.
+
+        Returns:
+            - list of str: The file names with archives expanded into their matching members.
+
+        Example usage:
+            file_names = self.expand_archives(file_names, r"thermal_displacements.*\.yaml")
+        """
+        expanded = []
+        for file_name in file_names:
+            if not is_archive(file_name):
+                expanded.append(file_name)
+                continue
+            try:
+                members = [member for member in list_archive_members(file_name) if re.search(pattern, os.path.basename(member))]
+            except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+                QMessageBox.warning(self, "Archive Not Readable", f"The archive '{file_name}' could not be read:\n{e}")
+                continue
+            if not members:
+                QMessageBox.information(self, "No Matching Files", f"The archive '{file_name}' contains no matching input files.")
+            members.sort(key=self.get_sort_key)
+            expanded.extend(file_name + ARCHIVE_SEPARATOR + member for member in members)
+        return expanded
+
+
+
+    def toggleWatch(self):
+        """
+        @brief Starts watching a run directory for new thermal-displacements files, or stops watching.
+
+        When watching starts, the structure, e-v and V(T) files of the selected directory are loaded, and every
+        thermal-displacements file already present or appearing later is ingested by `pollWatchedFiles`.
+        The running fit has one polynomial degree, so an automatic or PCHIP selection in `box_degree` is 
+        replaced by degree 2 with a notice. The button toggles between starting and stopping the watch.
+
+        Example usage:
+            self.toggleWatch()
+        """
+        if self.watch_directory is not None:
+            self.watcher.removePaths(self.watcher.directories() + self.watcher.files())
+            self.watch_timer.stop()
+            for stamp, future in self.watch_jobs.values():
+                future.cancel()
+            self.watch_jobs = {}
+            self.watch_directory = None
+            self.btn_watch.setText("Watch Run Directory")
+            return
+
+        options = QFileDialog.Options()
+        options |= QFileDialog.DontUseNativeDialog
+        directory = QFileDialog.getExistingDirectory(self, "Select Run Directory to Watch", "", options=options)
+        if not directory:
+            QMessageBox.information(self, "No Directory Selected", "No directory was selected.")
+            return
+        try:
+            run = scan_run_directory(directory, self.input_cache)
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Invalid Run Directory", str(error))
+            return
+        if not run["phonopy"] or not run["ev"] or not run["vt"]:
+            QMessageBox.warning(self, "Incomplete Run Directory",
+                                "Watching needs the phonopy.yaml, e-v and volume-temperature files in the directory.")
+            return
+        if self.loaded_files1 or self.loaded_files2 or self.loaded_files3 or self.loaded_files4:
+            reply = QMessageBox.question(self, "Replace Files", "Replace the loaded files with the files of the watched directory?",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+
+        self.clearLoadedFiles()
+        self.addFileGroup(run["phonopy"], self.loaded_files1, self.graphics_load1)
+        self.addFileGroup(run["vt"][:1], self.loaded_files3, self.graphics_load3)
+        self.addFileGroup(run["ev"][:1], self.loaded_files4, self.graphics_load4)
+        self.Er_const_list.clear()
+        self.atom_masses.clear()
+        self.atom_names.clear()
+        self.atom_numbers.clear()
+        self.parsed_displacements.clear()
+        self.outfile.clear()
+        self.outfile_names.clear()
+        self.factor_list = []
+        self.get_atom_info()
+        self.map_names_to_numbers()
+        self.ev_volume()
+        self.temp_vol()
+        # The files arrive one by one, so the atoms are not grouped into sites
+        self.site_atoms = np.arange(len(self.atom_masses))
+        self.site_of_atom = self.site_atoms
+
+        volumes = np.asarray(self.ev_vol_list, dtype=float)
+        degree = self.get_fit_degree()
+        if not isinstance(degree, int):
+            QMessageBox.information(self, "Fit Degree", f"Watch mode fits one polynomial degree to all series, so "
+                                    f"'{self.box_degree.currentText()}' is replaced by degree 2.")
+            self.box_degree.setCurrentText('2')
+            degree = 2
+        self.watch_fit = IncrementalPolynomialFit(volumes.mean(), max(np.ptp(volumes) / 2, 1.0), degree)
+        self.watch_volumes = {}
+        self.watch_stamps = {}
+        self.watch_failed = {}
+        self.watch_directory = directory
+        self.btn_watch.setText("Stop Watching")
+        self.watcher.addPath(directory)
+        self.watchDirectoryChanged(directory)
+
+
+
+    def watchDirectoryChanged(self, path):
+        """
+        @brief Starts polling the watched directory for new thermal-displacements files.
+
+        Called by `self.watcher` when the directory changes. Nothing is read here; `pollWatchedFiles` checks 
+        the files on the ticks of `self.watch_timer`.
+
+        Parameters:
+            - path (str): The changed directory.
+        """
+        if self.watch_directory is not None:
+            self.watch_timer.start()
+
+
+
+    def pollWatchedFiles(self):
+        """
+        @brief Ingests the thermal-displacements files that appeared in the watched directory and are complete.
+
+        Called by `self.watch_timer`. A new file is taken as written once its size and modification time 
+        (`input_stamp`) are the same on two ticks; it is then parsed on `self.prefetch_pool`, so the interface 
+        stays responsive. A file that changed during the parse is still being written and is polled again. A 
+        file that does not reach the last V(T) temperature or has fewer temperatures than the files already 
+        ingested (e.g. of a crashed job), fails to parse or has another atom count is reported once and 
+        retried only once it changes. The timer stops when no file is pending, until the directory changes again.
+
+        The file `thermal_displacements.yaml-N` belongs to the e-v row `N - N0`, where `N0` is the lowest 
+        suffix seen so far (see `volume_rows`); a second copy of a volume (e.g. a .gz next to the plain file) is 
+        reported once and ignored. Each new volume is added to `self.watch_fit` without refitting the others; if a 
+        file with a lower suffix appears, the rows shift and the fit is rebuilt from the arrays already in memory.
+        """
+        if self.watch_directory is None:
+            self.watch_timer.stop()
+            return
+        try:
+            names = sorted(os.listdir(self.watch_directory))
+        except OSError:
+            return
+        if self.prefetch_pool is None:
+            self.prefetch_pool = ThreadPoolExecutor(max_workers=2)
+
+        pending = False
+        rejected = []
+        taken = {volume_suffix(file_name): file_name for file_name in list(self.parsed_displacements) + list(self.watch_jobs)}
+        candidates, duplicates = unique_volume_files([os.path.join(self.watch_directory, name) for name in names 
+                                                      if run_file_kind(name) == "displacements"])
+        kept = {volume_suffix(file_name): file_name for file_name in candidates}
+        for file_name in candidates + duplicates:
+            if file_name in self.parsed_displacements or file_name in self.watch_jobs:
+                continue
+            try:
+                stamp = input_stamp(file_name)
+            except OSError:
+                continue
+            if self.watch_failed.get(file_name) == stamp:
+                continue
+            if file_name in duplicates or volume_suffix(file_name) in taken:
+                same = taken.get(volume_suffix(file_name), kept[volume_suffix(file_name)])
+                rejected.append(f"{file_name}: same volume as {same}; it is ignored.")
+                self.watch_failed[file_name] = stamp
+                continue
+            if self.watch_stamps.get(file_name) != stamp:
+                self.watch_stamps[file_name] = stamp
+            else:
+                self.watch_jobs[file_name] = (stamp, self.prefetch_pool.submit(load_displacements, self.input_cache, [file_name], True))
+            pending = True
+
+        natom = len(self.atom_masses)
+        added = []
+        for file_name, (stamp, future) in list(self.watch_jobs.items()):
+            if not future.done():
+                pending = True
+                continue
+            del self.watch_jobs[file_name]
+            try:
+                arrays = future.result()[file_name]
+                current = input_stamp(file_name)
+            except (OSError, ValueError) as error:
+                rejected.append(f"{file_name}: {error}")
+                self.watch_failed[file_name] = stamp
+                continue
+            temperatures = arrays["temperatures"]
+            complete = (len(temperatures) > 0 and (not len(self.temp_list) or temperatures[-1] >= self.temp_list[-1]) 
+                        and (not self.outfile or len(temperatures) >= len(self.parsed_displacements[self.outfile[0]][0])))
+            if current != stamp:
+                self.watch_stamps[file_name] = current
+                pending = True
+                continue
+            if not complete:
+                last = f"{temperatures[-1]:g} K" if len(temperatures) else "no temperature"
+                rejected.append(f"{file_name}: ends at {last} after {len(temperatures)} temperatures; it is ingested once it changes.")
+                self.watch_failed[file_name] = stamp
+                continue
+            if arrays["displacements"].shape[1] != natom:
+                rejected.append(f"{file_name}: natom is {arrays['displacements'].shape[1]}, but the structure file has {natom} atoms.")
+                self.watch_failed[file_name] = stamp
+                continue
+            self.parsed_displacements[file_name] = (arrays["temperatures"], arrays["displacements"])
+            added.append(file_name)
+        if not pending:
+            self.watch_timer.stop()
+        if rejected:
+            QMessageBox.warning(self, "Input Mismatch", "\n".join(rejected))
+        if not added:
+            return
+
+        self.outfile[:] = sorted(self.parsed_displacements, key=self.get_sort_key)
+        self.outfile_names[:] = self.outfile
+        self.addFileGroup(added, self.loaded_files2, self.graphics_load2)
+        rows = volume_rows(self.outfile)
+        outside = [file_name for file_name in added if rows[file_name] >= len(self.ev_vol_list)]
+        if outside:
+            QMessageBox.warning(self, "Volume Mismatch", f"No e-v volume for: {', '.join(outside)}")
+
+        if any(self.watch_volumes.get(file_name, row) != row for file_name, row in rows.items()):
+            self.watch_fit = IncrementalPolynomialFit(self.watch_fit.center, self.watch_fit.scale, self.watch_fit.degree)
+            self.watch_volumes = {}
+        for file_name, row in rows.items():
+            if file_name not in self.watch_volumes and row < len(self.ev_vol_list):
+                self.watch_fit.add(self.ev_vol_list[row], self.parsed_displacements[file_name][1])
+                self.watch_volumes[file_name] = row
+        self.refreshWatchResults()
+
+
+
+    def refreshWatchResults(self):
+        """
+        @brief Evaluates the running watch-mode fit and redraws the Mossbauer factor and MSD graphs.
+
+        Nothing is drawn until the fit has enough volumes. The coefficients, the MSD(T, V) surface and the 
+        results have the layout of `Fitting_chunked`.
+        """
+        if self.watch_fit.count <= self.watch_fit.degree:
+            return
+        self.setFitCoefficients(self.watch_fit.coefficients())
+        self.buildSurface()
+        self.Imputing()
+
+        self.Mfactor()
+        if self.Box.count() != 2 * len(self.site_atoms):
+            self.GenerateComboBox()
+        for figure in self.generated_graphs_factor + self.generated_graphs_mi1:
+            plt.close(figure)
+        self.Ploting()
+
+
 
+    def prefetch_inputs(self, file_names, kind):
+        """
+        @brief Starts reading newly selected input files in the background.
+
+        Thermal-displacements files first have their headers read (see `read_displacement_header`), so 
+        mismatches are reported within moments of the selection, and are then parsed into memory through 
+        `load_displacements`. Structure files (`kind` 'primitive_cell') and the e-v and V(T) files (`kind` 
+        'columns') are read into the input cache. `self.prefetch_timer` collects the finished jobs.
+
+        Parameters:
+            - file_names (list of str): The newly selected files.
+            - kind (str): 'displacements', 'primitive_cell' or 'columns'.
+
+        Example usage:
+            self.prefetch_inputs(["thermal_displacements.yaml-2"], "displacements")
+        """
+        if not file_names:
+            return
+        if self.prefetch_pool is None:
+            self.prefetch_pool = ThreadPoolExecutor(max_workers=2)
+
+        def read_all(reader):
+            outcomes = {}
+            for file_name in file_names:
+                try:
+                    outcomes[file_name] = reader(file_name)
+                except Exception as error:
+                    outcomes[file_name] = error
+            return outcomes
+
+        if kind == "displacements":
+            self.pending_prefetch.append(("headers", self.prefetch_pool.submit(read_all, read_displacement_header)))
+            future = self.prefetch_pool.submit(load_displacements, self.input_cache, file_names, self.get_memory_budget() is not None)
+            for file_name in file_names:
+                try:
+                    self.prefetched[file_name] = (input_stamp(file_name), future)
+                except OSError:
+                    continue
+        else:
+            parser = read_primitive_cell if kind == "primitive_cell" else read_columns
+            future = self.prefetch_pool.submit(read_all, lambda file_name: self.input_cache.fetch(file_name, kind, parser))
+        self.pending_prefetch.append((kind, future))
+        self.prefetch_timer.start()
+
+
+
+    def collect_prefetch(self):
+        """
+        @brief Collects finished background jobs and reports unreadable files and input mismatches.
+
+        Called by `self.prefetch_timer`. Headers of thermal-displacements files are stored in 
+        `self.displacement_headers` and, together with newly read structure files, checked by `input_problems`. 
+        A failed parse is dropped from `self.prefetched`, so `Cleaning` reads the file again.
+
+        Example usage:
+            self.prefetch_timer.timeout.connect(self.collect_prefetch)
+        """
+        finished = [job for job in self.pending_prefetch if job[1].done()]
+        if not finished:
+            return
+        self.pending_prefetch = [job for job in self.pending_prefetch if job not in finished]
+        if not self.pending_prefetch:
+            self.prefetch_timer.stop()
+
+        errors = []
+        check = False
+        for kind, future in finished:
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                errors.append(str(error))
+                self.prefetched = {file_name: job for file_name, job in self.prefetched.items() if job[1] is not future}
+                continue
+            if kind == "displacements":
+                continue
+            if kind == "directory":
+                self.ingest_run_directory(future.result())
+                continue
+            for file_name, outcome in future.result().items():
+                if isinstance(outcome, Exception):
+                    errors.append(f"{file_name}: {outcome}")
+                elif kind == "headers" and file_name in self.loaded_files2:
+                    self.displacement_headers[file_name] = outcome
+            check = check or kind in ("headers", "primitive_cell")
+
+        problems = errors + (self.input_problems() if check else [])
+        if problems:
+            QMessageBox.warning(self, "Input Mismatch", "\n".join(problems))
+
+
+
+    def input_problems(self, read_missing=False):
+        """
+        @brief Checks the thermal-displacements headers against the structure and against each other.
+
+        The atom count (`natom:`) of every file in `self.loaded_files2` must match the number of atoms of the 
+        primitive cell in `self.loaded_files1`, and all files must share the same atom count, `freq_min:` and 
+        temperature grid (start and step), and either all or none of them must hold displacement matrices. Files whose parse has finished must also have the same number of 
+        temperatures. With `read_missing`, the V(T) files are also checked for monotonic temperature grids and 
+        the e-v file for one volume per thermal-displacements file. Once the parse of the thermal-displacements 
+        files has finished, the V(T) temperatures must lie within their temperatures.
+
+        Parameters:
+            - read_missing (bool): Read the headers (and structure) that are not known yet instead of skipping them.
+
+        Returns:
+            - list of str: A description of every problem found; empty if the inputs are consistent.
+
+        Example usage:
+            problems = self.input_problems(read_missing=True)
+        """
+        problems = []
+        headers = {}
+        for file_name in self.loaded_files2:
+            header = self.displacement_headers.get(file_name)
+            if header is None and read_missing:
+                try:
+                    header = self.displacement_headers[file_name] = read_displacement_header(file_name)
+                except (OSError, ValueError) as error:
+                    problems.append(f"{file_name}: {error}")
+            if header is not None:
+                headers[file_name] = header
+
+        natom = 0
+        for file_name in self.loaded_files1:
+            try:
+                if read_missing:
+                    cell = self.input_cache.fetch(file_name, "primitive_cell", read_primitive_cell)
+                else:
+                    cell = self.input_cache.load(file_name, "primitive_cell")
+            except (OSError, ValueError) as error:
+                problems.append(f"{file_name}: {error}")
+                cell = None
+            if cell is None:
+                natom = None
+                break
+            natom += len(cell["numbers"])
+
+        reference = None
+        for file_name, header in headers.items():
+            if header["natom"] is None or not header["temperatures"]:
+                problems.append(f"{file_name}: no 'natom:' or temperature entries found.")
+                continue
+            if self.loaded_files1 and natom is not None and header["natom"] != natom:
+                problems.append(f"{file_name}: natom is {header['natom']}, but the structure file has {natom} atoms.")
+            if reference is None:
+                reference = (file_name, header)
+                continue
+            first_name, first = reference
+            if header["natom"] != first["natom"]:
+                problems.append(f"{file_name}: natom is {header['natom']}, but {first_name} has {first['natom']}.")
+            if header.get("components", 3) != first.get("components", 3):
+                problems.append(f"{file_name}: mixes displacement matrices and diagonal displacements with {first_name}.")
+            if header["freq_min"] != first["freq_min"]:
+                problems.append(f"{file_name}: freq_min is {header['freq_min']}, but {first_name} has {first['freq_min']}.")
+            if len(header["temperatures"]) != len(first["temperatures"]) or not np.allclose(header["temperatures"], first["temperatures"]):
+                problems.append(f"{file_name}: the temperature grid starts {header['temperatures']}, but {first_name} starts {first['temperatures']}.")
+
+        grids = {}
+        if read_missing:
+            for file_name in self.loaded_files3:
+                try:
+                    grids[file_name] = read_temperature_volume(self.input_cache.fetch(file_name, "columns", read_columns)["columns"], file_name)[0]
+                except (OSError, ValueError) as error:
+                    problems.append(f"{file_name}: {error}")
+            for file_name in self.loaded_files4[:1]:
+                try:
+                    n_volumes = len(self.input_cache.fetch(file_name, "columns", read_columns)["columns"])
+                except (OSError, ValueError) as error:
+                    problems.append(f"{file_name}: {error}")
+                    continue
+                if self.loaded_files2 and n_volumes != len(self.loaded_files2):
+                    problems.append(f"{file_name}: {n_volumes} e-v volumes for {len(self.loaded_files2)} thermal-displacements files.")
+
+        counts = {}
+        ranges = []
+        for file_name in self.loaded_files2:
+            stamp, future = self.prefetched.get(file_name, (None, None))
+            if future is not None and future.done() and not future.cancelled() and future.exception() is None:
+                temperatures = future.result()[file_name]["temperatures"]
+                counts[file_name] = len(temperatures)
+                if len(temperatures):
+                    ranges.append((temperatures[0], temperatures[-1]))
+        if len(set(counts.values())) > 1:
+            problems.append("The files have different numbers of temperatures: " 
+                            + ", ".join(f"{file_name}: {count}" for file_name, count in counts.items()))
+        elif ranges:
+            low, high = max(low for low, _ in ranges), min(high for _, high in ranges)
+            for file_name, temperatures in grids.items():
+                outside = temperatures[(temperatures < low) | (temperatures > high)]
+                if outside.size:
+                    problems.append(f"{file_name}: the temperatures {', '.join(f'{t:g}' for t in outside)} K lie outside "
+                                    f"the thermal-displacements files ({low:g}-{high:g} K).")
+        return problems
+
+
+
+    def openRunDirectory(self):
+        """
+        @brief Opens a directory dialog and loads all input files of a PHONOPY run directory at once.
 
+        The directory is scanned in the background by `scan_run_directory`; `ingest_run_directory` then 
+        loads the grouped files once the scan has finished.
 
+        Example usage:
+            self.openRunDirectory()
+        """
+        options = QFileDialog.Options()
+        options |= QFileDialog.DontUseNativeDialog
+        directory = QFileDialog.getExistingDirectory(self, "Select Run Directory", "", options=options)
+        if not directory:
+            QMessageBox.information(self, "No Directory Selected", "No directory was selected.")
+            return
+        if self.prefetch_pool is None:
+            self.prefetch_pool = ThreadPoolExecutor(max_workers=2)
+        self.pending_prefetch.append(("directory", self.prefetch_pool.submit(scan_run_directory, directory, self.input_cache)))
+        self.prefetch_timer.start()
 
-        
-        self.scene_load1 = None
-        self.scene_load2 = None
-        self.scene_load3 = None
-        self.scene_load4 = None
 
-        self.graphics_graph.setScene(QGraphicsScene())
 
-        
-        self.fit_list_x= []
-        self.fit_list_y = []
-        self.fit_list_z = []
-        
-        self.setCentralWidget(self.scroll)
+    def ingest_run_directory(self, run):
+        """
+        @brief Loads the grouped files of a scanned run directory in one bulk operation.
 
+        The file `thermal_displacements.yaml-N` belongs to the e-v row `N - N0` (see `volume_rows`), as in watch 
+        mode. Nothing is loaded unless the volume indices cover the rows of the e-v file without gaps. Compressed 
+        copies of a volume are dropped by `scan_run_directory` and named in the summary. Files that are already 
+        loaded are replaced after confirmation.
 
-    
+        Parameters:
+            - run (dict): The result of `scan_run_directory`.
 
-    def open_documentation(self):
+        Example usage:
+            self.ingest_run_directory(scan_run_directory("examples", self.input_cache))
         """
-        @brief Opens the documentation PDF file associated with the application.
+        if not run["phonopy"] or not run["displacements"]:
+            QMessageBox.warning(self, "Incomplete Run Directory", 
+                                "The directory contains no phonopy.yaml or no thermal_displacements.yaml files.")
+            return
+        displacements = run["displacements"]
+        rows = volume_rows(displacements)
+        if run["volumes"] is not None and sorted(rows.values()) != list(range(len(run["volumes"]))):
+            first = self.get_sort_key(displacements[0])
+            missing = sorted(set(range(first, first + len(run["volumes"]))) - {row + first for row in rows.values()})
+            message = (f"The directory contains {len(displacements)} thermal_displacements.yaml files with volume "
+                       f"indices {first} to {first + max(rows.values())}, but {run['ev'][0]} lists {len(run['volumes'])} volumes.")
+            if missing:
+                message += f"\nMissing volume indices: {', '.join(map(str, missing))}"
+            QMessageBox.warning(self, "Volume Mismatch", message)
+            return
 
-        This method opens the specified PDF file using the default PDF viewer on the user's system.
-        The file path is hardcoded and should be updated as necessary. The method includes exception 
-        handling to manage any errors that occur during the file opening process.
+        if self.loaded_files1 or self.loaded_files2 or self.loaded_files3 or self.loaded_files4:
+            reply = QMessageBox.question(self, "Replace Files", "Replace the loaded files with the files of the run directory?", 
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+            self.clearLoadedFiles()
 
-        File Path:
-            - pdf_file_path (str): The file path to the documentation PDF file.
-        
-        Error Handling:
-            - If the file cannot be opened, the method catches the exception and prints an error message.
+        self.addFileGroup(run["phonopy"], self.loaded_files1, self.graphics_load1)
+        self.addFileGroup(displacements, self.loaded_files2, self.graphics_load2)
+        self.addFileGroup(run["vt"][:1], self.loaded_files3, self.graphics_load3)
+        self.addFileGroup(run["ev"][:1], self.loaded_files4, self.graphics_load4)
+        self.prefetch_inputs(self.loaded_files1, "primitive_cell")
+        self.prefetch_inputs(self.loaded_files2, "displacements")
+        self.prefetch_inputs(self.loaded_files3 + self.loaded_files4, "columns")
 
-        Example usage:
-            self.open_documentation()
+        summary = f"Loaded {os.path.basename(self.loaded_files1[0])} and {len(displacements)} thermal_displacements.yaml files."
+        if run["volumes"] is not None:
+            summary += f"\nVolumes {run['volumes'].min()} to {run['volumes'].max()} are mapped to the files by their volume index."
+        if run["duplicates"]:
+            summary += f"\nIgnored copies of the same volumes: {', '.join(map(os.path.basename, run['duplicates']))}"
+        QMessageBox.information(self, "Run Directory Loaded", summary)
 
-        Raises:
-            - Catches and prints any exceptions raised during the file opening process.
-        """
-        pdf_file_path = "User Manual.pdf"  
-        
-        try:
-            os.startfile(pdf_file_path)
-        except Exception as e:
-            print("Error:", e)
-        
-  
-    
-    
-    def GenerateComboBox(self):
-        """
-        @brief Populates the `Box` QComboBox with options based on the number of atoms.
 
-        This method first clears the existing items in the `Box` combo box and then adds new items dynamically. 
-        For each atom in the range from 1 to `n`, where `n` is the last element of the `atom_numbers` list, 
-        two items are added to the combo box: one for "Atom Probability" and one for "Atom MSD".
-        
-        After populating the combo box, the method connects the `currentIndexChanged` signal of the combo box 
-        to the `Choosing` method, which is responsible for handling selection changes.
 
-        Modifies:
-            - self.Box (QComboBox): The combo box that gets populated with new items.
+    def clearLoadedFiles(self):
+        """
+        @brief Removes all loaded input files (`loaded_files1` to `loaded_files4`) and their displayed names.
 
-        Attributes:
-            - atom_numbers (list): A list of atom numbers, where the last element determines the number of items added.
-        
-        Connections:
-            - `self.Box.currentIndexChanged`: Connects the combo box selection change signal to the `Choosing` method.
-        
-        Usage:
-            - Call this method when the list of `atom_numbers` is updated or when the UI needs to be refreshed 
-            to reflect the current state of the atoms data.
-        
         Example usage:
-            self.GenerateComboBox()
-
+            self.clearLoadedFiles()
         """
-        self.Box.clear()
-        n = self.atom_numbers[-1]
-        for i in range(1, n  +1):
-            self.Box.addItem(f"Atom Probability {i}")
-            self.Box.addItem(f"Atom MSD {i}")
-        self.Box.currentIndexChanged.connect(self.Choosing)
-    
+        for loaded_files, text_items, scene in ((self.loaded_files1, self.text_item1, self.scene_load1), 
+                                                (self.loaded_files2, self.text_item2, self.scene_load2), 
+                                                (self.loaded_files3, self.text_item3, self.scene_load3), 
+                                                (self.loaded_files4, self.text_item4, self.scene_load4)):
+            loaded_files.clear()
+            text_items.clear()
+            if scene is not None:
+                scene.clear()
+        self.prefetched.clear()
+        self.displacement_headers.clear()
 
 
-    def combo_box_selection_changed(self, index):
+
+    def addFileGroup(self, file_names, loaded_files, graphics_view):
         """
-        @brief Updates the displayed figure when the combo box selection changes.
+        @brief Adds several files to a list of loaded files and lays out their names once.
 
-        This method is triggered when the user selects a different item from the combo box.
-        It updates the figure displayed in the UI by calling the `display_figure` method and passing
-        the selected index.
+        Unlike the upload dialogs, the names are positioned in a single pass after all files have been added, 
+        so loading many files at once stays fast.
 
         Parameters:
-            - index (int): The index of the selected item in the combo box.
-
-        Action:
-            - Calls the `display_figure(index)` method to update the displayed figure based on the selected combo box item.
+            - file_names (list of str): The files to add; files that are already loaded are skipped.
+            - loaded_files (list of str): The list to extend (e.g. `self.loaded_files2`).
+            - graphics_view (QGraphicsView): The view that displays the list (e.g. `self.graphics_load2`).
 
         Example usage:
-            self.combo_box_selection_changed(index)
+            self.addFileGroup(["thermal_displacements.yaml-2"], self.loaded_files2, self.graphics_load2)
         """
-        self.display_figure(index)
-  
+        for file_name in file_names:
+            if file_name not in loaded_files:
+                loaded_files.append(file_name)
+                self.displayFileName(file_name, graphics_view, 0)
+        scene = graphics_view.scene()
+        if scene is None:
+            return
+        for index, item in enumerate(scene.items()):
+            if isinstance(item, QGraphicsTextItem):
+                item.setPos(0, index*20)
+        scene.setSceneRect(scene.itemsBoundingRect())
+        graphics_view.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        graphics_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        graphics_view.update()
+
 
 
     def openFileDialog1(self):
@@ -744,7 +3400,9 @@ class my_window(QMainWindow):
 
         Functionality:
             - Opens a file dialog for the user to select files.
+            - Replaces selected zip/tar archives with their matching input files (see `expand_archives`).
             - Adds new files to `self.loaded_files1` and skips duplicates.
+            - Starts reading the new files in the background (see `prefetch_inputs`).
             - Displays the names of the loaded files in the graphics view (`self.graphics_load1`).
             - Adjusts the scroll bar policies depending on the number of items displayed.
 
@@ -772,6 +3430,7 @@ class my_window(QMainWindow):
         options = QFileDialog.Options()
         options |= QFileDialog.DontUseNativeDialog
         file_names, _ = QFileDialog.getOpenFileNames(self, "Select Files for Upload", "", "All Files (*);;Text Files (*.txt)", options=options)
+        file_names = self.expand_archives(file_names, r"phonopy.*\.yaml")
         
 
         
@@ -801,6 +3460,8 @@ class my_window(QMainWindow):
                           
             
             
+            self.prefetch_inputs([file_name for file_name in file_names if file_name not in double_files], "primitive_cell")
+
             if len(double_files) == 1:
                     QMessageBox.information(self, "File Already Loaded", f"The file '{double_files[0]}' is already loaded.")
             elif len(double_files) > 1:
@@ -838,7 +3499,9 @@ class my_window(QMainWindow):
 
         Functionality:
             - Opens a file dialog for the user to select files.
+            - Replaces selected zip/tar archives with their matching input files (see `expand_archives`).
             - Adds new files to `self.loaded_files2` and skips duplicates.
+            - Starts reading the new files in the background (see `prefetch_inputs`).
             - Displays the names of the loaded files in the graphics view (`self.graphics_load2`).
             - Adjusts the scroll bar policies depending on the number of items displayed.
 
@@ -866,6 +3529,7 @@ class my_window(QMainWindow):
         options = QFileDialog.Options()
         options |= QFileDialog.DontUseNativeDialog
         file_names, _ = QFileDialog.getOpenFileNames(self, "Select Files for Upload", "", "All Files (*);;Text Files (*.txt)", options=options)
+        file_names = self.expand_archives(file_names, r"thermal_displacements.*\.yaml")
         
 
         double_files = []
@@ -894,6 +3558,8 @@ class my_window(QMainWindow):
                           
             
             
+            self.prefetch_inputs([file_name for file_name in file_names if file_name not in double_files], "displacements")
+
             if len(double_files) == 1:
                     QMessageBox.information(self, "File Already Loaded", f"The file '{double_files[0]}' is already loaded.")
             elif len(double_files) > 1:
@@ -932,7 +3598,9 @@ class my_window(QMainWindow):
 
         Functionality:
             - Opens a file dialog for the user to select files.
+            - Replaces selected zip/tar archives with their matching input files (see `expand_archives`).
             - Adds new files to `self.loaded_files3` and skips duplicates.
+            - Starts reading the new files in the background (see `prefetch_inputs`).
             - Displays the names of the loaded files in the graphics view (`self.graphics_load3`).
             - Adjusts the scroll bar policies depending on the number of items displayed.
 
@@ -960,6 +3628,7 @@ class my_window(QMainWindow):
         options = QFileDialog.Options()
         options |= QFileDialog.DontUseNativeDialog
         file_names, _ = QFileDialog.getOpenFileNames(self, "Select Files for Upload", "", "All Files (*);;Text Files (*.txt)", options=options)
+        file_names = self.expand_archives(file_names, r"volume-temperature")
         
 
         
@@ -989,6 +3658,8 @@ class my_window(QMainWindow):
                           
             
             
+            self.prefetch_inputs([file_name for file_name in file_names if file_name not in double_files], "columns")
+
             if len(double_files) == 1:
                     QMessageBox.information(self, "File Already Loaded", f"The file '{double_files[0]}' is already loaded.")
             elif len(double_files) > 1:
@@ -1026,7 +3697,9 @@ class my_window(QMainWindow):
 
         Functionality:
             - Opens a file dialog for the user to select files.
+            - Replaces selected zip/tar archives with their matching input files (see `expand_archives`).
             - Adds new files to `self.loaded_files4` and skips duplicates.
+            - Starts reading the new files in the background (see `prefetch_inputs`).
             - Displays the names of the loaded files in the graphics view (`self.graphics_load4`).
             - Adjusts the scroll bar policies depending on the number of items displayed.
 
@@ -1054,6 +3727,7 @@ class my_window(QMainWindow):
         options = QFileDialog.Options()
         options |= QFileDialog.DontUseNativeDialog
         file_names, _ = QFileDialog.getOpenFileNames(self, "Select Files for Upload", "", "All Files (*);;Text Files (*.txt)", options=options)
+        file_names = self.expand_archives(file_names, r"e-v")
         
 
         
@@ -1083,6 +3757,8 @@ class my_window(QMainWindow):
                           
             
             
+            self.prefetch_inputs([file_name for file_name in file_names if file_name not in double_files], "columns")
+
             if len(double_files) == 1:
                     QMessageBox.information(self, "File Already Loaded", f"The file '{double_files[0]}' is already loaded.")
             elif len(double_files) > 1:
@@ -1178,30 +3854,39 @@ class my_window(QMainWindow):
 
         This method reads the files listed in `self.loaded_files5`. Each file is expected to contain two columns 
         of numerical data, with the first column corresponding to the X-axis and the second column corresponding 
-        to the Y-axis. The method reads the data from each file, appends the X-axis values to `self.xAxis`, and 
-        the Y-axis values to `self.yAxis`.
+        to the Y-axis; an optional third column holds the error bars. Comment lines starting with `#` are skipped. 
+        The data of all files replaces the previous `self.xAxis`, `self.yAxis` and `self.yError` arrays.
 
         Attributes:
             - self.loaded_files5 (list of str): A list of file paths that will be processed.
-            - self.xAxis (list of float): A list that stores the X-axis data extracted from the files.
-            - self.yAxis (list of float): A list that stores the Y-axis data extracted from the files.
+            - self.xAxis (numpy.ndarray): The X-axis data extracted from the files.
+            - self.yAxis (numpy.ndarray): The Y-axis data extracted from the files.
+            - self.yError (numpy.ndarray or None): The error bars, if every file has a third column.
 
         Functionality:
-            - Reads and processes data files listed in `self.loaded_files5`.
-            - Appends the first column of each file to `self.xAxis` and the second column to `self.yAxis`.
+            - Reads the data files listed in `self.loaded_files5` with `read_experimental_data`.
+            - Stores the first column of the files in `self.xAxis`, the second in `self.yAxis` and the third in `self.yError`.
 
         Edge Cases:
-            - Handles any file reading errors, such as incorrectly formatted files, and notifies the user of any issues.
+            - Notifies the user of incorrectly formatted files and keeps the previous data.
         
         Example usage:
             self.OpenExperimentalData()
         """
-        for file_name in self.loaded_files5:
-            with open(file_name, 'r') as data:        
-                for line in data:
-                    p = line.split()
-                    self.xAxis.append(float(p[0]))
-                    self.yAxis.append(float(p[1]))
+        try:
+            data = [read_experimental_data(file_name) for file_name in self.loaded_files5]
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Invalid Experimental Data", str(error))
+            self.loaded_files5.clear()
+            return
+        if not data:
+            return
+        self.xAxis = np.concatenate([temperatures for temperatures, _, _ in data])
+        self.yAxis = np.concatenate([values for _, values, _ in data])
+        if all(errors is not None for _, _, errors in data):
+            self.yError = np.concatenate([errors for _, _, errors in data])
+        else:
+            self.yError = None
 
 
     def ClearingExpData(self):
@@ -1214,16 +3899,18 @@ class my_window(QMainWindow):
 
         Attributes:
             - self.loaded_files5 (list of str): List containing the file paths of the loaded experimental data files.
-            - self.xAxis (list of float): List storing the X-axis data points from the experimental data.
-            - self.yAxis (list of float): List storing the Y-axis data points from the experimental data.
+            - self.xAxis (numpy.ndarray): X-axis data points from the experimental data.
+            - self.yAxis (numpy.ndarray): Y-axis data points from the experimental data.
+            - self.yError (numpy.ndarray or None): Error bars of the experimental data.
 
         Example usage:
             self.clear_experimental_data()
 
         """
         self.loaded_files5.clear()
-        self.xAxis.clear()
-        self.yAxis.clear()
+        self.xAxis = []
+        self.yAxis = []
+        self.yError = None
 
         
     def displayMatplotlibFigure(self, figure):
@@ -1516,6 +4203,8 @@ class my_window(QMainWindow):
                     file_name = item.toPlainText()
                     self.loaded_files2.remove(file_name)
                     self.text_item2.remove(item)
+                    self.prefetched.pop(file_name, None)
+                    self.displacement_headers.pop(file_name, None)
 
                     self.scene_load2.removeItem(item)
                     
@@ -1534,6 +4223,8 @@ class my_window(QMainWindow):
             else:
                 self.scene_load2.clear()
                 self.loaded_files2.clear()
+                self.prefetched.clear()
+                self.displacement_headers.clear()
                 QMessageBox.information(
                     self, "Files Deleted", "All files have been deleted."
                 )
@@ -1774,19 +4465,19 @@ class my_window(QMainWindow):
         @brief Processes the first file in `loaded_files4` and extracts volume data.
 
         This method processes the first file in the `self.loaded_files4` list. If no files are loaded, 
-        the method returns without performing any actions. If there is at least one file, it opens the 
-        first file, reads the contents line by line, splits each line into components, and appends the 
-        first component (assumed to be a volume value) as a float to `self.ev_vol_list`.
+        the method returns without performing any actions. If there is at least one file, its columns are 
+        taken from the input cache (the file is parsed only if it has not been seen before), and the first 
+        column (assumed to be the volume values) is stored as an array in `self.ev_vol_list`.
 
         Behavior:
             - Checks whether `self.loaded_files4` contains any files.
             - Returns immediately if no files are loaded.
-            - If files are present, opens and processes the first file.
-            - Extracts the first component of each line as a volume (float) and stores it in `self.ev_vol_list`.
+            - If files are present, reads the columns of the first file through `self.input_cache`.
+            - Stores the first column (the volumes) in `self.ev_vol_list` as a view of the parsed array.
 
         Attributes:
             - `self.loaded_files4` (list of str): A list of file paths to be processed.
-            - `self.ev_vol_list` (list of float): A list that stores the extracted volume data from the first file.
+            - `self.ev_vol_list` (numpy.ndarray): The volumes of the first file.
 
         Example usage:
             self.ev_volume()
@@ -1795,10 +4486,8 @@ class my_window(QMainWindow):
         if not self.loaded_files4:
             return                         
         file_name = self.loaded_files4[0] 
-        with open(file_name, 'r') as data:
-            for line in data:
-                p = line.split()
-                self.ev_vol_list.append(float(p[0]))
+        columns = self.input_cache.fetch(file_name, "columns", read_columns)["columns"]
+        self.ev_vol_list = columns[:, 0]
 
         
 
@@ -1809,33 +4498,71 @@ class my_window(QMainWindow):
 
         This method processes the files loaded in `self.loaded_files3`. It checks if any files are present 
         in the list, and if no files are loaded, it returns without performing any actions. If files are present, 
-        it iterates through each file, reading its contents line by line. Each line is split into components, 
-        with the first component (assumed to be temperature) appended to `self.temp_list` and the second component 
-        (assumed to be volume) appended to `self.volume_list`.
+        it takes the columns of each file from the input cache and splits them with `read_temperature_volume`: 
+        the first column holds the temperatures, every further column one V(T) curve. The first curve of the 
+        first file goes to `self.temp_list` and `self.volume_list`; every other curve, of any file and on its 
+        own temperature grid, is compared with it (see `evaluateCurves`). The temperatures of every file must 
+        increase monotonically.
 
         Behavior:
             - Checks whether `self.loaded_files3` contains any files.
             - Returns immediately if no files are loaded.
-            - If files are present, opens each file and processes its contents.
-            - Extracts the first component of each line as a temperature (float) and stores it in `self.temp_list`.
-            - Extracts the second component of each line as a volume (float) and stores it in `self.volume_list`.
+            - If files are present, reads the columns of each file through `self.input_cache`.
+            - Stores the first curve in `self.temp_list` and `self.volume_list` and the others with `addCurveColumns`.
 
         Attributes:
             - `self.loaded_files3` (list of str): A list of file paths that are to be processed.
-            - `self.temp_list` (list of float): A list where the extracted temperature data is stored.
-            - `self.volume_list` (list of float): A list where the extracted volume data is stored.
+            - `self.temp_list` (numpy.ndarray): The temperature grid of the first curve, shape `(n_temperatures,)`.
+            - `self.volume_list` (numpy.ndarray): The volumes of the first V(T) curve, shape `(n_temperatures,)`.
+            - `self.curve_temperatures`, `self.curve_volumes` (list of numpy.ndarray): The other curves.
+
+        Raises:
+            - ValueError: If a file has fewer than two columns, a different number of curves than the others 
+              or temperatures that do not increase.
 
         Example usage:
             self.temp_vol()
         """
         if not self.loaded_files3:
             return
-        for file_names in self.loaded_files3:
-            with open(file_names, 'r') as data:
-                for line in data:
-                    p = line.split()
-                    self.temp_list.append(float(p[0]))
-                    self.volume_list.append(float(p[1]))
+        grids = [read_temperature_volume(self.input_cache.fetch(file_name, "columns", read_columns)["columns"], file_name) 
+                 for file_name in self.loaded_files3]
+        self.clearCurves()
+        self.temp_list, volumes = grids[0]
+        self.volume_list = volumes[:, 0]
+        for file_name, (temperatures, volumes) in zip(self.loaded_files3, grids):
+            self.addCurveColumns(file_name, temperatures, volumes, first=int(file_name == self.loaded_files3[0]))
+
+
+
+    def clearCurves(self):
+        """
+        @brief Removes the V(T) curves compared with the first one.
+        """
+        self.curve_labels = []
+        self.curve_temperatures = []
+        self.curve_volumes = []
+        self.curve_msd = []
+        self.curve_factors = []
+
+
+
+    def addCurveColumns(self, file_name, temperatures, volumes, first=0):
+        """
+        @brief Adds the volume columns of a V(T) file from `first` on to the compared curves.
+
+        The curves are named after the file, with the number of the column if the file has several.
+
+        @param file_name: The V(T) file.
+        @param temperatures: The temperatures of the file, `(n_temperatures,)`.
+        @param volumes: The volume columns, `(n_temperatures, n_columns)` (see `read_temperature_volume`).
+        @param first: The first column to add.
+        """
+        name = os.path.basename(file_name)
+        for column in range(first, volumes.shape[1]):
+            self.curve_labels.append(f"{name} [{column + 1}]" if volumes.shape[1] > 1 else name)
+            self.curve_temperatures.append(np.asarray(temperatures, dtype=float))
+            self.curve_volumes.append(np.asarray(volumes[:, column], dtype=float))
         
 
 
@@ -1843,63 +4570,54 @@ class my_window(QMainWindow):
 
     def Cleaning(self):
             """
-            @brief Cleans and processes files from `loaded_files2` by extracting specific content.
+            @brief Parses the thermal-displacement files from `loaded_files2` into NumPy arrays.
 
-            This method processes the files in `self.loaded_files2` by extracting specific content and writing 
-            it to new output files. Before processing, the method checks if any files are loaded in `self.loaded_files3` 
-            or `self.loaded_files4`. If either of these lists contains files, the method returns without performing any 
-            operations. If both lists are empty, it iterates over each file in `self.loaded_files2`, processes the content, 
-            and creates a new output file with the cleaned content.
+            This method reads every file in `self.loaded_files2` with `parse_thermal_displacements`, which 
+            extracts the temperatures and the X, Y, Z mean square displacements in a single pass without writing 
+            any intermediate files. Files read in the background since their selection (`self.prefetched`) are 
+            taken as they are, unless they changed on disk since. Files that were parsed before are opened 
+            memory-mapped from `self.input_cache` instead of being parsed again; the remaining files are parsed in 
+            parallel on a process pool by `parse_files`, or one at a time if a memory budget is selected. The parsed arrays are stored in `self.parsed_displacements` and the file paths are 
+            collected in `self.outfile`. If `self.loaded_files3` or `self.loaded_files4` contain files 
+            (Quasi-Harmonic Approximation), `self.outfile` is sorted by the volume index of each file.
 
             Behavior:
-                - Checks whether `self.loaded_files4` or `self.loaded_files3` contain any files.
-                - If either list contains files, the method exits immediately.
-                - If both lists are empty, it processes each file in `self.loaded_files2`.
-                - For each file, creates a new output file with the name "cleaned.txt".
-                - Extracts content starting from the 7th character up to the 40th character on lines that begin with "  - [".
-                - Writes the extracted content to the new output file.
-                - Stores the path of the output file in `self.outfile` and the file name in `self.outfile_names`.
+                - Parses each file in `self.loaded_files2` into a temperature vector and a 
+                `(n_temperatures, natom, 3)` displacement array, reusing cached arrays and parsing the 
+                other files in parallel.
+                - Stores the parsed arrays in `self.parsed_displacements`, keyed by the file path.
+                - Appends the file path to `self.outfile` and `self.outfile_names`.
+                - Sorts `self.outfile` by the volume index (`yaml-<number>`) when volume files are loaded.
 
             Attributes:
                 - `self.loaded_files2` (list of str): A list of file paths to be processed.
                 - `self.loaded_files3` (list of str): A list of file paths (checked but not used directly).
                 - `self.loaded_files4` (list of str): A list of file paths (checked but not used directly).
-                - `self.outfile` (list of str): A list to store the paths of the cleaned output files.
-                - `self.outfile_names` (list of str): A list to store the names of the cleaned output files.
+                - `self.parsed_displacements` (dict): Parsed (temperatures, displacements) arrays per file.
+                - `self.outfile` (list of str): A list of the parsed file paths.
+                - `self.outfile_names` (list of str): A list of the parsed file paths.
 
             Example usage:
                 self.Cleaning()
             """
 
-            if not self.loaded_files4 and not self.loaded_files3:
-                for  file_name in self.loaded_files2: 
-                    infile = file_name
-                    outfile = "cleaned"  + ".txt"
-                    paths_outfile = os.path.abspath(outfile)
-                    with open(infile) as fin, open(outfile, "w+") as fout:
-                        lines = fin.readlines()
-                        for i in range(len(lines)):     
-                            if lines[i][0:5] == "  - [":
-                                fout.writelines(lines[i][7:40] + "\n")
-                    
-                    self.outfile.append(paths_outfile)
-                    self.outfile_names.append(paths_outfile)
-
-
-            else:    
-                for  file_name in self.loaded_files2: 
-                    infile = file_name
-                    outfile = "cleaned_" + file_name.split("yaml-")[1] + ".txt"
-                    paths_outfile = os.path.abspath(outfile)
-                    with open(infile) as fin, open(outfile, "w+") as fout:
-                        lines = fin.readlines()
-                        for i in range(len(lines)):     
-                            if lines[i][0:5] == "  - [":
-                                fout.writelines(lines[i][7:40] + "\n")
-                    
-                    self.outfile.append(paths_outfile)
-                    self.outfile_names.append(paths_outfile)
-                self.outfile.sort(key=self.get_sort_key)
+            file_names = list(self.loaded_files2)
+            if self.loaded_files4 or self.loaded_files3:
+                file_names.sort(key=self.get_sort_key)
+
+            cached = {}
+            for file_name in file_names:
+                stamp, future = self.prefetched.get(file_name, (None, None))
+                if future is not None and stamp == input_stamp(file_name):
+                    cached[file_name] = future.result()[file_name]
+            cached.update(load_displacements(self.input_cache, [file_name for file_name in file_names if file_name not in cached], 
+                                             self.get_memory_budget() is not None))
+
+            for file_name in file_names:
+                arrays = cached[file_name]
+                self.parsed_displacements[file_name] = (arrays["temperatures"], arrays["displacements"])
+                self.outfile.append(file_name)
+                self.outfile_names.append(file_name)
 
 
     
@@ -1908,7 +4626,7 @@ class my_window(QMainWindow):
         @brief Extracts a numerical sort key from a filename.
 
         This method is used to extract a numerical value from a filename, specifically for sorting 
-        files in Quasi-Harmonic Approximation. It searches for the pattern 'cleaned_<number>' in the filename 
+        files in Quasi-Harmonic Approximation. It searches for the volume suffix 'yaml-<number>' in the filename 
         using a regular expression. If the pattern is found, the method returns the extracted number as an 
         integer. If the pattern is not found, it returns 0.
 
@@ -1919,210 +4637,107 @@ class my_window(QMainWindow):
             - int: The extracted number as an integer, or 0 if the pattern is not found.
 
         Example usage:
-            - For a filename 'cleaned_-123.txt', this method will return -123.
+            - For a filename 'thermal_displacements.yaml-12', this method will return 12.
 
         Example:
-            sort_key = self.extract_sort_key('cleaned_-123.txt')  # Returns -123
+            sort_key = self.get_sort_key('thermal_displacements.yaml-12')  # Returns 12
         """
 
-        # Search for the pattern 'cleaned_<number>' in the filename
-        match = re.search(r'cleaned_(-?\d+)', filename)
-        if match:
-            return int(match.group(1))
-        return 0
+        return volume_suffix(filename)
 
     
-    
-
+    def findEquivalentSites(self):
+        """
+        @brief Groups the atoms into sites of symmetry-equivalent atoms.
 
+        Atoms with the same name, mass and identical displacements in every file of `self.outfile` are 
+        equivalent (phonopy.yaml does not list the equivalent atoms). The quasi-harmonic fit is done for the first 
+        atom of every site only, and `expandSites` copies the results to the other atoms; the graphs are drawn 
+        once per site.
 
+        After execution, `self.site_atoms` holds the first atom of every site and `self.site_of_atom` the 
+        site of every atom (see `equivalent_sites`).
+        """
+        stacks = [self.parsed_displacements[file_name][1] for file_name in self.outfile]
+        self.site_atoms, self.site_of_atom = equivalent_sites(stacks, self.atom_names, self.atom_masses)
 
-        
-        
 
 
-    def DeletingCleanedFiles(self):
+    def expandSites(self):
         """
-        @brief Deletes all cleaned files listed in `self.files_to_delete` and clears the `outfile` list.
+        @brief Copies the MSD of every site in `self.msd_tensor` to all its atoms.
+        """
+        self.setMsd(self.msd_tensor[self.site_of_atom])
 
-        This method deletes files listed in `self.files_to_delete` and clears the `outfile` list. 
-        It first checks if there are any files in `self.outfile`. If `outfile` is empty, the method exits 
-        without performing any actions. If `outfile` contains files, the method iterates through each file 
-        in `self.files_to_delete`, deletes the corresponding file from the filesystem, and then clears 
-        the `outfile` list.
 
-        Behavior:
-            - Checks whether `self.outfile` contains any files.
-            - If `self.outfile` is empty, the method returns immediately.
-            - Deletes each file in `self.files_to_delete`.
-            - Clears the `outfile` list after all deletions are complete.
 
-        Attributes:
-            - `self.outfile` (list of str): A list containing the paths of cleaned files.
-            - `self.files_to_delete` (list of str): A list of file paths that are to be deleted.
+    def setMsd(self, msd):
+        """
+        @brief Stores the MSD of all atoms and points `mx1`, `my1`, `mz1` at its diagonal components.
 
-        Example usage:
-            self.delete_cleaned_files()
+        @param msd: Array of shape `(natom, n_temperatures, 3)`, or `(natom, n_temperatures, 6)` with the 
+                    off-diagonal components of displacement matrices.
         """
+        self.msd_tensor = msd
+        self.mx1, self.my1, self.mz1 = np.moveaxis(msd[..., :3], 2, 0)
+
 
-        # Check if there are any files in outfile; if not, return
-        if not self.outfile:
-            return
 
- 
-        # Iterate through each file in files_to_delete and remove it
-        for file_names in self.files_to_delete:
-            os.remove(file_names)
-        
-        # Clear the outfile list after deleting the files
-        self.outfile.clear()
-    
     def Msd(self):
         """
-        @brief Processes cleaned files to extract and store the X, Y, Z components of mean square displacements of atoms.
+        @brief Collects the X, Y, Z components of mean square displacements of atoms from the parsed files.
 
-        This method processes each file listed in `self.outfile`, which contains paths to the cleaned files. 
-        For each file, the method reads the contents line by line, assuming the data to be comma-separated 
-        values representing the X, Y, and Z components of mean square displacements. These components are 
-        extracted and stored as floats in three separate lists: `mx`, `my`, and `mz`. After processing each 
-        file, the lists are combined as a list of lists (`[mx, my, mz]`) and appended to `self.data_list`.
+        This method stacks the parsed `(n_temperatures, natom, 3)` displacement arrays of the files listed in 
+        `self.outfile` (in volume order) into one `(n_volumes, n_temperatures, n_sites, 3)` array, 
+        `self.msd_stack`, keeping only the first atom of every group of equivalent atoms (`self.site_atoms`). `self.data_list_x`, `self.data_list_y` and `self.data_list_z` are views of its X, Y 
+        and Z components, one `(n_temperatures, natom)` array per file.
 
         Behavior:
-            - Iterates through each file in `self.outfile`.
-            - Reads each file line by line.
-            - Extracts the X, Y, and Z components from each line and converts them to floats.
-            - Appends the extracted data for each file as a list of lists (`[mx, my, mz]`) to `self.data_list`.
+            - Looks up the parsed displacement array of each file in `self.outfile`.
+            - Stacks the arrays into `self.msd_stack`.
+            - Stores views of the X, Y and Z components in the respective data lists.
 
         Attributes:
-            - `self.outfile` (list of str): A list of paths to the cleaned files.
-            - `self.data_list` (list of list of lists): A list that stores the extracted X, Y, Z data for each file.
-
-        Example:
-            - After processing, `self.data_list` might contain data in the form:
-            `[[[mx1, mx2, ...], [my1, my2, ...], [mz1, mz2, ...]], ...]`
+            - `self.outfile` (list of str): A list of paths to the parsed thermal-displacement files.
+            - `self.parsed_displacements` (dict): Parsed (temperatures, displacements) arrays per file.
+            - `self.msd_stack` (numpy.ndarray): The stacked displacements of all files.
+            - `self.data_list_x`, `self.data_list_y`, `self.data_list_z` (numpy.ndarray): 
+            The X, Y and Z components, shape `(n_volumes, n_temperatures, n_sites)`.
             
         Example usage:
             self.Msd()
         """
-        for file_names in self.outfile:
-            mx = [] 
-            my = []
-            mz = []
-            
-            with open(file_names, 'r') as data:
-                for line in data:
-                    p = line.split(",")
-                    mx.append(float(p[0]))
-                    my.append(float(p[1]))
-                    mz.append(float(p[2]))
-                    
-            self.data_list_x.append(mx) 
-            self.data_list_y.append(my) 
-            self.data_list_z.append(mz)
+        self.msd_stack = np.stack([self.parsed_displacements[file_name][1][:, self.site_atoms] for file_name in self.outfile])
+        self.data_list_x = self.msd_stack[..., 0]
+        self.data_list_y = self.msd_stack[..., 1]
+        self.data_list_z = self.msd_stack[..., 2]
              
     def Msd_sing(self):
         """
-        Processes cleaned files to extract and store X, Y, Z data components.
+        Collects the X, Y, Z data components of the parsed thermal-displacement files.
 
-        This method iterates through each file in `self.outfile`, which contains paths to the cleaned files.
-        For each file, it reads the contents line by line, expecting the data to be comma-separated values 
-        representing X, Y, and Z components. These components are extracted and stored as floats in separate 
-        lists (`mx`, `my`, `mz`). After processing each file, the lists are appended as a list of lists to 
-        `self.data_list`.
+        This method iterates through each file in `self.outfile` and takes its parsed displacement array from 
+        `self.parsed_displacements`. The X, Y and Z components are flattened temperature by temperature and 
+        appended as a list of arrays to `self.data_sing_list`.
 
         Behavior:
         - Iterates through each file in `self.outfile`.
-        - For each file, reads the data line by line.
-        - Extracts the X, Y, and Z components from each line, converting them to floats.
-        - Appends the extracted data for each file as a list of lists (`[mx, my, mz]`) to `self.data_list`.
+        - Splits the parsed displacement array into its X, Y and Z components.
+        - Appends the components for each file as a list (`[mx, my, mz]`) to `self.data_sing_list`.
 
         Attributes:
-        - `self.outfile` (list of str): A list of paths to the cleaned files.
-        - `self.data_list` (list of list of lists): A list to store the extracted X, Y, Z data for each file.
+        - `self.outfile` (list of str): A list of paths to the parsed thermal-displacement files.
+        - `self.parsed_displacements` (dict): Parsed (temperatures, displacements) arrays per file.
+        - `self.data_sing_list` (list of lists): A list to store the extracted X, Y, Z data for each file.
 
         Example:
-        - After processing, `self.data_list` might contain data in the form:
-        `[[[mx1, mx2, ...], [my1, my2, ...], [mz1, mz2, ...]], ...]`
+        - After processing, `self.data_sing_list` might contain data in the form:
+        `[[array([mx1, mx2, ...]), array([my1, my2, ...]), array([mz1, mz2, ...])], ...]`
         """
         for file_names in self.outfile:
-            mx = [] 
-            my = []
-            mz = []
-            
-            with open(file_names, 'r') as data:
-                for line in data:
-                    p = line.split(",")
-                    mx.append(float(p[0]))
-                    my.append(float(p[1]))
-                    mz.append(float(p[2]))
-                    
-            self.data_sing_list.append([mx, my, mz]) 
+            displacements = self.parsed_displacements[file_names][1]
+            self.data_sing_list.append([displacements[:, :, 0].ravel(), displacements[:, :, 1].ravel(), displacements[:, :, 2].ravel()]) 
     
-    def Msd_interpol(self):
-        """
-        @brief Performs linear interpolation on the X, Y, Z components of mean-square displacements.
-
-        This method performs linear interpolation on the X, Y, and Z components of mean-square displacements 
-        for each atom, using the temperature values from `self.temp_list`. The Phonopy calculation typically 
-        produces mean-square displacements at 10 K intervals, so this method interpolates the values to match 
-        the real temperature data in `self.temp_list`.
-
-        Behavior:
-            - Initializes empty lists (`mx2`, `my2`, `mz2`) for each atom to store interpolated values.
-            - Iterates through the temperature data in `self.temp_list`.
-            - For each temperature, calculates the appropriate indices to extract X, Y, Z data from `self.data_list`.
-            - Performs linear interpolation between boundary temperature values for each component (X, Y, Z).
-            - Appends the interpolated X, Y, Z values to `mx2`, `my2`, and `mz2` for the current atom.
-            - After processing all temperatures, appends the results for each atom to `self.mx1`, `self.my1`, and `self.mz1`.
-
-        Attributes:
-            - `self.atom_masses` (list of float): A list representing the masses of the atoms, used to determine the number of atoms.
-            - `self.temp_list` (list of float): A list of real temperature values used for interpolation.
-            - `self.data_list` (list of list of lists): A list containing the X, Y, Z data components for each temperature.
-            - `self.mx1` (list of lists): A list to store the interpolated X components for each atom.
-            - `self.my1` (list of lists): A list to store the interpolated Y components for each atom.
-            - `self.mz1` (list of lists): A list to store the interpolated Z components for each atom.
-
-        Example usage:
-            self.Msd_interpol()
-        """
-
-        natom = len(self.atom_masses)
-        t = [float(np_scalar) for np_scalar in self.temp_list]
-        i = 1
-        for i in range(1 ,int(len(self.atom_masses)+1)):
-            mx2 = []
-            mz2 = []
-            my2 = []
-            
-            for n in range(0, len(self.temp_list), 1):
-                t_0 = math.trunc(t[n] / 10)*natom + i - 1 
-                t_1 = t_0 + natom
-                
-                interpolx = [self.data_list_x[n][0][t_0], self.data_list_x[n][0][t_1]]
-                interpoly = [self.data_list[n][1][t_0], self.data_list[n][1][t_1]]
-                interpolz = [self.data_list[n][2][t_0], self.data_list[n][2][t_1]]
-
-                boundary_temp = [math.trunc(t[n]/10)*10, math.trunc(t[n]/10)*10 + 10]
-
-                fx = interpolate.interp1d(boundary_temp, interpolx, kind="linear")
-                x = fx(t[n])
-
-                fy = interpolate.interp1d(boundary_temp, interpoly, kind="linear")
-                y = fy(t[n])
-
-                fz = interpolate.interp1d(boundary_temp, interpolz, kind="linear")
-                z = fz(t[n])
-                mx2.append(x)
-                my2.append(y)
-                mz2.append(z)
-            
-            self.mx1.append(mx2)
-            self.mz1.append(mz2)
-            self.my1.append(my2)
-       
-      
-        
     def count_values_smaller_than_first(self):
         """
         @brief Counts the number of values in `ev_vol_list` that are smaller than the first value in `volume_list`.
@@ -2191,15 +4806,24 @@ class my_window(QMainWindow):
         This method computes the Mossbauer factor for each atom in `self.atom_masses`. It selects the temperature 
         data based on whether `self.loaded_files3` and `self.loaded_files4` are empty. The calculation involves 
         physical constants, the atom's mass, the energy constant `Er_const_list`, and an exponential function 
-        using the mean square displacements (`mz1`, `mx1`, `my1`) for each atom. The results are stored in `self.factor_list`.
+        using the mean square displacements (`mz1`, `mx1`, `my1`) for each atom. The factors of all atoms and 
+        temperatures are computed in one NumPy expression and stored as an array in `self.factor_list`.
 
         Behavior:
             - If `self.loaded_files3` and `self.loaded_files4` are empty, the method uses `self.sing_temperature` 
             for the calculations.
             - If files are loaded, the method uses `self.temp_list` for the calculations.
-            - For each atom, calculates the Mossbauer factor using an exponential function based on the atom's mass, 
-            energy constant, and displacements in the X, Y, and Z directions.
-            - Appends the calculated factor for each atom to `self.factor_list`.
+            - Computes the mass and recoil energy term once per species.
+            - Calculates the Mossbauer factor of every atom and temperature from the displacements in the X, Y, 
+            and Z directions (weighted `0.5*z + 0.25*x + 0.25*y`), or from the displacement tensors along the 
+            gamma-ray directions of `get_gamma_directions` (a crystal direction, a powder average or the texture 
+            map), in one broadcast pass for the default transition (`Er_const_list`) and for every 
+            transition in `MOSSBAUER_ISOTOPES` of the loaded elements; elements without a Mossbauer transition 
+            (`Er` of NaN) get NaN factors.
+            - Stores the factors of all transitions in `self.isotope_factors` (computed by `mossbauer_factors`), 
+            empties the confidence bands of earlier factors (see `Bootstrap`), lists the transitions in 
+            `box_isotope`, and stores the factors of the selected transition (see `selectIsotope`) in 
+            `self.factor_list`, an array of shape `(natom, n_temperatures)`.
 
         Attributes:
             - `self.atom_masses` (list of float): A list of atomic masses for each atom.
@@ -2210,7 +4834,7 @@ class my_window(QMainWindow):
             `loaded_files4` are not empty.
             - `self.mx1`, `self.my1`, `self.mz1` (list of lists of float): Lists containing the mean square displacements 
             of atoms in the X, Y, and Z directions.
-            - `self.factor_list` (list of lists of float): A list to store the calculated Mossbauer factors for each atom.
+            - `self.factor_list` (numpy.ndarray): The calculated Mossbauer factors, one row per atom.
 
         Constants Used:
             - `con.eV`: Electron volt in Joules.
@@ -2223,99 +4847,387 @@ class my_window(QMainWindow):
         """
 
         if not self.loaded_files3 and not self.loaded_files4:
-            
-            for i in range(1,int(len(self.atom_masses)+1)):
-                atomic_number = self.atom_masses[int(i-1)]
-                Er = self.Er_const_list[int(i-1)] * con.eV
-
-                m = atomic_number * con.atomic_mass
-                Eg_squared = 2 * m * con.c * con.c * Er
-                d1 = Eg_squared / (con.c * con.hbar * con.c * con.hbar)
-                factor_list = [] 
-                for u in range(0, len(self.sing_temperature)):
-                    f = math.exp(-(0.5 * ( 0.5*self.mz1[int(i-1)][u] + 0.25*self.mx1[int(i-1)][u] + 0.25*self.my1[int(i-1)][u])) * d1 * 1.0e-20)
-                    if f == 1:
-                        factor_list.append(0)    
-                    else:
-                        factor_list.append(f)
-                self.factor_list.append(factor_list)
-        
+            n_temperatures = len(self.sing_temperature)
+        else:
+            n_temperatures = len(self.temp_list)
+
+        # Recoil energies of the default transition (row 0) and of every transition of the loaded elements; 
+        # the transitions of other elements do not apply to an atom (NaN)
+        names = np.asarray(self.atom_names)
+        self.isotopes = [label for label, (element, _, _) in MOSSBAUER_ISOTOPES.items() if element in self.atom_names]
+        recoil_energies = np.full((1 + len(self.isotopes), len(names)), np.nan)
+        recoil_energies[0] = self.Er_const_list
+        for row, label in enumerate(self.isotopes, start=1):
+            element, _, recoil_energy = MOSSBAUER_ISOTOPES[label]
+            recoil_energies[row, names == element] = recoil_energy
+
+        # Eg^2 / (hbar c)^2 = 2 m Er / hbar^2, computed once per species
+        species, first, inverse = np.unique(names, return_index=True, return_inverse=True)
+        m = np.asarray(self.atom_masses, dtype=float)[first] * con.atomic_mass
+        Er = recoil_energies[:, first] * con.eV
+        Eg_squared = 2 * m * con.c * con.c * Er
+        d1 = (Eg_squared / (con.c * con.hbar * con.c * con.hbar))[:, inverse]
+
+        self.isotope_d1 = d1
+
+        self.isotope_factors = mossbauer_factors(self.get_msd_tensor()[:, :n_temperatures], d1, self.get_gamma_directions())
+        self.clearBands()
+
+        selected = self.box_isotope.currentText()
+        self.box_isotope.blockSignals(True)
+        self.box_isotope.clear()
+        self.box_isotope.addItem('Isotope')
+        self.box_isotope.addItems(self.isotopes)
+        self.box_isotope.setCurrentText(selected)
+        self.box_isotope.blockSignals(False)
+        self.selectIsotope()
+
+
+
+    def selectIsotope(self):
+        """
+        @brief Takes the Mossbauer factors of the transition selected in `box_isotope` from `self.isotope_factors`.
+
+        The atoms of the element of the selected transition get its factors, all other atoms the factors of the 
+        default transition of their element ('Isotope' selects the defaults for all atoms). The factors are stored 
+        in `self.factor_list` and their confidence bands, if any, in `self.factor_band`; the texture map and 
+        the factors of the compared V(T) curves (`curveFactors`) are updated for the selected transitions.
+        """
+        rows = np.zeros(self.isotope_factors.shape[1], dtype=int)
+        selected = self.box_isotope.currentText()
+        if selected in self.isotopes:
+            rows[np.asarray(self.atom_names) == MOSSBAUER_ISOTOPES[selected][0]] = 1 + self.isotopes.index(selected)
+        self.isotope_rows = rows
+        self.factor_list = self.isotope_factors[rows, np.arange(len(rows))]
+        if self.isotope_bands.size:
+            self.factor_band = self.isotope_bands[:, rows, np.arange(len(rows))]
+        self.updateTextureMap()
+        self.curveFactors()
+
+
+
+    def get_msd_tensor(self):
+        """
+        @brief Returns the MSD of all atoms as `(natom, n_temperatures, 3 or 6)`.
+
+        `self.msd_tensor` is used if it belongs to `self.mx1`; otherwise (e.g. a session written before the 
+        tensors were stored) the diagonal is stacked from `self.mx1`, `self.my1` and `self.mz1`.
+        """
+        if len(self.msd_tensor) == len(self.mx1) and self.msd_tensor.shape[1] == np.shape(self.mx1)[1]:
+            return np.asarray(self.msd_tensor, dtype=float)
+        return np.stack([np.asarray(self.mx1, dtype=float), np.asarray(self.my1, dtype=float), np.asarray(self.mz1, dtype=float)], axis=2)
+
+
+
+    def get_gamma_directions(self):
+        """
+        @brief Returns the gamma-ray directions selected in `box_orientation` and their weights.
+
+        Crystal directions `[uvw]` are converted to Cartesian vectors with the lattice of the primitive cell 
+        (Cartesian axes if no lattice is known). 'Powder' and 'Texture Map' average over the sphere 
+        (`powder_quadrature`); the texture map itself is made by `updateTextureMap`.
+
+        Returns:
+            - tuple (numpy.ndarray, numpy.ndarray) or None: The unit vectors `(n_directions, 3)` and the weights, 
+              or None for the default `0.5*z + 0.25*x + 0.25*y` weighting of the diagonal MSD ('Orientation').
+        """
+        selected = self.box_orientation.currentText()
+        if selected in ('Powder', 'Texture Map'):
+            return powder_quadrature()
+        if selected.startswith('Direction'):
+            direction = spherical_directions(*self.gamma_angles)
+        elif selected.startswith('['):
+            lattice = self.primitive_cell.get("lattice", np.eye(3))
+            direction = np.array([int(digit) for digit in selected[1:-1]], dtype=float) @ lattice
+            direction /= np.linalg.norm(direction)
+        else:
+            return None
+        return direction.reshape(1, 3), np.ones(1)
+
+
+
+    def updateTextureMap(self):
+        """
+        @brief Computes the Mossbauer factor of every atom over a grid of gamma-ray directions.
+
+        In the 'Texture Map' mode, `self.texture_map` gets the factor of the selected transitions 
+        (`self.isotope_rows`) at the temperature closest to `self.texture_temperature` (the highest temperature 
+        if none was chosen) for all polar angles `TEXTURE_THETA` and azimuths `TEXTURE_PHI`, shape 
+        `(natom, n_theta, n_phi)`; otherwise it is emptied.
+        """
+        if self.box_orientation.currentText() != 'Texture Map' or self.isotope_factors.size == 0:
+            self.texture_map = np.empty((0, len(TEXTURE_THETA), len(TEXTURE_PHI)))
+            return
+        temperatures = self.get_factor_temperatures()
+        target = temperatures[-1] if self.texture_temperature is None else self.texture_temperature
+        index = int(np.argmin(np.abs(temperatures - target)))
+        directions = spherical_directions(TEXTURE_THETA[:, np.newaxis], TEXTURE_PHI[np.newaxis, :]).reshape(-1, 3)
+        d1 = self.isotope_d1[self.isotope_rows, np.arange(len(self.isotope_rows))]
+        factors = directional_factors(self.get_msd_tensor()[:, index:index + 1], d1[np.newaxis], directions)
+        self.texture_map = factors[0, :, 0].reshape(-1, len(TEXTURE_THETA), len(TEXTURE_PHI))
+        self.texture_temperature_used = temperatures[index]
+
+
+
+    def get_factor_temperatures(self):
+        """
+        @brief Returns the temperatures of the columns of `self.factor_list` as an array.
+        """
+        if not self.loaded_files3 and not self.loaded_files4:
+            return np.asarray(self.sing_temperature, dtype=float)
+        return np.asarray(self.temp_list, dtype=float)[:self.isotope_factors.shape[2]]
+
+
+
+    def orientationChanged(self, index):
+        """
+        @brief Recomputes the Mossbauer factors for the gamma-ray orientation selected in `box_orientation`.
+
+        'Direction (θ, φ)' asks for the polar angle and azimuth of the gamma ray in Cartesian axes, 
+        'Texture Map' for the temperature of the map. The confidence bands are recomputed, and the graphs are 
+        redrawn if they were drawn before.
+
+        @param index: The index of the selected item in `box_orientation`.
+        """
+        selected = self.box_orientation.currentText()
+        if selected.startswith('Direction'):
+            text, ok = QInputDialog.getText(self, "Gamma-Ray Direction", "θ, φ in degrees:", 
+                                            text=f"{self.gamma_angles[0]:g}, {self.gamma_angles[1]:g}")
+            try:
+                theta, phi = (float(value) for value in text.replace(",", " ").split())
+            except ValueError:
+                ok = False
+            if not ok:
+                self.box_orientation.setCurrentIndex(0)
+                return
+            self.gamma_angles = (theta, phi)
+        elif selected == 'Texture Map' and self.isotope_factors.size:
+            temperatures = self.get_factor_temperatures()
+            value, ok = QInputDialog.getDouble(self, "Texture Map", "Temperature [K]:", float(temperatures[-1]), 
+                                               float(temperatures.min()), float(temperatures.max()), 1)
+            self.texture_temperature = value if ok else None
+
+        if self.isotope_factors.size == 0:
+            return
+        self.Mfactor()
+        self.Bootstrap()
+        if self.generated_graphs_factor:
+            for figure in self.generated_graphs_factor + self.generated_graphs_mi1:
+                plt.close(figure)
+            self.Ploting()
+
+
+
+    def plotTextureMap(self, atom):
+        """
+        @brief Draws the texture map of one atom, the Mossbauer factor over the polar angle and azimuth of the gamma ray.
+
+        @param atom: The index of the atom in `self.texture_map`.
+        @return: The matplotlib figure.
+        """
+        resolution_settings = self.get_selected_resolution()
+        figure, ax = plt.subplots(figsize=resolution_settings['figsize'], dpi=resolution_settings['dpi'])
+        mesh = ax.pcolormesh(TEXTURE_PHI, TEXTURE_THETA, self.texture_map[atom], shading='gouraud')
+        figure.colorbar(mesh, ax=ax, label='f')
+        ax.set_xlabel('φ [°]')
+        ax.set_ylabel('θ [°]')
+        ax.set_title(f'Mossbauer factor for {self.atom_names[atom]} at {self.texture_temperature_used:g} K')
+        return figure
+
+
+
+    def get_bootstrap_mode(self):
+        """
+        @brief Retrieves the resampling selected in the `box_bootstrap` combo box.
+
+        Returns:
+            - str or None: 'volumes', 'residuals', or None if no bands are selected ('Uncertainty').
+        """
+        selected = self.box_bootstrap.currentText()
+        if selected == 'Uncertainty':
+            return None
+        return selected[selected.find('(') + 1:-1]
+
+
+
+    def clearBands(self):
+        """
+        @brief Empties the confidence bands of the MSD and the Mossbauer factors.
+        """
+        self.msd_bands = np.empty((2, 0, 0, 3))
+        self.isotope_bands = np.empty((2, 0, 0, 0))
+        self.factor_band = np.empty((2, 0, 0))
+
+
+
+    def Bootstrap(self):
+        """
+        @brief Computes bootstrap confidence bands of the fitted MSD and of the Mossbauer factors.
+
+        The polynomial volume fits of `Fitting` are resampled `BOOTSTRAP_RESAMPLES` times, either over the 
+        volumes or over the fit residuals (`box_bootstrap`), with the degree of every series kept. The 
+        resampled fits are evaluated at the V(T) volumes and turned into Mossbauer factors of every 
+        transition and the selected gamma-ray orientation, and the `BOOTSTRAP_LEVEL` percentile bands are 
+        kept (`bootstrap_bands`). As for the central MSD (`MsdSurface`), the resampled fits are evaluated at 
+        the file temperatures around every V(T) temperature, each with its own degree, and interpolated in 
+        temperature as selected in `box_interpolation`. The temperatures are processed in slabs sized by the 
+        memory budget; large problems spread the slabs over worker processes.
+
+        Bands need a polynomial volume fit: nothing is computed for a single thermal-displacements file or 
+        the PCHIP interpolation.
+
+        After execution, `self.msd_bands` has the shape `(2, natom, n_temperatures, n_components)`, 
+        `self.isotope_bands` `(2, 1 + n_isotopes, natom, n_temperatures)`, and the band of the selected 
+        transitions is in `self.factor_band`, `(2, natom, n_temperatures)`.
+        """
+        self.clearBands()
+        mode = self.get_bootstrap_mode()
+        if mode is None or len(self.ev_vol_list) == 0:
+            return
+        if self.fit_degrees.size == 0:
+            if self.fit_pieces is not None:
+                QMessageBox.information(self, "No Uncertainty Bands", "Bootstrap bands need a polynomial fit degree.")
+            else:
+                QMessageBox.information(self, "No Uncertainty Bands", 
+                                        "The fit degrees are not known (e.g. a session of an older version); "
+                                        "process the data again to compute the bands.")
+            return
+
+        volumes = np.asarray(self.ev_vol_list, dtype=float)
+        stacks = [self.parsed_displacements[file_name][1] for file_name in self.outfile]
+        n_evaluated = len(self.volume_list)
+        n_sites, components = self.fit_degrees.shape[1:]
+        try:
+            indices = bootstrap_indices(len(volumes), BOOTSTRAP_RESAMPLES, int(self.fit_degrees.max()) + 1)
+        except ValueError as error:
+            QMessageBox.warning(self, "No Uncertainty Bands", str(error))
+            return
+        d1 = self.isotope_d1[:, self.site_atoms]
+        directions = self.get_gamma_directions()
+
+        # The file temperatures from which every V(T) temperature is interpolated
+        grid = self.parsed_displacements[self.outfile[0]][0]
+        interval, offset, nodes = temperature_nodes(grid, self.temp_list, self.get_interpolation())
+        n_nodes = nodes.shape[1]
+
+        # The operators, the resampled MSD and their factors take about this much memory per temperature
+        bytes_per_temperature = 8 * len(indices) * n_nodes * (2 * len(volumes) + 3 * n_sites * components + 2 * len(d1) * n_sites)
+        budget = self.get_memory_budget() or BOOTSTRAP_SLAB_BYTES
+        slab = max(1, int(budget // bytes_per_temperature))
+        workers = os.cpu_count() or 1
+        parallel = workers > 1 and len(indices) * n_evaluated * n_sites * components >= PARALLEL_BOOTSTRAP_MIN_VALUES
+        if parallel:
+            slab = min(slab, -(-n_evaluated // workers))
+
+        tasks = []
+        for start in range(0, n_evaluated, slab):
+            stop = min(start + slab, n_evaluated)
+            rows = nodes[start:stop].ravel()
+            values = np.stack([stack[rows][:, self.site_atoms] for stack in stacks])
+            tasks.append((volumes, np.repeat(self.volume_list[start:stop], n_nodes), values, self.fit_degrees[rows], indices, mode, 
+                          d1, directions, BOOTSTRAP_LEVEL, (grid, interval[start:stop], offset[start:stop])))
+        if parallel and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                results = [future.result() for future in [pool.submit(bootstrap_bands, *arguments) for arguments in tasks]]
+        else:
+            results = [bootstrap_bands(*arguments) for arguments in tasks]
+
+        msd_bands = np.concatenate([msd_band for msd_band, _ in results], axis=2)
+        isotope_bands = np.concatenate([factor_band for _, factor_band in results], axis=3)
+        self.msd_bands = msd_bands[:, self.site_of_atom]
+        self.isotope_bands = isotope_bands[:, :, self.site_of_atom]
+        self.selectIsotope()
+
+
+
+    def plotBands(self, ax, quantity, atom):
+        """
+        @brief Shades the confidence bands of one atom under its curves, in the colours of the curves.
+
+        @param ax: The axes with the curves; the first line is the Mossbauer factor, or the first three lines 
+                   are the X, Z and Y MSD.
+        @param quantity: 'factor' or 'msd'.
+        @param atom: The index of the atom.
+        """
+        if quantity == 'factor':
+            bands = [self.factor_band[:, atom]] if self.factor_band.size else []
         else:
-            i = 1
-            for i in range(1,int(len(self.atom_masses)+1)):
-                atomic_number = self.atom_masses[int(i-1)]
-                Er = self.Er_const_list[int(i-1)] * con.eV
-
-                m = atomic_number * con.atomic_mass
-                Eg_squared = 2 * m * con.c * con.c * Er
-                d1 = Eg_squared / (con.c * con.hbar * con.c * con.hbar)
-                factor_list = []  
-                for u in range(0, len(self.temp_list)):
-                    f = math.exp(-( 0.5 * (0.5*self.mz1[int(i-1)][u] + 0.25*self.mx1[int(i-1)][u] + 0.25*self.my1[int(i-1)][u] )) * d1 * 1.0e-20)
-                    factor_list.append(f)
-                self.factor_list.append(factor_list)  
+            bands = [self.msd_bands[:, atom, :, axis] for axis in (0, 2, 1)] if self.msd_bands.size else []
+        temperature = np.asarray(self.temp_list, dtype=float)
+        for line, (low, high) in zip(ax.lines, bands):
+            ax.fill_between(temperature[:len(low)], low, high, color=line.get_color(), alpha=0.25, linewidth=0)
+
+
+
+    def isotopeChanged(self, index):
+        """
+        @brief Switches the Mossbauer factors to the transition selected in `box_isotope` and redraws the graphs.
+
+        The factors of all transitions are computed by `Mfactor`, so switching does not recompute anything.
+
+        @param index: The index of the selected item in `box_isotope`.
+        """
+        if self.isotope_factors.size == 0:
+            return
+        self.selectIsotope()
+        if self.generated_graphs_factor:
+            for figure in self.generated_graphs_factor + self.generated_graphs_mi1:
+                plt.close(figure)
+            self.Ploting()
           
     def get_atom_info(self):
         """
         @brief Extracts atomic information from files in `loaded_files1` and stores it.
 
         This method processes each file in `self.loaded_files1` to extract atomic information, including 
-        the atom symbol, atom number, and atom mass. It identifies the section of the file between the 
-        "primitive_cell:" and "reciprocal_lattice:" markers and uses a regular expression to extract 
-        relevant atomic data. The extracted atom information is then stored in `self.atom_names`, 
-        `self.atom_numbers`, and `self.atom_masses`.
+        the atom symbol, atom number, and atom mass. The primitive cell is read by `read_primitive_cell` and 
+        kept in `self.input_cache`, so a file that was seen before is not read again. The extracted atom information 
+        is then stored in `self.atom_names`, `self.atom_numbers`, and `self.atom_masses`, and the whole cell 
+        (including coordinates and lattice vectors) in `self.primitive_cell` for later stages.
 
         Behavior:
             - Iterates through each file in `self.loaded_files1`.
-            - Reads the content of each file to locate the segment containing atomic information.
-            - Uses a regular expression to extract the atom symbol, atom number, and atom mass from the identified segment.
-            - Appends the extracted atom symbol to `self.atom_names`.
-            - Clears and appends the extracted atom number to `self.atom_numbers`.
-            - Appends the extracted atom mass to `self.atom_masses`.
+            - Takes the primitive cell of the file from the input cache.
+            - Appends the atom symbols to `self.atom_names`.
+            - Appends the atom numbers to `self.atom_numbers`.
+            - Appends the atom masses to `self.atom_masses`.
+            - Stores the primitive cell arrays in `self.primitive_cell`.
 
         Attributes:
             - `self.loaded_files1` (list of str): A list of file paths to be processed for atomic information.
             - `self.atom_names` (list of str): A list that stores the symbols of the atoms extracted from the files.
             - `self.atom_numbers` (list of int): A list that stores the atomic numbers extracted from the files.
             - `self.atom_masses` (list of float): A list that stores the masses of the atoms extracted from the files.
+            - `self.primitive_cell` (dict): The primitive cell arrays of the last processed file.
 
         Example usage:
             self.get_atom_info()
         """
 
         for file_name in self.loaded_files1:
-            with open(file_name, "r") as file:
-                content = file.read()
-
-            start_index = content.find("primitive_cell:")
-            end_index = content.find("reciprocal_lattice:")
-            segment = content[start_index:end_index]
-
-            atom_info = re.findall(r"symbol: (\w+) # (\d+)\s+coordinates: .*?\n\s+mass: ([\d.]+)", segment, re.DOTALL)
-
-        
+            self.primitive_cell = self.input_cache.fetch(file_name, "primitive_cell", read_primitive_cell)
 
-            for symbol, atom_number, mass in atom_info:
-                self.atom_names.append(symbol)
-                self.atom_numbers.clear()
-                self.atom_numbers.append(int(atom_number))
-                self.atom_masses.append(float(mass))
+            self.atom_names.extend(self.primitive_cell["symbols"].tolist())
+            self.atom_numbers.extend(self.primitive_cell["numbers"].tolist())
+            self.atom_masses.extend(self.primitive_cell["masses"].tolist())
 
 
     def map_names_to_numbers(self):
         """
         @brief Maps atomic symbols in `atom_names` to corresponding energy constants and stores them in `Er_const_list`.
 
-        This method maps each atomic symbol in `self.atom_names` to its corresponding energy constant using 
-        a predefined dictionary. If an atomic symbol is not found in the dictionary, a value of `0` is appended 
-        to `self.Er_const_list`. The energy constants are typically used in further calculations, such as 
+        This method maps each atomic symbol in `self.atom_names` to the recoil energy of the default transition 
+        of the element in `MOSSBAUER_ISOTOPES`. If the element has no Mossbauer transition, NaN is appended to 
+        `self.Er_const_list`, so its factors are marked as unavailable (NaN), and a warning names the element 
+        the first time it is loaded. The energy constants are typically used in further calculations, such as 
         determining the Mossbauer factor.
 
         Behavior:
-            - Defines a dictionary `elements` that maps atomic symbols to their corresponding energy constants.
+            - Builds a dictionary `elements` that maps atomic symbols to the recoil energy of their first 
+            transition in `MOSSBAUER_ISOTOPES`.
             - Iterates through each symbol in `self.atom_names`.
             - For each symbol, appends the corresponding energy constant from the `elements` dictionary to `self.Er_const_list`.
-            - If a symbol is not found in the dictionary, appends `0` to `self.Er_const_list`.
+            - If a symbol is not found in the dictionary, appends NaN to `self.Er_const_list` and warns once per element.
 
         Attributes:
             - `self.atom_names` (list of str): A list of atomic symbols that need to be mapped to energy constants.
@@ -2323,24 +5235,29 @@ class my_window(QMainWindow):
 
         Example:
             - If `self.atom_names` contains ["Fe", "I", "Unknown"], then `self.Er_const_list` will contain 
-            [1.95883310e-03, 3.218e-03, 0].
+            [1.95883310e-03, 3.218e-03, nan].
 
         Example usage:
             self.map_names_to_numbers()
         """
 
 
-        # Define the dictionary mapping atomic symbols to their energy constants
-        elements = {"Fe": 1.95883310e-03,
-        "I": 3.218e-03,
-        "Sn": 2.57423e-3,
-        "Sb": 6.122e-03,
-        "Ir": 1.9094e-02}
+        # Map atomic symbols to the recoil energy of their default transition
+        elements = {}
+        for element, gamma_energy, recoil_energy in MOSSBAUER_ISOTOPES.values():
+            elements.setdefault(element, recoil_energy)
         for name in self.atom_names:
             if name in elements:
                 self.Er_const_list.append(elements[name])
             else:
-                self.Er_const_list.append((0))
+                self.Er_const_list.append(np.nan)
+
+        missing = sorted(set(self.atom_names) - set(elements) - self.warned_elements)
+        if missing:
+            self.warned_elements.update(missing)
+            QMessageBox.warning(self, "No Mossbauer Transition", 
+                                f"No Mossbauer transition is known for {', '.join(missing)}; "
+                                "the factors of these atoms are shown as unavailable (NaN).")
 
 
 
@@ -2350,234 +5267,441 @@ class my_window(QMainWindow):
         """
         @brief Extracts temperature values when only one thermal-displacement file is present.
 
-        This method extracts temperature values from a thermal-displacements file when only a single file 
-        is present in the data. It reads the temperature data from the file and processes it accordingly.
+        This method takes the temperature vector of the parsed thermal-displacement files from 
+        `self.parsed_displacements`, so the files are not read again.
 
         Behavior:
-            - Checks if only one thermal-displacement file is available.
-            - Extracts and stores the temperature values from the file for further calculations.
+            - Iterates through the parsed thermal-displacement files in `self.outfile`.
+            - Stores the temperature values of each file for further calculations.
 
         Attributes:
-            - `self.loaded_files2` (list of str): The list of thermal-displacement files being processed.
-            - `self.temp_list` (list of float): A list to store the extracted temperature values.
+            - `self.outfile` (list of str): The list of parsed thermal-displacement files.
+            - `self.sing_temperature` (list of float): A list to store the extracted temperature values.
 
         Example usage:
             self.extract_temperatures()
         """
 
-        for file_names in self.loaded_files2:
-            with open(file_names, 'r') as file:
-                    for line in file:
-                        
-                        
-                        match = re.search(r'temperature:\s+([\d.]+)', line)
-                        if match:
-                          
-                            temperature = float(match.group(1))
-                            self.sing_temperature.append(temperature)
+        for file_names in self.outfile:
+            self.sing_temperature.extend(self.parsed_displacements[file_names][0].tolist())
         
     
     def Sort(self):
         """
-        Reorders the raw X, Y, Z data lists by atom index across all timesteps.
-
-        This method assumes that `data_list_x`, `data_list_y`, and `data_list_z` are
-        each a list of equal-length lists, where each sublist corresponds to one timestep
-        and contains concatenated coordinate values for all atoms.
+        Reorders the stacked MSD so that every series runs over the volumes.
 
-        It processes each coordinate axis in turn:
-
-        1. Determine `natom` as the number of atoms from `self.atom_masses`.
-        2. For each block of size `natom` in the first timestep’s data list:
-           - For each atom index `p` within that block:
-             - Collect the value at position `o + p` from every timestep’s list.
-             - Append that series (one per atom) to `self.fit_list_{axis}_temp_ordered`.
+        The series of one atom, direction and temperature across all volumes is the last axis of a transposed 
+        view of `self.msd_stack`; no data is copied.
 
         After running, you will have:
         - `self.fit_list_x_temp_ordered`
         - `self.fit_list_y_temp_ordered`
         - `self.fit_list_z_temp_ordered`
 
-        each containing one sublist per atom, with that atom’s coordinate over time.
-
-        Raises:
-            IndexError: If `data_list_{axis}` sublists are of inconsistent length.
+        each a view of shape `(n_temperatures, natom, n_volumes)`, holding that atom's coordinate over the 
+        volumes at every temperature.
         """
-        # Process X coordinates
-        natom = len(self.atom_masses)
-        for o in range(0, len(self.data_list_x[0]), natom):
-            for p in range(natom):
-                fit_temp_list_x = [
-                    self.data_list_x[i][o + p]
-                    for i in range(len(self.data_list_x))
-                ]
-                self.fit_list_x_temp_ordered.append(fit_temp_list_x)
-
-        # Process Y coordinates
-        natom = len(self.atom_masses)
-        for o in range(0, len(self.data_list_y[0]), natom):
-            for p in range(natom):
-                fit_temp_list_y = [
-                    self.data_list_y[i][o + p]
-                    for i in range(len(self.data_list_y))
-                ]
-                self.fit_list_y_temp_ordered.append(fit_temp_list_y)
-
-        # Process Z coordinates
-        natom = len(self.atom_masses)
-        for o in range(0, len(self.data_list_z[0]), natom):
-            for p in range(natom):
-                fit_temp_list_z = [
-                    self.data_list_z[i][o + p]
-                    for i in range(len(self.data_list_z))
-                ]
-                self.fit_list_z_temp_ordered.append(fit_temp_list_z)
+        series = self.msd_stack.transpose(1, 2, 3, 0)
+        self.fit_list_x_temp_ordered = series[:, :, 0]
+        self.fit_list_y_temp_ordered = series[:, :, 1]
+        self.fit_list_z_temp_ordered = series[:, :, 2]
 
         
     def Fitting(self):
         """
-        Performs polynomial fitting (degree 2) of X, Y, and Z coordinate series
-        against the evaporation volume data and stores the resulting coefficients.
-
-        This method iterates over each ordered coordinate series in 
-        `fit_list_x_temp_ordered`, `fit_list_y_temp_ordered`, and `fit_list_z_temp_ordered`:
-        1. Uses `self.ev_vol_list` as the independent variable (x-values).
-        2. Fits a quadratic polynomial to each coordinate series using `polyfit`.
-        3. Wraps the resulting coefficient array in a list and appends it to:
-           - `self.coef_x` for X-coordinates,
-           - `self.coef_y` for Y-coordinates,
-           - `self.coef_z` for Z-coordinates.
-
-        After execution, `coef_x`, `coef_y`, and `coef_z` each contain one element
-        per atom, where each element is a list containing the polynomial coefficients
-        `[a, b, c]` for the fit:
+        Performs polynomial fitting of the X, Y and Z MSD of every atom and temperature against the
+        e-v volumes and stores the resulting coefficients.
+
+        All series share the volumes `self.ev_vol_list`, so they are fitted together by
+        `cross_validate_polynomials`: the design matrix of every degree is factorized once and applied to
+        `self.msd_stack` (volumes × temperatures × atoms × directions) in one matrix product. The degree
+        selected in `box_degree` (2 by default) is used for all series; with an automatic selection,
+        degrees 1 to 4 are tried and `selectFit` keeps the one with the lowest leave-one-volume-out residual.
+        In the PCHIP mode the MSD is instead interpolated between the volumes by piecewise monotone cubics
+        (`scipy.interpolate.PchipInterpolator`, for all series at once), which follow the data without the
+        wiggles of a global polynomial, and `self.fit_coefficients` is left empty. Either way the fits are
+        turned into the MSD(T, V) surface `self.msd_surface` (see `buildSurface`).
+
+        After execution, `self.fit_coefficients` has the shape `(n_temperatures, natom, 3, degree + 1)` and
+        `coef_x`, `coef_y`, `coef_z` are its `(n_temperatures, natom, degree + 1)` views, so that
+        `coef_x[t][i]` holds the coefficients of atom `i` at temperature `t`, highest power first, e.g.
+        for degree 2:
 
             coordinate_value ≈ a*(ev_vol)^2 + b*(ev_vol) + c
 
         Raises:
-            ValueError: If `polyfit` fails due to mismatched input lengths or 
-                        invalid data (e.g., constant `ev_vol_list`).
+            ValueError: If the number of volumes does not match the number of thermal-displacements files.
+        """
+        if len(self.ev_vol_list) != self.msd_stack.shape[0]:
+            raise ValueError(f"{len(self.ev_vol_list)} e-v volumes for {self.msd_stack.shape[0]} thermal-displacements files.")
+        mode = self.get_fit_degree()
+        if mode == 'pchip':
+            order = np.argsort(self.ev_vol_list)
+            model = interpolate.PchipInterpolator(self.ev_vol_list[order], self.msd_stack[order], axis=0)
+            self.clearFit()
+            self.buildSurface(model.c, model.x)
+            return
+        degrees = (mode,) if isinstance(mode, int) else FIT_DEGREES
+        self.selectFit(*cross_validate_polynomials(self.ev_vol_list, self.msd_stack, degrees), mode)
+        self.buildSurface()
+
+
+
+    def buildSurface(self, pieces=None, breaks=None):
+        """
+        @brief Builds the MSD(T, V) surface `self.msd_surface` from the volume fits.
+
+        The temperatures of the surface are those of the thermal-displacements files, and the fits are 
+        interpolated between them as selected in `box_interpolation` (see `MsdSurface`).
+
+        @param pieces: The PCHIP pieces of all series, `(4, n_volumes - 1, n_temperatures, n_sites, n_components)`, 
+                       or None to use the polynomial coefficients `self.fit_coefficients`.
+        @param breaks: The sorted volumes of the PCHIP pieces.
+
+        The pieces and breaks are kept in `self.fit_pieces` and `self.fit_breaks` (None for polynomial fits).
+        """
+        temperatures = self.parsed_displacements[self.outfile[0]][0]
+        self.fit_pieces, self.fit_breaks = pieces, breaks
+        coefficients = self.fit_coefficients if pieces is None else pieces
+        self.msd_surface = MsdSurface(temperatures, coefficients, breaks, self.get_interpolation())
+
+
+
+    def clearFit(self):
+        """
+        @brief Empties the fit coefficients, degrees and cross-validation residuals.
+        """
+        self.setFitCoefficients(np.empty((0, 0, 3, 3)))
+        self.fit_degrees = np.empty((0, 0, 3), dtype=int)
+        self.cv_residuals = np.empty((0, 0, 0, 3))
+
+
+
+    def selectFit(self, candidates, residuals, mode):
+        """
+        @brief Keeps one of the candidate fits of every series.
+
+        With `mode` 'series' every series keeps its own best degree, with 'site' all temperatures and 
+        directions of an atom share the degree with the lowest combined residual; a fixed degree has a single 
+        candidate. Leading coefficients that are zero for all kept fits are dropped.
+
+        After execution, `self.fit_degrees` holds the degree of every series, `(n_temperatures, natom, 3)`, 
+        and `self.cv_residuals` the residuals of all candidates (see `reportFitDegrees`).
+
+        @param candidates: Coefficients of `cross_validate_polynomials`, `(n_candidates, n_temperatures, natom, 3, width)`.
+        @param residuals: Leave-one-out residuals of `cross_validate_polynomials`, `(n_candidates, n_temperatures, natom, 3)`.
+        @param mode: The selection of `get_fit_degree`.
         """
-        # Fit X-coordinates
-        for series in self.fit_list_x_temp_ordered:
-            coef = polyfit(self.ev_vol_list, series, 2)
-            self.coef_x.append([coef])
+        degrees = (mode,) if isinstance(mode, int) else FIT_DEGREES
+        index = select_degrees(residuals, (0, 2) if mode == 'site' else ())
+        coefficients = np.take_along_axis(candidates, index[np.newaxis, ..., np.newaxis], axis=0)[0]
+        self.fit_degrees = np.asarray(degrees)[index]
+        self.cv_residuals = residuals
+        self.setFitCoefficients(coefficients[..., max(degrees) - self.fit_degrees.max(initial=0):])
+
+
 
-        # Fit Y-coordinates
-        for series in self.fit_list_y_temp_ordered:
-            coef = polyfit(self.ev_vol_list, series, 2)
-            self.coef_y.append([coef])
+    def setFitCoefficients(self, coefficients):
+        """
+        @brief Stores the fit coefficients of all series and points `coef_x`, `coef_y`, `coef_z` at them.
 
-        # Fit Z-coordinates
-        for series in self.fit_list_z_temp_ordered:
-            coef = polyfit(self.ev_vol_list, series, 2)
-            self.coef_z.append([coef])
+        @param coefficients: Array of shape `(n_temperatures, natom, 3, degree + 1)`, highest power first.
+        """
+        self.fit_coefficients = coefficients
+        self.coef_x, self.coef_y, self.coef_z = (coefficients[:, :, axis] for axis in range(3))
 
             
-    def Imputing(self):
+    def Fitting_chunked(self, budget):
+        """
+        Fits and evaluates the MSD of all sites (see `findEquivalentSites`) one temperature slab at a time.
+
+        This method replaces `Msd`, `Sort`, `Fitting` and `Imputing` when a memory budget is selected. For 
+        every slab of temperatures it reads the displacements of that slab from all volume files (the cached 
+        arrays are memory-mapped, so only the slab is read) and fits the polynomials of all sites and components 
+        against `self.ev_vol_list` with one `cross_validate_polynomials` call: of the degree selected in 
+        `box_degree`, or of every degree in `FIT_DEGREES` for the automatic modes, which `selectFit` chooses 
+        from per series or per site once all slabs are fitted. In the PCHIP mode the slab is interpolated 
+        between the volumes by `PchipInterpolator` instead, and its pieces are kept. 
+        `Imputing` then evaluates the MSD(T, V) surface of the fits (`buildSurface`) on the V(T) curve. The slab 
+        is sized so that its working arrays stay within `budget`; only the coefficients (or PCHIP pieces) and 
+        the results grow with the input.
+
+        After execution:
+        - `self.fit_coefficients` and its views `self.coef_x`, `self.coef_y`, `self.coef_z` have the 
+          layout set by `Fitting`.
+        - `self.msd_tensor` has the shape `(n_sites, len(self.volume_list), n_components)` and `self.mx1`, 
+          `self.my1`, `self.mz1` are its views of shape `(n_sites, len(self.volume_list))`.
+
+        Parameters:
+            budget (int): The memory budget for the working arrays of one slab, in bytes.
+
+        Raises:
+            ValueError: If a temperature of the V(T) file lies outside the thermal-displacements files.
         """
-        Computes interpolated X, Y, and Z coordinate trajectories for each atom
-        based on previously fitted polynomial coefficients and the target volume list.
+        natom = len(self.site_atoms)
+        volumes = np.asarray(self.ev_vol_list, dtype=float)
+        stacks = [self.parsed_displacements[file_name][1] for file_name in self.outfile]
+        n_temperatures, _, components = stacks[0].shape
+
+        # The stacked slab with its sorted copy and the residuals or the PCHIP coefficients take about six 
+        # slab-sized arrays
+        bytes_per_temperature = 6 * len(stacks) * natom * components * 8
+        slab = max(1, int(budget // bytes_per_temperature))
+
+        mode = self.get_fit_degree()
+        if mode == 'pchip':
+            order = np.argsort(volumes)
+            pieces = np.empty((4, len(volumes) - 1, n_temperatures, natom, components))
+            for start in range(0, n_temperatures, slab):
+                stop = min(start + slab, n_temperatures)
+                series = np.stack([stacks[k][start:stop, self.site_atoms] for k in order])
+                pieces[:, :, start:stop] = interpolate.PchipInterpolator(volumes[order], series, axis=0).c
+                del series
+            self.clearFit()
+            self.buildSurface(pieces, volumes[order])
+            self.Imputing()
+            return
 
-        This method assumes:
-        - `self.coef_x`, `self.coef_y`, and `self.coef_z` each contain one list
-          per atom with the three quadratic fit coefficients.
-        - `self.volume_list` is a list of evaporation volumes at which to evaluate.
+        degrees = (mode,) if isinstance(mode, int) else FIT_DEGREES
+        candidates = np.empty((len(degrees), n_temperatures, natom, components, max(degrees) + 1))
+        residuals = np.empty((len(degrees), n_temperatures, natom, components))
+        for start in range(0, n_temperatures, slab):
+            stop = min(start + slab, n_temperatures)
+            series = np.stack([stack[start:stop, self.site_atoms] for stack in stacks])
+            candidates[:, start:stop], residuals[:, start:stop] = cross_validate_polynomials(volumes, series, degrees)
+            del series
 
-        For each atom index `i` (0 through natom–1):
-        1. Builds a temporary list of X-values by:
-           - Stepping through `self.volume_list` in blocks of size `natom`.
-           - For each block, evaluating the polynomial at that volume:
-             `polyval(coef_x[i], volume)`.
-        2. Appends the resulting time series to `self.mx1`.
+        self.selectFit(candidates, residuals, mode)
+        self.buildSurface()
+        self.Imputing()
+
+    
+    def Imputing(self):
+        """
+        Evaluates the fitted X, Y and Z MSD of every atom on the V(T) curve.
 
-        The same procedure is then applied to Y-coefficients → `self.my1`
-        and Z-coefficients → `self.mz1`.
+        The MSD(T, V) surface of the fits (`self.msd_surface`, see `buildSurface`) is evaluated at the pairs 
+        `(self.temp_list[t], self.volume_list[t])`, so the temperatures of the V(T) file need not be those of 
+        the thermal-displacements files; between these the fits are interpolated in temperature. All atoms,
+        temperatures and directions are evaluated together, giving an array of shape 
+        `(natom, n_temperatures, n_components)` stored by `setMsd` (three components, or six for
+        displacement matrices); `self.mx1`, `self.my1` and `self.mz1` are its `(natom, n_temperatures)` views.
+        The other V(T) curves are evaluated by `evaluateCurves`.
 
         Raises:
-            ValueError: If the coefficient arrays do not match the expected shape
-                        or if `volume_list` length is not a multiple of `natom`.
+            ValueError: If a temperature of the V(T) file lies outside the thermal-displacements files.
         """
-        natom = len(self.atom_masses)
+        msd = self.msd_surface.evaluate(self.temp_list, self.volume_list)
+        self.setMsd(msd.transpose(1, 0, 2))
+        self.evaluateCurves()
+
+   
+    def evaluateCurves(self, first=0):
+        """
+        @brief Evaluates the MSD of the compared V(T) curves from `first` on with the MSD(T, V) surface.
+
+        The `(T, V)` pairs of all curves are joined and evaluated by `self.msd_surface` in one pass, and split 
+        again per curve, so further curves cost neither parsing nor fitting. Curves with temperatures outside 
+        the thermal-displacements files are removed with a warning. The Mossbauer factors of the curves follow 
+        from `curveFactors` (called by `selectIsotope`).
+
+        After execution, `self.curve_msd` holds the MSD of every curve, `(n_sites, n_temperatures, n_components)`.
+
+        @param first: The first curve to evaluate; the MSD of the curves before it are kept.
+        """
+        del self.curve_msd[first:]
+        grid = self.msd_surface.interpolator.grid
+        outside = [k for k in range(first, len(self.curve_labels)) 
+                   if self.curve_temperatures[k][0] < grid[0] or self.curve_temperatures[k][-1] > grid[-1]]
+        if outside:
+            QMessageBox.warning(self, "V(T) Curves Out of Range", 
+                                f"Outside the temperatures {grid[0]:g}-{grid[-1]:g} K of the thermal-displacements files: "
+                                f"{', '.join(self.curve_labels[k] for k in outside)}")
+            for k in reversed(outside):
+                del self.curve_labels[k], self.curve_temperatures[k], self.curve_volumes[k]
+        if len(self.curve_labels) == first:
+            return
+        lengths = [len(temperatures) for temperatures in self.curve_temperatures[first:]]
+        msd = self.msd_surface.evaluate(np.concatenate(self.curve_temperatures[first:]), np.concatenate(self.curve_volumes[first:]))
+        self.curve_msd.extend(np.split(msd.transpose(1, 0, 2), np.cumsum(lengths)[:-1], axis=1))
+
+
+
+    def curveFactors(self):
+        """
+        @brief Computes the Mossbauer factors of all compared V(T) curves at once.
+
+        The MSD of all curves are joined along the temperatures and passed to `mossbauer_factors` in one call, 
+        for the transitions selected in `box_isotope` and the gamma-ray orientation of `box_orientation`. The 
+        factors of every site are copied to its atoms.
 
-        # Compute X trajectories
-        for i in range(natom):
-            temp_series = []
-            for o in range(0, len(self.volume_list) * natom, natom):
-                vol_index = o // natom
-                coeffs = np.array(self.coef_x[o + i]).flatten()
-                value = polyval(coeffs, self.volume_list[vol_index])
-                temp_series.append(value)
-            self.mx1.append(temp_series)
-
-        # Compute Y trajectories
-        for i in range(natom):
-            temp_series = []
-            for o in range(0, len(self.volume_list) * natom, natom):
-                vol_index = o // natom
-                coeffs = np.array(self.coef_y[o + i]).flatten()
-                value = polyval(coeffs, self.volume_list[vol_index])
-                temp_series.append(value)
-            self.my1.append(temp_series)
-
-        # Compute Z trajectories
-        for i in range(natom):
-            temp_series = []
-            for o in range(0, len(self.volume_list) * natom, natom):
-                vol_index = o // natom
-                coeffs = np.array(self.coef_z[o + i]).flatten()
-                value = polyval(coeffs, self.volume_list[vol_index])
-                temp_series.append(value)
-            self.mz1.append(temp_series)
+        After execution, `self.curve_factors` holds the factors of every curve, `(natom, n_temperatures)`.
+        """
+        if not self.curve_msd:
+            self.curve_factors = []
+            return
+        d1 = self.isotope_d1[self.isotope_rows[self.site_atoms], self.site_atoms]
+        lengths = [msd.shape[1] for msd in self.curve_msd]
+        factors = mossbauer_factors(np.concatenate(self.curve_msd, axis=1), d1[np.newaxis], self.get_gamma_directions())[0]
+        self.curve_factors = np.split(factors[self.site_of_atom], np.cumsum(lengths)[:-1], axis=1)
+
+
+
+    def addCurves(self):
+        """
+        @brief Loads further V(T) files and overlays their Mossbauer factors on the graphs.
+
+        Every volume column of the selected files becomes a curve (see `addCurveColumns`). The curves are 
+        evaluated with the MSD(T, V) surface of the processed data (`evaluateCurves`), so nothing is re-parsed 
+        or re-fitted, and the graphs are redrawn if they were drawn before.
+
+        Example usage:
+            self.addCurves()
+        """
+        if self.msd_surface is None:
+            QMessageBox.information(self, "No Fit", "Process a quasi-harmonic dataset before adding V(T) curves.")
+            return
+        options = QFileDialog.Options()
+        options |= QFileDialog.DontUseNativeDialog
+        file_names, _ = QFileDialog.getOpenFileNames(self, "Select V(T) Files", "", "All Files (*);;Text Files (*.txt *.dat)", options=options)
+        if not file_names:
+            return
+        first = len(self.curve_labels)
+        try:
+            for file_name in file_names:
+                columns = self.input_cache.fetch(file_name, "columns", read_columns)["columns"]
+                self.addCurveColumns(file_name, *read_temperature_volume(columns, file_name))
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Invalid V(T) File", str(error))
+            del self.curve_labels[first:], self.curve_temperatures[first:], self.curve_volumes[first:]
+            return
+        self.evaluateCurves(first)
+        self.curveFactors()
+        if self.generated_graphs_factor:
+            for figure in self.generated_graphs_factor + self.generated_graphs_mi1:
+                plt.close(figure)
+            self.Ploting()
+
+
+
+    def plotCurves(self, ax, atom):
+        """
+        @brief Overlays the Mossbauer factors of the compared V(T) curves of one atom and labels all curves.
+
+        @param ax: The axes with the Mossbauer factor of the first curve as its first line.
+        @param atom: The index of the atom.
+        """
+        if not self.curve_factors:
+            return
+        ax.lines[0].set_label('Factor')
+        for label, temperatures, factors in zip(self.curve_labels, self.curve_temperatures, self.curve_factors):
+            ax.plot(temperatures, factors[atom], linestyle='--', label=label)
+        ax.legend()
+
+
+
+    def reportFitDegrees(self):
+        """
+        @brief Shows the fit degrees chosen by cross-validation and the leave-one-volume-out residuals.
+
+        For every site (named after its first atom) the message lists the number of series fitted with each degree 
+        and the root-mean-square leave-one-out residual of each tried degree over all temperatures and directions.
+        """
+        if self.cv_residuals.size == 0:
+            return
+        with np.errstate(invalid="ignore"):
+            site_residuals = np.sqrt(np.mean(self.cv_residuals ** 2, axis=(1, 3)))
+        lines = ["Degrees chosen by leave-one-volume-out cross-validation "
+                 "(number of series per degree; RMS CV residual per degree, Å²):"]
+        for i, atom in enumerate(self.site_atoms):
+            chosen = ", ".join(f"{degree}: {np.count_nonzero(self.fit_degrees[:, i] == degree)}" for degree in FIT_DEGREES)
+            scores = ", ".join(f"{degree}: {residual:.3e}" for degree, residual in zip(FIT_DEGREES, site_residuals[:, i]))
+            lines.append(f"{self.atom_names[atom]}{atom + 1}  [{chosen}]  [{scores}]")
+        QMessageBox.information(self, "Fit Degrees", "\n".join(lines))
 
    
     def sing_Msd_interpol(self):
         """
-        @brief Extracts mean-square displacement (MSD) values for each atom from a thermal-displacement file.
+        @brief Interpolates the mean-square displacements (MSD) of a thermal-displacement file at the chosen temperatures.
 
-        This function processes a thermal-displacement file and extracts the mean-square displacement (MSD) 
-        values for each atom. The extracted values can be used for further analysis, such as interpolation 
-        or calculations involving atomic motion.
+        The MSD of every site (see `findEquivalentSites`) are interpolated over the temperature grid of the file, 
+        which may be non-uniform, by a `TemperatureInterpolator` ('linear' or monotone cubic, `box_interpolation`), 
+        at all temperatures at once. The temperatures are the grid of the file or the ones chosen in 
+        `box_temperatures` (`self.requested_temperatures`); if these lie outside the grid, a warning is shown 
+        and the grid is used. Temperatures on the grid give the values of the file exactly.
 
         Behavior:
-            - Reads the thermal-displacement file.
-            - Extracts the MSD values for each atom from the file.
-            - Stores the extracted MSD values for each atom in relevant lists or structures.
+            - Builds the interpolator from the parsed displacements of the file.
+            - Evaluates the MSD values (all components) of each site and copies them to all atoms with `setMsd` 
+              and `expandSites`.
+            - Stores the temperatures in `self.sing_temperature`.
 
         Attributes:
-            - `self.loaded_files2` (list of str): The list of thermal-displacement files being processed.
-            - `self.ms_displacement_list` (list of float): A list to store the extracted MSD values.
+            - `self.parsed_displacements` (dict): Parsed (temperatures, displacements) arrays per file.
+            - `self.sing_temperature` (list of float): The temperatures of the results.
+            - `self.msd_tensor` (numpy.ndarray): The interpolated MSD values, `(natom, n_temperatures, n_components)`.
 
         Example usage:
             self.sing_Msd_interpol()
         """
-        
-        natom = len(self.atom_masses)
-        t = [float(np_scalar) for np_scalar in self.sing_temperature]
-        
-        for i in range(0 ,int(len(self.atom_masses))):
-            mx2 = []
-            mz2 = []
-            my2 = []
-            
-            for n in range(0, len(self.sing_temperature)):
-                t_0 = math.trunc(t[n] / 10)*natom + i
-                mx2.append(self.data_sing_list[0][0][t_0])
-                my2.append(self.data_sing_list[0][1][t_0])
-                mz2.append(self.data_sing_list[0][2][t_0])
-            
-            self.mx1.append(mx2)
-            self.mz1.append(mz2)
-            self.my1.append(my2)
-            
-   
-   
-   
-  
-   
-   
-   
-   
+        grid, displacements = self.parsed_displacements[self.outfile[0]]
+        interpolator = TemperatureInterpolator(grid, displacements[:, self.site_atoms], self.get_interpolation())
+        temperatures = grid if self.requested_temperatures is None else self.requested_temperatures
+        try:
+            index = interpolator.locate(temperatures)
+        except ValueError as error:
+            QMessageBox.warning(self, "Temperatures Out of Range", f"{error}\nThe temperatures of the file are used instead.")
+            temperatures = grid
+            index = interpolator.locate(temperatures)
+        self.sing_temperature[:] = np.asarray(temperatures, dtype=float).tolist()
+        self.setMsd(interpolator.evaluate(index).transpose(1, 0, 2))
+        self.expandSites()
+
+
+
+    def get_interpolation(self):
+        """
+        @brief Retrieves the temperature interpolation selected in the `box_interpolation` combo box.
+
+        Returns:
+            - str: 'pchip' for 'Monotone Cubic (PCHIP)', otherwise 'linear' (the default).
+        """
+        return 'pchip' if self.box_interpolation.currentText() == 'Monotone Cubic (PCHIP)' else 'linear'
+
+
+
+    def temperaturesChanged(self, index):
+        """
+        @brief Asks for the temperatures of the single-file results when 'Custom Temperatures' is chosen.
+
+        The temperatures are entered as `start:stop:step` (stop included) or as a list separated by commas or 
+        spaces; they are sorted and take effect when the data are processed. 'Temperatures' returns to the 
+        grid of the thermal-displacements file.
+
+        @param index: The index of the chosen item in `box_temperatures`.
+        """
+        if index == 0:
+            self.requested_temperatures = None
+            return
+        current = "" if self.requested_temperatures is None else ", ".join(f"{value:g}" for value in self.requested_temperatures)
+        text, ok = QInputDialog.getText(self, "Custom Temperatures", "Temperatures in K (start:stop:step or a list):", text=current)
+        try:
+            if ":" in text:
+                start, stop, step = (float(value) for value in text.split(":"))
+                temperatures = np.arange(start, stop + step / 2, step) if step > 0 else np.empty(0)
+            else:
+                temperatures = np.array([float(value) for value in text.replace(",", " ").split()])
+        except ValueError:
+            temperatures = np.empty(0)
+        if not ok or temperatures.size == 0 or not np.all(np.isfinite(temperatures)):
+            if ok:
+                QMessageBox.warning(self, "Invalid Temperatures", f"Could not read temperatures from '{text}'.")
+            self.box_temperatures.setCurrentIndex(0 if self.requested_temperatures is None else 1)
+            return
+        self.requested_temperatures = np.unique(temperatures)
+
+
+
     def get_selected_resolution(self):
         """
         @brief Retrieves the selected resolution from the `box_resolution` combo box.
@@ -2618,6 +5742,48 @@ class my_window(QMainWindow):
     
     
     
+    def get_memory_budget(self):
+        """
+        @brief Retrieves the memory budget selected in the `box_memory` combo box.
+
+        Returns:
+            - int or None: The budget in bytes, or None if no budget is selected ('Memory').
+
+        Example usage:
+            budget = self.get_memory_budget()
+        """
+        selected_memory = self.box_memory.currentText()
+        if selected_memory == 'Memory':
+            return None
+        amount, unit = selected_memory.split()
+        return int(amount) * 1024 ** (3 if unit == 'GB' else 2)
+
+
+
+    def get_fit_degree(self):
+        """
+        @brief Retrieves the fit degree selected in the `box_degree` combo box.
+
+        Returns:
+            - int or str: The polynomial degree (2 if nothing is selected), 'series' or 'site' for a degree 
+              chosen by cross-validation for every series or for every site, or 'pchip' for piecewise monotone 
+              cubic interpolation.
+
+        Example usage:
+            degree = self.get_fit_degree()
+        """
+        selected_degree = self.box_degree.currentText()
+        if selected_degree == 'Fit Degree':
+            return 2
+        if selected_degree.startswith('Monotone'):
+            return 'pchip'
+        if selected_degree.startswith('Auto'):
+            return selected_degree.split()[-1].rstrip(')')
+        return int(selected_degree)
+    
+    
+    
+    
     def get_selected_color(self):
         """
         @brief Retrieves the selected color from the `box_colors` combo box.
@@ -2721,6 +5887,19 @@ class my_window(QMainWindow):
     
     
     
+    def plotExperimentalData(self, ax):
+        """
+        @brief Draws the experimental data points into a plot, with error bars if they were loaded.
+
+        @param ax: The matplotlib axes to draw into.
+        """
+        if self.yError is not None:
+            ax.errorbar(self.xAxis, self.yAxis, yerr=self.yError, marker='+', linestyle='None', markersize=10, color='b', label='Experimental results')
+        else:
+            ax.plot(self.xAxis, self.yAxis, marker='+', linestyle='None', markersize=10, color='b', label='Experimental results')
+
+
+
     def generate_graph(self):
         """
         @brief Generates graphs for Mossbauer factor and mean-square displacements (MSD) based on selected options.
@@ -2732,9 +5911,11 @@ class my_window(QMainWindow):
         Behavior:
             - Determines whether experimental data or loaded files are present and configures graphs accordingly.
             - Retrieves the selected resolution, color, line style, marker, and line width for plotting.
-            - For each atom:
+            - For the first atom of every site (`self.site_atoms`; equivalent atoms share the graphs):
                 - Generates a Mossbauer factor plot.
                 - Generates an MSD plot with x², y², and z² components.
+            - Overlays the Mossbauer factors of further V(T) curves (`plotCurves`) and shades the bootstrap 
+              confidence bands, if any, under the curves of the V(T) graphs (`plotBands`).
             - Appends the generated figures to the respective lists for Mossbauer factor and MSD.
 
         Graph types:
@@ -2778,7 +5959,7 @@ class my_window(QMainWindow):
                 else:
                     return
                 i= 1
-                for i in range(1,len(self.atom_masses)+1):
+                for i in self.site_atoms + 1:
                     fig1, ax = plt.subplots(figsize=resolution_settings['figsize'], dpi=resolution_settings['dpi'])  
                     ax.plot(self.sing_temperature, self.factor_list[int(i-1)], **self.factor_stored_kwargs_f)
                     ax.set_xlabel('T[K]')  
@@ -2830,7 +6011,7 @@ class my_window(QMainWindow):
                 else:
                     return
                 i= 1
-                for i in range(1,len(self.atom_masses)+1):
+                for i in self.site_atoms + 1:
                     fig1, ax = plt.subplots(figsize=resolution_settings['figsize'], dpi=resolution_settings['dpi'])  
                     ax.plot(self.temp_list, self.factor_list[int(i-1)], **self.factor_stored_kwargs_f)
                     ax.set_xlabel('T[K]') 
@@ -2838,6 +6019,8 @@ class my_window(QMainWindow):
                     ax.set_title(f'Mossbauser factor for {self.atom_names[int(i-1)]}') 
                     ax.grid(False)
                     ax.legend(['Factor']) 
+                    self.plotCurves(ax, int(i-1))
+                    self.plotBands(ax, 'factor', int(i-1))
                     self.generated_graphs_factor.append(fig1)
                     
                     
@@ -2850,6 +6033,7 @@ class my_window(QMainWindow):
                     ax.set_title(f'MSD for {self.atom_names[int(i-1)]}')  
                     ax.grid(False)  
                     ax.legend(['MSD of X','MSD of Z','MSD of Y'])
+                    self.plotBands(ax, 'msd', int(i-1))
                     self.generated_graphs_mi1.append(fig2)
                 
    
@@ -2878,10 +6062,10 @@ class my_window(QMainWindow):
                 else:
                     return
                 i= 1
-                for i in range(1,len(self.atom_masses)+1):
+                for i in self.site_atoms + 1:
                     fig1, ax = plt.subplots(figsize=resolution_settings['figsize'], dpi=resolution_settings['dpi'])  
                     ax.plot(self.sing_temperature, self.factor_list[int(i-1)], **self.factor_stored_kwargs_f)  
-                    ax.plot(self.xAxis, self.yAxis, marker='+', linestyle='None', markersize=10, color='b', label='Experimental results')
+                    self.plotExperimentalData(ax)
                     ax.set_xlabel('T[K]') 
                     ax.set_ylabel('f') 
                     ax.set_title(f'Mossbauser factor for {self.atom_names[int(i-1)]}')  
@@ -2931,15 +6115,17 @@ class my_window(QMainWindow):
                 else:
                     return
                 i= 1
-                for i in range(1,len(self.atom_masses)+1):
+                for i in self.site_atoms + 1:
                     fig1, ax = plt.subplots(figsize=resolution_settings['figsize'], dpi=resolution_settings['dpi'])  
                     ax.plot(self.temp_list, self.factor_list[int(i-1)], **self.factor_stored_kwargs_f)
-                    ax.plot(self.xAxis, self.yAxis, marker='+', linestyle='None', markersize=10, color='b', label='Experimental results')
+                    self.plotExperimentalData(ax)
                     ax.set_xlabel('T[K]') 
                     ax.set_ylabel('f') 
                     ax.set_title(f'Mossbauser factor for {self.atom_names[int(i-1)]}') 
                     ax.grid(False) 
                     ax.legend(['Factor']) 
+                    self.plotCurves(ax, int(i-1))
+                    self.plotBands(ax, 'factor', int(i-1))
                     self.generated_graphs_factor.append(fig1)
                     
                     
@@ -2952,6 +6138,7 @@ class my_window(QMainWindow):
                     ax.set_title(f'MSD for {self.atom_names[int(i-1)]}')  
                     ax.grid(False) 
                     ax.legend(['MSD of X','MSD of Z','MSD of Y'])
+                    self.plotBands(ax, 'msd', int(i-1))
                     self.generated_graphs_mi1.append(fig2)
                 
               
@@ -2999,7 +6186,7 @@ class my_window(QMainWindow):
             atom_type = None
         
         if atom_type:
-            selected_value = int(selected_text[-2:])
+            selected_value = int(selected_text.split()[-1])
             self.i = selected_value
             if atom_type == "Atom Probability":
                 self.handleAtomProbability(selected_value)
@@ -3017,14 +6204,14 @@ class my_window(QMainWindow):
             - value (int): The atom number for which the graph should be displayed.
 
         Behavior:
-            - If the atom number is valid, displays the corresponding Mossbauer factor graph.
+            - If the atom number is valid, displays the Mossbauer factor graph of its site.
             - If the atom number is out of range, the method returns without action.
 
         Example usage:
             self.handleAtomProbability(value)
         """
-        if 1 <= value <= len(self.generated_graphs_factor):
-            self.displayMatplotlibFigure(self.generated_graphs_factor[int(value)-1])
+        if 1 <= value <= len(self.site_of_atom) and self.site_of_atom[value - 1] < len(self.generated_graphs_factor):
+            self.displayMatplotlibFigure(self.generated_graphs_factor[self.site_of_atom[value - 1]])
         else:
             return
 
@@ -3038,15 +6225,15 @@ class my_window(QMainWindow):
             - value (int): The atom number for which the graph should be displayed.
 
         Behavior:
-            - If the atom number is valid, displays the corresponding MSD graph.
+            - If the atom number is valid, displays the MSD graph of its site.
             - If the atom number is out of range, the method returns without action.
 
         Example usage:
             self.handleAtomMSD(value)
         """
-        if 1 <= value <= len(self.generated_graphs_mi1):       
+        if 1 <= value <= len(self.site_of_atom) and self.site_of_atom[value - 1] < len(self.generated_graphs_mi1):
 
-                self.displayMatplotlibFigure(self.generated_graphs_mi1[int(value)-1])
+                self.displayMatplotlibFigure(self.generated_graphs_mi1[self.site_of_atom[value - 1]])
         else:
             return
     
@@ -3060,7 +6247,8 @@ class my_window(QMainWindow):
 
         Behavior:
             - Clears `self.generated_graphs_mi1` and `self.generated_graphs_factor`.
-            - Regenerates the graphs by calling `generate_graph`.
+            - Regenerates the graphs by calling `generate_graph`; in the 'Texture Map' mode the Mossbauer factor 
+              graphs are replaced by the texture maps (`plotTextureMap`).
             - Calls `Choosing(self.i)` to update the display based on the current atom selection.
 
         Example usage:
@@ -3069,6 +6257,10 @@ class my_window(QMainWindow):
         self.generated_graphs_mi1.clear()
         self.generated_graphs_factor.clear()
         self.generate_graph()
+        if len(self.texture_map) and self.generated_graphs_factor:
+            for figure in self.generated_graphs_factor:
+                plt.close(figure)
+            self.generated_graphs_factor[:] = [self.plotTextureMap(atom) for atom in self.site_atoms]
         self.Choosing(self.i)
 
     
@@ -3076,22 +6268,6 @@ class my_window(QMainWindow):
     
 
     
-    def copyfiles(self):
-        """
-        @brief Copies the list of output files to the `files_to_delete` list.
-
-        This method creates a copy of the `self.outfile` list, which contains paths to the output files, 
-        and assigns it to `self.files_to_delete`. This allows for file deletion operations to be handled 
-        without modifying the original list.
-
-        Example usage:
-            self.copyfiles()
-        """
-        self.files_to_delete = self.outfile.copy()         
-    
-    
-    
-    
     def Save_file(self):
         """
         @brief Saves the temperature, MSD (X, Y, Z components), and Mossbauer factor data to a file.
@@ -3108,7 +6284,8 @@ class my_window(QMainWindow):
             - Writes the data in tab-separated format: temperature, MSD (X, Y, Z components), and factor.
 
         File format:
-            - Columns: Temperature, MSD_x, MSD_y, MSD_z, Factor.
+            - Columns: Temperature, MSD_x, MSD_y, MSD_z, Factor; with bootstrap bands every value is followed 
+              by its lower and upper bound.
 
         Example usage:
             self.Save_file()
@@ -3130,11 +6307,287 @@ class my_window(QMainWindow):
                     my1_str = f"{self.my1[int(self.i -1)][i]:0.10f}"
                     mz1_str = f"{self.mz1[int(self.i -1)][i]:0.10f}"
                     factor_str = f"{self.factor_list[int(self.i -1)][i]:0.10f}"
+                    if self.factor_band.size:
+                        atom = int(self.i - 1)
+                        mx1_str, my1_str, mz1_str = (f"{value}\t{self.msd_bands[0, atom, i, axis]:0.10f}\t{self.msd_bands[1, atom, i, axis]:0.10f}" 
+                                                     for axis, value in enumerate((mx1_str, my1_str, mz1_str)))
+                        factor_str += f"\t{self.factor_band[0, atom, i]:0.10f}\t{self.factor_band[1, atom, i]:0.10f}"
                     file.write(f"{temperature_str}\t{mx1_str}\t{my1_str}\t{mz1_str}\t{factor_str}\n")
 
 
     
     
+    def exportAll(self):
+        """
+        @brief Exports the temperature, MSD (X, Y, Z components) and Mossbauer factor of every atom at once.
+
+        Unlike `Save_file`, which writes the selected atom only, this method writes all atoms (or, with 
+        'Species averages' selected in `self.box_export_scope`, the average of each species) in the layout 
+        selected in `self.box_export` (see `export_results`), with the bootstrap confidence bands if they were computed. 
+        The bands are per site, and the average of per-atom percentiles is not a band of the species average, so 
+        species averages are exported without bands.
+
+        Example usage:
+            self.exportAll()
+        """
+        if len(self.factor_list) == 0:
+            QMessageBox.information(self, "Nothing to Export", "Process the data before exporting it.")
+            return
+        if not self.loaded_files3 and not self.loaded_files4:
+            temperature = self.sing_temperature
+        else:
+            temperature = self.temp_list
+        layout = ("wide", "long", "npz")[self.box_export.currentIndex()]
+        file_filter = "NumPy Arrays (*.npz)" if layout == "npz" else "Text Files (*.tsv *.txt)"
+        options = QFileDialog.Options()
+        options |= QFileDialog.DontUseNativeDialog
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export All", "", file_filter + ";;All Files (*)", options=options)
+        if not file_path:
+            return
+
+        msd = np.stack([np.asarray(self.mx1, dtype=float), np.asarray(self.my1, dtype=float), np.asarray(self.mz1, dtype=float)], axis=2)
+        factor = np.asarray(self.factor_list, dtype=float)
+        bands = (np.moveaxis(self.msd_bands[..., :3], 0, 1), np.moveaxis(self.factor_band, 0, 1)) if self.factor_band.size else ()
+        if self.box_export_scope.currentText() == 'Species averages':
+            labels, msd, factor = species_averages(self.atom_names, msd, factor)
+            bands = ()
+        else:
+            labels = [f"{name}{index}" for index, name in enumerate(self.atom_names, start=1)]
+        bands = [np.moveaxis(band, 1, 0) for band in bands]
+        try:
+            export_results(file_path, layout, np.asarray(temperature, dtype=float), labels, msd, factor, *bands)
+        except OSError as error:
+            QMessageBox.warning(self, "Export Failed", str(error))
+
+
+
+    def saveSession(self):
+        """
+        @brief Saves the parsed inputs, the computed results and the plot styles into a session file.
+
+        The session holds the parsed thermal displacements and primitive cell, the temperature and volume grids, 
+        the fit coefficients (`fit_coefficients`), degrees and PCHIP pieces with the `box_degree` selection, the MSD (`mx1`, `my1`, `mz1`) and Mossbauer factors, 
+        the atom metadata, the experimental data, the plot styles and the names of the loaded files. It is 
+        written by `save_session` as one compressed NumPy archive.
+
+        Example usage:
+            self.saveSession()
+        """
+        if len(self.factor_list) == 0:
+            QMessageBox.information(self, "Nothing to Save", "Process the data before saving a session.")
+            return
+        options = QFileDialog.Options()
+        options |= QFileDialog.DontUseNativeDialog
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Session", "", "TriMEph Sessions (*.trimeph);;All Files (*)", options=options)
+        if not file_path:
+            return
+
+        arrays = {
+            "temp_list": np.asarray(self.temp_list, dtype=float),
+            "sing_temperature": np.asarray(self.sing_temperature, dtype=float),
+            "ev_vol_list": np.asarray(self.ev_vol_list, dtype=float),
+            "volume_curves": np.asarray(self.volume_list, dtype=float).reshape(-1, 1),
+            "curve_lengths": np.array([len(temperatures) for temperatures in self.curve_temperatures], dtype=int),
+            "curve_temperatures": np.concatenate([np.empty(0)] + self.curve_temperatures),
+            "curve_volumes": np.concatenate([np.empty(0)] + self.curve_volumes),
+            "curve_msd": np.concatenate([np.empty((len(self.site_atoms), 0, self.msd_tensor.shape[2]))] + self.curve_msd, axis=1),
+            "factor_list": np.asarray(self.factor_list, dtype=float),
+            "mx1": np.asarray(self.mx1, dtype=float),
+            "my1": np.asarray(self.my1, dtype=float),
+            "mz1": np.asarray(self.mz1, dtype=float),
+            "msd_tensor": np.asarray(self.msd_tensor, dtype=float),
+            "msd_bands": self.msd_bands,
+            "isotope_bands": self.isotope_bands,
+            "fit_coefficients": np.asarray(self.fit_coefficients, dtype=float),
+            "fit_degrees": np.asarray(self.fit_degrees, dtype=int),
+            "atom_numbers": np.asarray(self.atom_numbers, dtype=int),
+            "atom_masses": np.asarray(self.atom_masses, dtype=float),
+            "site_atoms": np.asarray(self.site_atoms, dtype=int),
+            "site_of_atom": np.asarray(self.site_of_atom, dtype=int),
+            "Er_const_list": np.asarray(self.Er_const_list, dtype=float),
+            "xAxis": np.asarray(self.xAxis, dtype=float),
+            "yAxis": np.asarray(self.yAxis, dtype=float),
+        }
+        if self.yError is not None:
+            arrays["yError"] = np.asarray(self.yError, dtype=float)
+        if self.fit_pieces is not None:
+            arrays["fit_pieces"] = np.asarray(self.fit_pieces, dtype=float)
+            arrays["fit_breaks"] = np.asarray(self.fit_breaks, dtype=float)
+        for name, array in self.primitive_cell.items():
+            arrays["cell_" + name] = np.asarray(array)
+        displacement_files = list(self.parsed_displacements)
+        for index, file_name in enumerate(displacement_files):
+            temperatures, displacements = self.parsed_displacements[file_name]
+            arrays[f"temperatures_{index}"] = np.asarray(temperatures)
+            arrays[f"displacements_{index}"] = np.asarray(displacements)
+
+        metadata = {
+            "loaded_files": [self.loaded_files1, self.loaded_files2, self.loaded_files3, self.loaded_files4, self.loaded_files5],
+            "displacement_files": displacement_files,
+            "outfile": list(self.outfile),
+            "fit_degree": self.box_degree.currentText(),
+            "atom_names": list(self.atom_names),
+            "styles": {
+                "factor": self.factor_stored_kwargs_f,
+                "mx1": self.mx1_stored_kwargs,
+                "my1": self.my1_stored_kwargs,
+                "mz1": self.mz1_stored_kwargs,
+            },
+            "i": self.i,
+            "isotope": self.box_isotope.currentText(),
+            "orientation": self.box_orientation.currentText(),
+            "bootstrap": self.box_bootstrap.currentText(),
+            "curve_labels": self.curve_labels,
+            "interpolation": self.box_interpolation.currentText(),
+            "requested_temperatures": None if self.requested_temperatures is None else self.requested_temperatures.tolist(),
+            "gamma_angles": list(self.gamma_angles),
+            "texture_temperature": self.texture_temperature,
+        }
+        try:
+            save_session(file_path, arrays, metadata)
+        except OSError as error:
+            QMessageBox.warning(self, "Session Not Saved", str(error))
+
+
+
+    def openSession(self):
+        """
+        @brief Restores a session saved by `saveSession` and redraws its graphs.
+
+        The original input files are not needed: the results, parsed arrays, atom metadata and plot styles are 
+        read from the session file, and the graphs are regenerated from them. Loaded files are replaced after 
+        confirmation.
+
+        Example usage:
+            self.openSession()
+        """
+        options = QFileDialog.Options()
+        options |= QFileDialog.DontUseNativeDialog
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open Session", "", "TriMEph Sessions (*.trimeph);;All Files (*)", options=options)
+        if not file_path:
+            return
+        try:
+            arrays, metadata = load_session(file_path)
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Session Not Opened", str(error))
+            return
+
+        if self.loaded_files1 or self.loaded_files2 or self.loaded_files3 or self.loaded_files4:
+            reply = QMessageBox.question(self, "Replace Files", "Replace the loaded files and results with the session?", 
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+        self.restoreSession(arrays, metadata)
+
+
+
+    def restoreSession(self, arrays, metadata):
+        """
+        @brief Replaces the loaded files, results and plot styles with those of a session.
+
+        @param arrays: The session arrays (see `load_session`).
+        @param metadata: The session metadata (see `load_session`).
+        """
+        self.clearLoadedFiles()
+        files1, files2, files3, files4, files5 = metadata["loaded_files"]
+        self.addFileGroup(files1, self.loaded_files1, self.graphics_load1)
+        self.addFileGroup(files2, self.loaded_files2, self.graphics_load2)
+        self.addFileGroup(files3, self.loaded_files3, self.graphics_load3)
+        self.addFileGroup(files4, self.loaded_files4, self.graphics_load4)
+        self.loaded_files5[:] = files5
+
+        self.temp_list = arrays["temp_list"]
+        self.sing_temperature = arrays["sing_temperature"].tolist()
+        self.ev_vol_list = arrays["ev_vol_list"]
+        volume_curves = arrays["volume_curves"]
+        self.volume_list = volume_curves[:, 0] if volume_curves.size else np.empty(0)
+        self.clearCurves()
+        if len(arrays.get("curve_lengths", ())):
+            splits = np.cumsum(arrays["curve_lengths"])[:-1]
+            self.curve_labels = list(metadata["curve_labels"])
+            self.curve_temperatures = np.split(arrays["curve_temperatures"], splits)
+            self.curve_volumes = np.split(arrays["curve_volumes"], splits)
+            self.curve_msd = np.split(arrays["curve_msd"], splits, axis=1)
+        self.factor_list = arrays["factor_list"]
+        self.mx1 = list(arrays["mx1"])
+        self.my1 = list(arrays["my1"])
+        self.mz1 = list(arrays["mz1"])
+        self.msd_tensor = arrays.get("msd_tensor", np.empty((0, 0, 3)))
+        self.setFitCoefficients(arrays.get("fit_coefficients", np.empty((0, 0, 3, 3))))
+        self.fit_degrees = arrays.get("fit_degrees", np.empty((0, 0, 3), dtype=int))
+        self.cv_residuals = np.empty((0, 0, 0, 3))
+        self.fit_pieces = arrays.get("fit_pieces")
+        self.fit_breaks = arrays.get("fit_breaks")
+        self.box_degree.setCurrentText(metadata.get("fit_degree", "Fit Degree"))
+        self.atom_names = list(metadata["atom_names"])
+        self.atom_numbers = arrays["atom_numbers"].tolist()
+        self.atom_masses = arrays["atom_masses"].tolist()
+        self.site_atoms = arrays.get("site_atoms", np.arange(len(self.atom_masses)))
+        self.site_of_atom = arrays.get("site_of_atom", np.arange(len(self.atom_masses)))
+        self.Er_const_list = arrays["Er_const_list"].tolist()
+        self.xAxis = arrays["xAxis"]
+        self.yAxis = arrays["yAxis"]
+        self.yError = arrays.get("yError")
+        self.primitive_cell = {name[5:]: array for name, array in arrays.items() if name.startswith("cell_")}
+        self.parsed_displacements = {file_name: (arrays[f"temperatures_{index}"], arrays[f"displacements_{index}"]) 
+                                     for index, file_name in enumerate(metadata["displacement_files"])}
+
+        styles = metadata["styles"]
+        for stored, name in ((self.factor_stored_kwargs_f, "factor"), (self.mx1_stored_kwargs, "mx1"), 
+                             (self.my1_stored_kwargs, "my1"), (self.mz1_stored_kwargs, "mz1")):
+            stored.clear()
+            stored.update(styles[name])
+        self.selectStyleBoxes(self.factor_stored_kwargs_f)
+        self.i = metadata["i"]
+
+        self.gamma_angles = tuple(metadata.get("gamma_angles", (0.0, 0.0)))
+        self.texture_temperature = metadata.get("texture_temperature")
+        self.box_orientation.blockSignals(True)
+        self.box_orientation.setCurrentText(metadata.get("orientation", "Orientation"))
+        self.box_orientation.blockSignals(False)
+        self.box_bootstrap.setCurrentText(metadata.get("bootstrap", "Uncertainty"))
+        self.box_interpolation.setCurrentText(metadata.get("interpolation", "Interpolation"))
+        self.outfile[:] = metadata.get("outfile", sorted(self.parsed_displacements, key=self.get_sort_key))
+        self.outfile_names[:] = self.outfile
+        self.msd_surface = None
+        if self.outfile and (self.fit_pieces is not None or self.fit_coefficients.size):
+            self.buildSurface(self.fit_pieces, self.fit_breaks)
+        requested = metadata.get("requested_temperatures")
+        self.requested_temperatures = None if requested is None else np.array(requested, dtype=float)
+        self.box_temperatures.setCurrentIndex(0 if requested is None else 1)
+        self.Mfactor()
+        self.msd_bands = arrays.get("msd_bands", self.msd_bands)
+        self.isotope_bands = arrays.get("isotope_bands", self.isotope_bands)
+        self.box_isotope.blockSignals(True)
+        self.box_isotope.setCurrentText(metadata.get("isotope", "Isotope"))
+        self.box_isotope.blockSignals(False)
+        self.selectIsotope()
+
+        self.GenerateComboBox()
+        self.Ploting()
+
+
+
+    def selectStyleBoxes(self, kwargs):
+        """
+        @brief Selects the 'Factor' graph and the color, line style, marker and line width boxes matching stored plot styles.
+
+        `generate_graph` restyles the graph selected in `self.ChooseWhich` from these boxes, so they are set to the 
+        stored style before the graphs are regenerated.
+
+        @param kwargs: Stored plot keyword arguments (e.g. `self.factor_stored_kwargs_f`).
+        """
+        markers = {'o': 'Circle', '^': 'Triangle', 's': 'Square'}
+        linewidth = kwargs.get('linewidth')
+        self.ChooseWhich.setCurrentIndex(max(self.ChooseWhich.findText('Factor'), 0))
+        for box, text in ((self.box_colors, kwargs.get('color')), 
+                          (self.box_linestyle, kwargs.get('linestyle')), 
+                          (self.box_markers, markers.get(kwargs.get('marker'), 'none')), 
+                          (self.box_linewidth, None if linewidth is None else str(int(linewidth)))):
+            box.setCurrentIndex(max(box.findText(text), 0) if text is not None else 0)
+
+
+
     def PROCESSING(self):
         """
         @brief Processes atomic data, mean-square displacements, and Mossbauer factor calculations.
@@ -3145,55 +6598,67 @@ class my_window(QMainWindow):
         displacements (MSD), and calculates the Mossbauer factor.
 
         Behavior:
+            - Stops with a warning if the input files do not match each other (see `input_problems`).
             - Clears various data structures used in the processing (e.g., temperature, MSD, factor, atom info).
             - Depending on whether thermal-displacement files are loaded:
                 - If no files are loaded:
                     - Extracts temperature data from a single thermal-displacement file.
-                    - Cleans and processes the MSD data for interpolation.
+                    - Parses and processes the MSD data for interpolation.
                     - Calculates Mossbauer factors and updates the combo box.
                 - If files are loaded:
                     - Extracts volume and temperature data, processes MSD, interpolates results, and calculates 
                     Mossbauer factors.
             - Calls several helper methods to perform specific tasks during the workflow.
-            - Deletes cleaned files after processing is complete.
 
         Workflow for no thermal-displacement files:
             - Clears existing data.
             - Extracts atomic information and maps atom names to numbers.
+            - Parses the thermal-displacement files into arrays.
             - Extracts temperature data.
-            - Cleans data and copies files for processing.
             - Interpolates MSD data and calculates Mossbauer factors.
-            - Updates the combo box with new data and deletes cleaned files.
+            - Updates the combo box with new data.
 
         Workflow for loaded thermal-displacement files:
             - Clears existing data.
             - Extracts atomic information and maps atom names to numbers.
             - Extracts volume and temperature data.
-            - Cleans data and copies files for processing.
+            - Parses the thermal-displacement files into arrays.
             - Counts values smaller than the first volume, removes unphysical values.
-            - Processes MSD and performs interpolation.
-            - Updates the combo box with new data and deletes cleaned files.
+            - Groups equivalent atoms into sites (`findEquivalentSites`).
+            - Processes MSD and performs interpolation once per site (one temperature slab at a time if a memory 
+            budget is selected) and copies the results to all atoms.
+            - Updates the combo box with new data.
+            - Shows input errors found during processing in either workflow (e.g. V(T) temperatures outside the 
+            thermal-displacements files, or a file with one temperature) in a warning instead of raising them.
 
         Example usage:
             self.PROCESSING()
         """
+        problems = self.input_problems(read_missing=True)
+        if problems:
+            QMessageBox.warning(self, "Input Mismatch", "\n".join(problems))
+            return
+
         if not self.loaded_files3 and not self.loaded_files4:   
             self.Er_const_list.clear() 
             self.real_temp.clear()
-            self.data_list_x.clear()
-            self.data_list_y.clear()
-            self.data_list_z.clear()
+            self.data_list_x = []
+            self.data_list_y = []
+            self.data_list_z = []
             self.data_sing_list.clear()
             self.result.clear()
             self.outfile.clear()
-            self.mx1.clear()
-            self.my1.clear()
-            self.mz1.clear()
+            self.mx1 = []
+            self.my1 = []
+            self.mz1 = []
+            self.msd_tensor = np.empty((0, 0, 3))
             self.mx.clear()
             self.my.clear()
             self.mz.clear()
-            self.ev_vol_list.clear()
-            self.factor_list.clear()
+            self.ev_vol_list = np.empty(0)
+            self.clearCurves()
+            self.msd_surface = None
+            self.factor_list = []
             self.mx2.clear()
             self.my2.clear()
             self.mz2.clear()
@@ -3203,38 +6668,43 @@ class my_window(QMainWindow):
             self.count.clear() 
             self.sing_temperature.clear()
             
+            self.outfile_names.clear()
+            self.parsed_displacements.clear()
+            
             self.get_atom_info()
             self.map_names_to_numbers()
-            self.extract_temperatures()
-            self.Cleaning()
-            self.copyfiles()
-            self.Msd_sing()
-            self.sing_Msd_interpol()
-            self.GenerateComboBox()
-            self.Mfactor()
-            
-            
-            #self.sing_Msd_interpol()
-            #self.GenerateComboBox()
-            #self.Mfactor()
-            self.DeletingCleanedFiles()
+            try:
+                self.Cleaning()
+                self.findEquivalentSites()
+                self.extract_temperatures()
+                self.Msd_sing()
+                self.sing_Msd_interpol()
+                self.GenerateComboBox()
+                self.Mfactor()
+            except (OSError, ValueError) as error:
+                QMessageBox.warning(self, "Processing Failed", str(error))
+                return
 
         else:   
             self.Er_const_list.clear() 
             self.real_temp.clear()
-            self.data_list_x.clear()
-            self.data_list_y.clear()
-            self.data_list_z.clear()
+            self.data_list_x = []
+            self.data_list_y = []
+            self.data_list_z = []
             self.result.clear()
             self.outfile.clear()
-            self.mx1.clear()
-            self.my1.clear()
-            self.mz1.clear()
+            self.mx1 = []
+            self.my1 = []
+            self.mz1 = []
+            self.msd_tensor = np.empty((0, 0, 3))
             self.mx.clear()
             self.my.clear()
             self.mz.clear()
-            self.ev_vol_list.clear()
-            self.factor_list.clear()
+            self.ev_vol_list = np.empty(0)
+            self.temp_list = np.empty(0)
+            self.volume_list = np.empty(0)
+            self.clearCurves()
+            self.factor_list = []
             self.mx2.clear()
             self.my2.clear()
             self.mz2.clear()
@@ -3242,34 +6712,50 @@ class my_window(QMainWindow):
             self.atom_names.clear()
             self.atom_numbers.clear()
             self.count.clear()
-            self.fit_list_x_temp_ordered.clear()
-            self.fit_list_y_temp_ordered.clear()
-            self.fit_list_z_temp_ordered.clear()
+            self.clearFit()
+            self.msd_surface = None
+            self.fit_list_x_temp_ordered = []
+            self.fit_list_y_temp_ordered = []
+            self.fit_list_z_temp_ordered = []
             self.fit_list_x.clear()
             self.fit_list_y.clear()
             self.fit_list_z.clear()
+            self.outfile_names.clear()
+            self.parsed_displacements.clear()
 
 
             self.get_atom_info()
             self.map_names_to_numbers()
-            self.ev_volume()
-            self.temp_vol()
-            self.Cleaning()
-            self.copyfiles()
-            self.Msd()
-            
-            #self.Msd_interpol()
-            self.Sort()
-            
-            self.Fitting()
-            
-            
-            self.Imputing()
-            
-            self.GenerateComboBox()
-            
-            self.Mfactor()
-            self.DeletingCleanedFiles()
+            try:
+                self.ev_volume()
+                self.temp_vol()
+                self.Cleaning()
+                self.findEquivalentSites()
+
+                budget = self.get_memory_budget()
+                if budget is not None:
+                    self.Fitting_chunked(budget)
+                else:
+                    self.Msd()
+                    
+                    self.Sort()
+                    
+                    self.Fitting()
+                    
+                    
+                    self.Imputing()
+                self.expandSites()
+                
+                self.GenerateComboBox()
+                
+                self.Mfactor()
+                self.Bootstrap()
+            except (OSError, ValueError) as error:
+                QMessageBox.warning(self, "Processing Failed", str(error))
+                return
+
+            if not isinstance(self.get_fit_degree(), int):
+                self.reportFitDegrees()
 
     
     
@@ -3306,15 +6792,15 @@ class my_window(QMainWindow):
         @brief Handles the window close event by prompting the user for confirmation.
 
         This method is called when the user attempts to close the window. It displays a confirmation dialog asking 
-        if the user is sure they want to close the window. If the user confirms, the window is closed, and cleaned 
-        files are deleted. Otherwise, the close event is ignored.
+        if the user is sure they want to close the window. If the user confirms, the window is closed. 
+        Otherwise, the close event is ignored.
 
         Parameters:
             - event (QCloseEvent): The event triggered by attempting to close the window.
 
         Behavior:
             - Displays a confirmation dialog with Yes and No options.
-            - If Yes is selected, closes the window and deletes cleaned files.
+            - If Yes is selected, cancels pending background reads and closes the window.
             - If No is selected, ignores the close event and keeps the window open.
 
         Example usage:
@@ -3322,8 +6808,9 @@ class my_window(QMainWindow):
         """
         reply = QMessageBox.question(self, "Close Window", "Are you sure you want to close the window?", QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
+            if self.prefetch_pool is not None:
+                self.prefetch_pool.shutdown(wait=False, cancel_futures=True)
             event.accept()
-            self.DeletingCleanedFiles()
         else:
             event.ignore()
 
@@ -3351,4 +6838,6 @@ def window ():
 
 
 
-window()
\ No newline at end of file
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    window()
@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: MIT
+"""
+@brief Regression tests of the numerical kernels of TriMEph against reference implementations.
+
+The window-level checks process the example run in `examples` on an offscreen Qt platform, with the parsed
+input cache in a temporary directory.
+"""
+import glob
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pytest
+from scipy import interpolate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import TriMEph
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+EXAMPLES = os.path.join(ROOT, "examples")
+
+
+def test_leave_one_out_residuals_match_explicit_refits():
+    rng = np.random.default_rng(1)
+    x = np.sort(rng.uniform(230, 250, 9))
+    values = rng.normal(size=(9, 4, 3)) + 0.01 * x[:, np.newaxis, np.newaxis] ** 2
+    degrees = (1, 2, 3)
+    _, residuals = TriMEph.cross_validate_polynomials(x, values, degrees)
+
+    for k, degree in enumerate(degrees):
+        deviations = np.empty_like(values)
+        for i in range(len(x)):
+            kept = np.arange(len(x)) != i
+            for index in np.ndindex(values.shape[1:]):
+                coefficients = np.polyfit(x[kept], values[(kept,) + index], degree)
+                deviations[(i,) + index] = values[(i,) + index] - np.polyval(coefficients, x[i])
+        np.testing.assert_allclose(residuals[k], np.sqrt(np.mean(deviations ** 2, axis=0)), rtol=1e-7)
+
+
+def test_leave_one_out_residuals_are_infinite_without_spare_samples():
+    x = np.arange(3.0)
+    _, residuals = TriMEph.cross_validate_polynomials(x, np.ones((3, 2)), (1, 2))
+    assert np.all(np.isfinite(residuals[0]))
+    assert np.all(np.isinf(residuals[1]))
+
+
+@pytest.mark.parametrize("degree", [1, 2, 3, 4])
+def test_fit_polynomials_matches_polyfit(degree):
+    rng = np.random.default_rng(degree)
+    x = np.linspace(232.4, 250.93, 15)
+    values = rng.normal(size=(15, 6, 2, 3))
+    coefficients = TriMEph.fit_polynomials(x, values, degree)
+
+    assert coefficients.shape == (6, 2, 3, degree + 1)
+    expected = np.polyfit(x, values.reshape(15, -1), degree).T.reshape(coefficients.shape)
+    np.testing.assert_allclose(coefficients, expected, rtol=1e-8, atol=1e-12)
+
+
+@pytest.mark.parametrize("shape", ["monotone", "oscillating", "plateau"])
+def test_pchip_stencil_matches_pchip_interpolator(shape):
+    rng = np.random.default_rng(7)
+    grid = np.cumsum(rng.uniform(0.5, 3.0, 12))
+    values = {"monotone": np.cumsum(rng.uniform(0, 1, (12, 3)), axis=0),
+              "oscillating": rng.normal(size=(12, 3)),
+              "plateau": np.repeat(np.array([0.0, 0.0, 1.0, 1.0, 1.0, 2.0, 2.0, 3.0, 3.0, 3.0, 4.0, 4.0]), 3).reshape(12, 3)}[shape]
+    temperatures = np.concatenate([grid, rng.uniform(grid[0], grid[-1], 200)])
+    interval, offset, nodes = TriMEph.temperature_nodes(grid, temperatures, "pchip")
+
+    result = TriMEph.pchip_stencil(grid, interval, offset, values[nodes])
+    np.testing.assert_allclose(result, interpolate.PchipInterpolator(grid, values)(temperatures), rtol=1e-12, atol=1e-12)
+
+
+def test_pchip_stencil_on_two_temperatures_is_linear():
+    grid = np.array([10.0, 30.0])
+    temperatures = np.array([10.0, 15.0, 30.0])
+    interval, offset, nodes = TriMEph.temperature_nodes(grid, temperatures, "pchip")
+    result = TriMEph.pchip_stencil(grid, interval, offset, np.array([1.0, 5.0])[nodes])
+    np.testing.assert_allclose(result, [1.0, 2.0, 5.0])
+
+
+@pytest.fixture(scope="module")
+def application(tmp_path_factory):
+    os.environ["TRIMEPH_CACHE_DIR"] = str(tmp_path_factory.mktemp("cache"))
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+@pytest.fixture
+def processed(application, monkeypatch):
+    """
+    @brief Returns a function that processes the example run with the given combo box selections.
+    """
+    messages = []
+    for kind in ("information", "warning", "critical"):
+        monkeypatch.setattr(QMessageBox, kind, staticmethod(lambda *args, **kwargs: messages.append(args[1:])))
+
+    def process(**selections):
+        window = TriMEph.my_window()
+        for name, text in selections.items():
+            getattr(window, name).setCurrentText(text)
+        window.loaded_files1 = [os.path.join(EXAMPLES, "phonopy.yaml")]
+        window.loaded_files2 = sorted(glob.glob(os.path.join(EXAMPLES, "thermal_displacements.yaml-*")))
+        window.loaded_files3 = [os.path.join(EXAMPLES, "volume-temperature.dat")]
+        window.loaded_files4 = [os.path.join(EXAMPLES, "e-v.txt")]
+        window.PROCESSING()
+        assert not [message for message in messages if message[0] == "Processing Failed"], messages
+        return window
+
+    return process
+
+
+@pytest.mark.parametrize("mode", ["Bootstrap (volumes)", "Bootstrap (residuals)"])
+def test_bootstrap_bands_contain_central_fit(processed, mode):
+    window = processed(box_bootstrap=mode)
+    msd = np.stack([window.mx1, window.my1, window.mz1], axis=2)
+    factor = np.asarray(window.factor_list, dtype=float)
+
+    assert window.factor_band.size
+    assert np.all(window.msd_bands[0][..., :3] <= msd + 1e-12)
+    assert np.all(msd <= window.msd_bands[1][..., :3] + 1e-12)
+    assert np.all(window.factor_band[0] <= factor + 1e-12)
+    assert np.all(factor <= window.factor_band[1] + 1e-12)
+
+
+@pytest.mark.parametrize("degree", ["2", "Auto (per site)", "Monotone Cubic (PCHIP)"])
+def test_chunked_fitting_matches_unchunked(processed, degree):
+    window = processed(box_degree=degree)
+    coefficients = np.array(window.fit_coefficients)
+    pieces = None if window.fit_pieces is None else np.array(window.fit_pieces)
+    msd = window.msd_surface.evaluate(window.temp_list, window.volume_list)
+
+    # A budget of one byte fits one temperature at a time
+    window.Fitting_chunked(1)
+    np.testing.assert_array_equal(window.fit_coefficients, coefficients)
+    if pieces is not None:
+        np.testing.assert_array_equal(window.fit_pieces, pieces)
+    np.testing.assert_array_equal(window.msd_surface.evaluate(window.temp_list, window.volume_list), msd)